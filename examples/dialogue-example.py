@@ -0,0 +1,28 @@
+from manim import *
+from manim_voiceover import VoiceoverScene
+from manim_voiceover.services.gtts import GTTSService
+
+
+class DialogueExample(VoiceoverScene):
+    def construct(self):
+        self.set_speech_service(GTTSService(lang="en", tld="com"))
+        # A second voice on its own track, synthesized concurrently
+        self.add_track("guest", GTTSService(lang="en", tld="co.uk"))
+
+        circle = Circle()
+        square = Square().shift(2 * RIGHT)
+
+        with self.voiceover(text="This circle is drawn as I speak.") as tracker:
+            self.play(Create(circle), run_time=tracker.duration)
+
+        # The block does not wait, so the host replies while the guest is speaking
+        with self.voiceover(
+            text="And now it becomes a square.", track="guest", wait=False
+        ) as tracker:
+            self.wait(0.5)
+
+        with self.voiceover(text="Quite right.") as tracker:
+            self.play(Transform(circle, square), run_time=tracker.duration)
+
+        self.wait_for_tracks()
+        self.wait()
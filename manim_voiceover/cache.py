@@ -0,0 +1,554 @@
+import argparse
+import atexit
+import copy
+import hashlib
+import json
+import os
+import threading
+import time
+import typing as t
+from pathlib import Path
+
+from manim import logger
+from pydub import AudioSegment
+
+from manim_voiceover.defaults import (
+    DEFAULT_TRANSCRIPTION_CACHE_JSON_FILENAME,
+    DEFAULT_VOICEOVER_CACHE_DIR,
+    DEFAULT_VOICEOVER_CACHE_JSON_FILENAME,
+)
+from manim_voiceover.helper import remove_bookmarks
+
+#: Compact codecs supported by :class:`CacheStoragePolicy`, mapped to
+#: the container format and the ffmpeg encoder used to produce them.
+COMPACT_CODECS = {
+    "opus": ("ogg", "libopus"),
+    "vorbis": ("ogg", "libvorbis"),
+    "mp3": ("mp3", "libmp3lame"),
+}
+
+SECONDS_PER_DAY = 24 * 60 * 60
+
+#: Lock held while reading or writing cache JSON files, so that voiceovers can
+#: be synthesized from several threads.
+CACHE_LOCK = threading.RLock()
+
+
+def get_input_data_key(input_data: dict) -> str:
+    return json.dumps(input_data, sort_keys=True, default=str)
+
+
+class CacheIndex:
+    """In-memory copy of the cache JSON file of a cache directory, indexed by
+    input data. It is shared by all the speech services and scenes of the
+    process that use the same cache directory, see :func:`get_cache_index`.
+
+    New and updated entries are only written to disk by :meth:`flush`, which
+    runs when a scene ends, after a prefetch and when the process exits.
+    Entries added to the file by another process in the meantime are kept.
+    """
+
+    def __init__(self, cache_dir: str):
+        self.json_path = Path(cache_dir) / DEFAULT_VOICEOVER_CACHE_JSON_FILENAME
+        self.entries = []
+        self.index = {}
+        self.dirty = False
+        self._mtime = None
+        self._load()
+
+    def _get_mtime(self) -> t.Optional[float]:
+        if not os.path.exists(self.json_path):
+            return None
+        return os.path.getmtime(self.json_path)
+
+    def _read(self) -> t.List[dict]:
+        if not os.path.exists(self.json_path):
+            return []
+        with open(self.json_path, "r") as f:
+            json_data = json.load(f)
+        if not isinstance(json_data, list):
+            raise ValueError("JSON file should be a list")
+        return json_data
+
+    def _load(self) -> None:
+        self._mtime = self._get_mtime()
+        self.entries = self._read()
+        self.index = {
+            get_input_data_key(entry["input_data"]): idx
+            for idx, entry in enumerate(self.entries)
+        }
+
+    def _refresh(self) -> None:
+        # Pick up changes made by another process, unless there are
+        # unsaved changes, which are merged when flushing instead
+        if not self.dirty and self._get_mtime() != self._mtime:
+            self._load()
+
+    def get(self, input_data: dict) -> t.Optional[dict]:
+        """Returns a copy of the entry with the given input data, if any."""
+        with CACHE_LOCK:
+            self._refresh()
+            idx = self.index.get(get_input_data_key(input_data))
+            if idx is None:
+                return None
+            return copy.deepcopy(self.entries[idx])
+
+    def get_entries(self) -> t.List[dict]:
+        """Returns a copy of all the entries."""
+        with CACHE_LOCK:
+            self._refresh()
+            return copy.deepcopy(self.entries)
+
+    def put(self, entry: dict) -> None:
+        """Replaces the entry that has the same input data as `entry`, or
+        appends it if there is none."""
+        with CACHE_LOCK:
+            self._refresh()
+            key = get_input_data_key(entry["input_data"])
+            entry = copy.deepcopy(entry)
+            if key in self.index:
+                self.entries[self.index[key]] = entry
+            else:
+                self.index[key] = len(self.entries)
+                self.entries.append(entry)
+            self.dirty = True
+
+    def replace(self, entries: t.List[dict]) -> None:
+        """Replaces all the entries and writes them to disk right away."""
+        with CACHE_LOCK:
+            self.entries = copy.deepcopy(entries)
+            self.index = {
+                get_input_data_key(entry["input_data"]): idx
+                for idx, entry in enumerate(self.entries)
+            }
+            self._write()
+
+    def flush(self) -> None:
+        """Writes the new and updated entries to disk."""
+        with CACHE_LOCK:
+            if not self.dirty:
+                return
+            if self._get_mtime() != self._mtime:
+                for entry in self._read():
+                    key = get_input_data_key(entry["input_data"])
+                    if key not in self.index:
+                        self.index[key] = len(self.entries)
+                        self.entries.append(entry)
+            self._write()
+
+    def _write(self) -> None:
+        os.makedirs(self.json_path.parent, exist_ok=True)
+        with open(self.json_path, "w") as f:
+            json.dump(self.entries, f, indent=2)
+        self._mtime = self._get_mtime()
+        self.dirty = False
+
+
+_CACHE_INDICES: t.Dict[str, CacheIndex] = {}
+
+
+def get_cache_index(cache_dir: str) -> CacheIndex:
+    """Returns the cache index of `cache_dir`, loading it on first use."""
+    key = os.path.abspath(cache_dir)
+    with CACHE_LOCK:
+        if key not in _CACHE_INDICES:
+            _CACHE_INDICES[key] = CacheIndex(cache_dir)
+        return _CACHE_INDICES[key]
+
+
+@atexit.register
+def flush_cache_indices() -> None:
+    """Writes the pending changes of all the cache indices to disk."""
+    for cache_index in list(_CACHE_INDICES.values()):
+        cache_index.flush()
+
+
+def load_cache_entries(cache_dir: str) -> t.List[dict]:
+    """Load all the entries of the cache JSON file in `cache_dir`."""
+    return get_cache_index(cache_dir).get_entries()
+
+
+def save_cache_entries(cache_dir: str, entries: t.List[dict]) -> None:
+    """Overwrite the cache JSON file in `cache_dir` with `entries`."""
+    get_cache_index(cache_dir).replace(entries)
+
+
+def update_cache_entry(cache_dir: str, entry: dict) -> None:
+    """Replace the cache entry that has the same input data as `entry`, or
+    append it if there is none. The change is written to disk by
+    :func:`flush_cache_indices`."""
+    get_cache_index(cache_dir).put(entry)
+
+
+def get_entry_audio_files(entry: dict) -> t.List[str]:
+    """Returns the audio files referenced by a cache entry, without duplicates."""
+    files = []
+    for key in ["original_audio", "final_audio"]:
+        if entry.get(key) is not None and entry[key] not in files:
+            files.append(entry[key])
+    return files
+
+
+def get_storage_info(entry: dict, cache_dir: str) -> dict:
+    """Describes how the audio files of a freshly created entry are stored."""
+    files = get_entry_audio_files(entry)
+    n_bytes = sum(
+        os.path.getsize(Path(cache_dir) / file)
+        for file in files
+        if os.path.exists(Path(cache_dir) / file)
+    )
+    codec = os.path.splitext(entry["final_audio"])[1][1:].lower()
+    return {"codec": codec, "bytes": n_bytes, "original_bytes": n_bytes}
+
+
+def get_audio_hash(path: str) -> str:
+    """Returns the SHA-256 hash of the content of an audio file."""
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def get_transcription_key(audio_path: str, transcriber: dict) -> str:
+    """Returns the key of a transcription in the transcription cache.
+
+    Args:
+        audio_path (str): The path to the transcribed audio file.
+        transcriber (dict): Describes the transcription model and its settings.
+
+    Returns:
+        str: A hash of the audio content and of `transcriber`.
+    """
+    dumped = json.dumps(
+        {"audio": get_audio_hash(audio_path), "transcriber": transcriber},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(dumped.encode("utf-8")).hexdigest()
+
+
+def load_transcriptions(cache_dir: str) -> t.Dict[str, dict]:
+    """Load the transcription cache in `cache_dir`, which maps the keys
+    returned by :func:`get_transcription_key` to the word boundaries and
+    transcribed text."""
+    json_path = Path(cache_dir) / DEFAULT_TRANSCRIPTION_CACHE_JSON_FILENAME
+    if not os.path.exists(json_path):
+        return {}
+
+    with open(json_path, "r") as f:
+        return json.load(f)
+
+
+def get_cached_transcription(cache_dir: str, key: str) -> t.Optional[dict]:
+    with CACHE_LOCK:
+        return load_transcriptions(cache_dir).get(key)
+
+
+def store_transcription(cache_dir: str, key: str, dict_: dict) -> None:
+    """Stores the word boundaries and transcribed text of `dict_` in the
+    transcription cache."""
+    with CACHE_LOCK:
+        transcriptions = load_transcriptions(cache_dir)
+        transcriptions[key] = {
+            "word_boundaries": dict_["word_boundaries"],
+            "transcribed_text": dict_.get("transcribed_text"),
+        }
+        json_path = Path(cache_dir) / DEFAULT_TRANSCRIPTION_CACHE_JSON_FILENAME
+        with open(json_path, "w") as f:
+            json.dump(transcriptions, f, indent=2)
+
+
+def estimate_chars_per_second(
+    cache_dir: str, voice: t.Optional[dict] = None, min_entries: int = 3
+) -> t.Optional[float]:
+    """Fits the speaking rate of a voice on the cached voiceovers.
+
+    Args:
+        cache_dir (str): The voiceover cache directory.
+        voice (t.Optional[dict], optional): The input data of the voice, without
+            the text. Only the entries with the same service and config are used.
+            Defaults to None, in which case all the entries are used.
+        min_entries (int, optional): Minimum number of entries needed for a fit.
+            Defaults to 3.
+
+    Returns:
+        t.Optional[float]: The number of characters spoken per second, or None if
+            there are not enough entries.
+    """
+    n_chars = 0
+    duration = 0.0
+    n_entries = 0
+    for entry in load_cache_entries(cache_dir):
+        input_data = dict(entry["input_data"])
+        if input_data.get("service") == "segments" or "audio_info" not in entry:
+            continue
+        input_text = input_data.pop("input_text")
+        if voice is not None and input_data != voice:
+            continue
+        n_chars += len(remove_bookmarks(input_text))
+        duration += entry["audio_info"]["duration"]
+        n_entries += 1
+
+    if n_entries < min_entries or duration <= 0:
+        return None
+    return n_chars / duration
+
+
+def get_cache_stats(cache_dir: str) -> dict:
+    """Returns the number of entries, the bytes currently used by the cached
+    audio and the bytes saved by compaction.
+
+    Args:
+        cache_dir (str): The voiceover cache directory.
+
+    Returns:
+        dict: A dictionary with the keys ``entries``, ``total_bytes``,
+            ``original_bytes`` and ``saved_bytes``.
+    """
+    entries = load_cache_entries(cache_dir)
+    total_bytes = 0
+    original_bytes = 0
+    for entry in entries:
+        storage = entry.get("storage")
+        if storage is None:
+            storage = get_storage_info(entry, cache_dir)
+        total_bytes += storage["bytes"]
+        original_bytes += storage.get("original_bytes", storage["bytes"])
+
+    return {
+        "entries": len(entries),
+        "total_bytes": total_bytes,
+        "original_bytes": original_bytes,
+        "saved_bytes": original_bytes - total_bytes,
+    }
+
+
+def touch_entry(entry: dict, cache_dir: str) -> None:
+    """Records an access to a cache entry, by refreshing the modification time
+    of its audio files."""
+    paths = [Path(cache_dir) / file for file in get_entry_audio_files(entry)]
+    paths += [
+        Path(cache_dir) / file
+        for file in entry.get("storage", {}).get("archive", {}).values()
+    ]
+    for path in paths:
+        if os.path.exists(path):
+            os.utime(path)
+
+
+def restore_entry(entry: dict, cache_dir: str) -> None:
+    """Decodes the compacted audio files of a cache entry back to their
+    original format, if they are missing, and records the access. Called on
+    every cache hit, whether or not the service has a storage policy."""
+    archive = entry.get("storage", {}).get("archive", {})
+    for audio_file, archive_file in archive.items():
+        audio_path = Path(cache_dir) / audio_file
+        archive_path = Path(cache_dir) / archive_file
+        if os.path.exists(audio_path) or not os.path.exists(archive_path):
+            continue
+        format_ = os.path.splitext(audio_file)[1][1:].lower()
+        AudioSegment.from_file(archive_path).export(audio_path, format=format_)
+        logger.info(f"Decoded {archive_file} to {audio_file}")
+    touch_entry(entry, cache_dir)
+
+
+class CacheStoragePolicy:
+    """Storage policy for the voiceover cache. Entries that have not been
+    accessed for a while are transcoded to a compact codec, and are decoded
+    back to their original format the next time they are hit.
+
+    The access time of an entry is the modification time of its audio files,
+    which is refreshed on every cache hit.
+    """
+
+    def __init__(
+        self,
+        codec: str = "opus",
+        bitrate: str = "32k",
+        cold_after_days: float = 30.0,
+    ):
+        """
+        Args:
+            codec (str, optional): The codec to transcode cold entries to.
+                One of ``"opus"``, ``"vorbis"`` or ``"mp3"``. Defaults to ``"opus"``.
+            bitrate (str, optional): The bitrate of the compact encoding. Defaults to ``"32k"``.
+            cold_after_days (float, optional): Number of days without access after
+                which an entry is considered cold. Defaults to 30.
+        """
+        if codec not in COMPACT_CODECS:
+            raise ValueError(
+                f"Unsupported codec {codec}. Choose one of: {', '.join(COMPACT_CODECS)}"
+            )
+        self.codec = codec
+        self.bitrate = bitrate
+        self.cold_after_days = cold_after_days
+
+    def get_archive_path(self, audio_file: str) -> str:
+        format_, _ = COMPACT_CODECS[self.codec]
+        return os.path.splitext(audio_file)[0] + "." + self.codec + "." + format_
+
+    def is_cold(self, entry: dict, cache_dir: str, now: float = None) -> bool:
+        if now is None:
+            now = time.time()
+        last_access = self.get_last_access(entry, cache_dir)
+        if last_access is None:
+            return False
+        return now - last_access > self.cold_after_days * SECONDS_PER_DAY
+
+    def get_last_access(self, entry: dict, cache_dir: str) -> t.Optional[float]:
+        paths = [Path(cache_dir) / file for file in get_entry_audio_files(entry)]
+        paths += [
+            Path(cache_dir) / file
+            for file in entry.get("storage", {}).get("archive", {}).values()
+        ]
+        mtimes = [os.path.getmtime(path) for path in paths if os.path.exists(path)]
+        if not mtimes:
+            return None
+        return max(mtimes)
+
+    def touch(self, entry: dict, cache_dir: str) -> None:
+        """Records an access to the entry, see :func:`touch_entry`."""
+        touch_entry(entry, cache_dir)
+
+    def restore(self, entry: dict, cache_dir: str) -> None:
+        """Decodes the compacted audio files of an entry, see :func:`restore_entry`."""
+        restore_entry(entry, cache_dir)
+
+    def compact_entry(self, entry: dict, cache_dir: str) -> bool:
+        """Transcodes the audio files of an entry to the compact codec and removes
+        the originals. Returns True if the entry was changed."""
+        storage = entry.get("storage")
+        if storage is None:
+            storage = get_storage_info(entry, cache_dir)
+
+        if "archive" in storage:
+            # Already compacted, only remove the decoded working copies
+            for audio_file in storage.get("archive", {}):
+                audio_path = Path(cache_dir) / audio_file
+                if os.path.exists(audio_path):
+                    os.remove(audio_path)
+            return False
+
+        format_, encoder = COMPACT_CODECS[self.codec]
+        archive = {}
+        n_bytes = 0
+        for audio_file in get_entry_audio_files(entry):
+            audio_path = Path(cache_dir) / audio_file
+            if not os.path.exists(audio_path):
+                logger.warning(f"Skipping missing cached audio file {audio_file}")
+                return False
+            archive_file = self.get_archive_path(audio_file)
+            archive_path = Path(cache_dir) / archive_file
+            AudioSegment.from_file(audio_path).export(
+                archive_path, format=format_, codec=encoder, bitrate=self.bitrate
+            )
+            # Keep the access time of the original
+            mtime = os.path.getmtime(audio_path)
+            os.utime(archive_path, (mtime, mtime))
+            archive[audio_file] = archive_file
+            n_bytes += os.path.getsize(archive_path)
+
+        for audio_file in archive:
+            os.remove(Path(cache_dir) / audio_file)
+
+        entry["storage"] = {
+            "codec": self.codec,
+            "bitrate": self.bitrate,
+            "bytes": n_bytes,
+            "original_codec": storage["codec"],
+            "original_bytes": storage.get("original_bytes", storage["bytes"]),
+            "archive": archive,
+        }
+        return True
+
+    def compact(self, cache_dir: str) -> dict:
+        """Transcodes all the cold entries in the cache directory.
+
+        Args:
+            cache_dir (str): The voiceover cache directory.
+
+        Returns:
+            dict: The cache statistics after compaction, see :func:`get_cache_stats`.
+        """
+        entries = load_cache_entries(cache_dir)
+        now = time.time()
+        changed = False
+        for entry in entries:
+            if not self.is_cold(entry, cache_dir, now=now):
+                continue
+            if self.compact_entry(entry, cache_dir):
+                logger.info(f"Compacted {entry['final_audio']}")
+                changed = True
+
+        if changed:
+            save_cache_entries(cache_dir, entries)
+        return get_cache_stats(cache_dir)
+
+
+def format_bytes(n_bytes: int) -> str:
+    for unit in ["B", "KB", "MB", "GB"]:
+        if abs(n_bytes) < 1024:
+            return f"{n_bytes:.1f} {unit}"
+        n_bytes /= 1024
+    return f"{n_bytes:.1f} TB"
+
+
+parser = argparse.ArgumentParser(description="Manage the voiceover cache")
+parser.add_argument(
+    "command",
+    type=str,
+    choices=["stats", "compact"],
+    help="Show cache statistics or compact cold entries",
+)
+parser.add_argument(
+    "cache_dir",
+    type=Path,
+    nargs="?",
+    default=Path("media") / DEFAULT_VOICEOVER_CACHE_DIR,
+    help="Voiceover cache directory",
+)
+parser.add_argument(
+    "--codec",
+    type=str,
+    default="opus",
+    choices=list(COMPACT_CODECS),
+    help="Codec to transcode cold entries to",
+)
+parser.add_argument(
+    "--bitrate",
+    type=str,
+    default="32k",
+    help="Bitrate of the compact encoding",
+)
+parser.add_argument(
+    "--cold-after-days",
+    type=float,
+    default=30.0,
+    help="Number of days without access after which an entry is compacted",
+)
+
+
+def main():
+    args = parser.parse_args()
+
+    if not os.path.exists(args.cache_dir):
+        raise FileNotFoundError(f"Cache directory {args.cache_dir} does not exist")
+
+    if args.command == "compact":
+        policy = CacheStoragePolicy(
+            codec=args.codec,
+            bitrate=args.bitrate,
+            cold_after_days=args.cold_after_days,
+        )
+        stats = policy.compact(args.cache_dir)
+    else:
+        stats = get_cache_stats(args.cache_dir)
+
+    print(f"Entries: {stats['entries']}")
+    print(f"Total size: {format_bytes(stats['total_bytes'])}")
+    print(f"Saved by compaction: {format_bytes(stats['saved_bytes'])}")
+
+
+if __name__ == "__main__":
+    main()
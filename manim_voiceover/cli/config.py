@@ -18,6 +18,12 @@ def patched_digest_args(self, args, namespace=''):
     # Handle our custom CLI flags
     if hasattr(args, 'use_cloud_whisper'):
         self.use_cloud_whisper = args.use_cloud_whisper
+    if hasattr(args, 'voiceover_prefetch'):
+        self.voiceover_prefetch = args.voiceover_prefetch
+    if hasattr(args, 'voiceover_draft'):
+        self.voiceover_draft = args.voiceover_draft
+    if hasattr(args, 'voiceover_preview'):
+        self.voiceover_preview = args.voiceover_preview
         
 # Apply the monkey patch
 manim_config.ManimConfig.digest_args = patched_digest_args
@@ -25,6 +31,12 @@ manim_config.ManimConfig.digest_args = patched_digest_args
 # Make sure the config object has our flag
 if not hasattr(manim_config.config, 'use_cloud_whisper'):
     manim_config.config.use_cloud_whisper = False
+if not hasattr(manim_config.config, 'voiceover_prefetch'):
+    manim_config.config.voiceover_prefetch = False
+if not hasattr(manim_config.config, 'voiceover_draft'):
+    manim_config.config.voiceover_draft = False
+if not hasattr(manim_config.config, 'voiceover_preview'):
+    manim_config.config.voiceover_preview = False
 
 def add_voiceover_args(parser):
     """Add manim-voiceover specific arguments to the parser."""
@@ -33,4 +45,19 @@ def add_voiceover_args(parser):
         "--use-cloud-whisper",
         action="store_true",
         help="Use OpenAI's cloud Whisper API instead of local model for transcription",
-    ) 
\ No newline at end of file
+    ) 
+    whisper_group.add_argument(
+        "--voiceover-prefetch",
+        action="store_true",
+        help="Collect all voiceovers in a dry pass and synthesize them in bulk before rendering",
+    )
+    whisper_group.add_argument(
+        "--voiceover-draft",
+        action="store_true",
+        help="Skip synthesis and use silent placeholders with estimated durations",
+    )
+    whisper_group.add_argument(
+        "--voiceover-preview",
+        action="store_true",
+        help="Only write the narration track and timeline, without rendering frames",
+    )
@@ -25,6 +25,15 @@ def patched_render_command(function):
     cmd = option('--use-cloud-whisper', 
                  is_flag=True, 
                  help='Use OpenAI cloud API for Whisper instead of local model')(cmd)
+    cmd = option('--voiceover-prefetch',
+                 is_flag=True,
+                 help='Collect all voiceovers in a dry pass and synthesize them in bulk before rendering')(cmd)
+    cmd = option('--voiceover-draft',
+                 is_flag=True,
+                 help='Skip synthesis and use silent placeholders with estimated durations')(cmd)
+    cmd = option('--voiceover-preview',
+                 is_flag=True,
+                 help='Only write the narration track and timeline, without rendering frames')(cmd)
     
     return cmd
 
@@ -36,6 +45,9 @@ def patched_main():
     # Create a dummy parser just to intercept the args
     dummy_parser = argparse.ArgumentParser(add_help=False)
     dummy_parser.add_argument("--use-cloud-whisper", action="store_true")
+    dummy_parser.add_argument("--voiceover-prefetch", action="store_true")
+    dummy_parser.add_argument("--voiceover-draft", action="store_true")
+    dummy_parser.add_argument("--voiceover-preview", action="store_true")
     
     # Parse known args to get our flags
     args, unknown = dummy_parser.parse_known_args()
@@ -44,6 +56,12 @@ def patched_main():
     from manim.config import config
     if hasattr(args, 'use_cloud_whisper') and args.use_cloud_whisper:
         config.use_cloud_whisper = True
+    if args.voiceover_prefetch:
+        config.voiceover_prefetch = True
+    if args.voiceover_draft:
+        config.voiceover_draft = True
+    if args.voiceover_preview:
+        config.voiceover_preview = True
     
     # Call the original main command
     return original_main_command()
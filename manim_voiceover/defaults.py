@@ -2,6 +2,7 @@ from pathlib import Path
 
 DEFAULT_VOICEOVER_CACHE_DIR = "voiceovers"
 DEFAULT_VOICEOVER_CACHE_JSON_FILENAME = "cache.json"
+DEFAULT_TRANSCRIPTION_CACHE_JSON_FILENAME = "transcriptions.json"
 
 #: Available source languages for DeepL
 DEEPL_SOURCE_LANG = {
@@ -0,0 +1,513 @@
+"""
+A synthesis gateway shared by many render workers. Workers send synthesis and
+transcription jobs over HTTP, see
+:class:`~manim_voiceover.services.gateway.GatewayService`. The gateway
+deduplicates identical jobs that are in flight, coalesces the other ones into
+backend batches, enforces a global rate limit on backend requests and serves
+results from a content-addressed cache.
+"""
+
+import argparse
+import base64
+import hashlib
+import importlib
+import json
+import os
+import tempfile
+import threading
+import time
+import typing as t
+from concurrent.futures import Future, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from manim import logger
+
+DEFAULT_GATEWAY_PORT = 8765
+
+SYNTHESIZE = "synthesize"
+TRANSCRIBE = "transcribe"
+
+
+def get_job_key(kind: str, payload: dict, config: dict) -> str:
+    """Returns the content address of a job, a hash of its kind, payload and
+    config."""
+    dumped = json.dumps(
+        {"kind": kind, "payload": payload, "config": config}, sort_keys=True
+    )
+    return hashlib.sha256(dumped.encode("utf-8")).hexdigest()
+
+
+class TokenBucket:
+    """Rate limiter that allows `rate` requests per second on average, with
+    bursts of up to `capacity` requests."""
+
+    def __init__(self, rate: float, capacity: t.Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Blocks until `tokens` tokens are available, and takes them.
+
+        Returns:
+            float: The time spent waiting, in seconds.
+        """
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.capacity, self.tokens + (now - self.updated_at) * self.rate
+                )
+                self.updated_at = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return waited
+                delay = (tokens - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class ContentCache:
+    """Stores the results of jobs by job key, and their audio by the hash of
+    its content, so that identical audio is only stored once."""
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = Path(cache_dir)
+        os.makedirs(self.cache_dir / "jobs", exist_ok=True)
+        os.makedirs(self.cache_dir / "blobs", exist_ok=True)
+
+    def get(self, key: str) -> t.Optional[dict]:
+        path = self.cache_dir / "jobs" / f"{key}.json"
+        if not path.exists():
+            return None
+        with open(path, "r") as f:
+            return json.load(f)
+
+    def put(self, key: str, result: dict) -> dict:
+        """Stores a result. If it has ``audio`` bytes, they are moved to a blob
+        and replaced by its name in ``audio_blob``.
+
+        Returns:
+            dict: The stored result.
+        """
+        result = dict(result)
+        audio = result.pop("audio", None)
+        if audio is not None:
+            blob = hashlib.sha256(audio).hexdigest() + "." + result.pop("extension")
+            blob_path = self.cache_dir / "blobs" / blob
+            if not blob_path.exists():
+                with open(blob_path, "wb") as f:
+                    f.write(audio)
+            result["audio_blob"] = blob
+
+        # Written to a temporary file first so that readers never see half a file
+        path = self.cache_dir / "jobs" / f"{key}.json"
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(result, f, indent=2)
+        os.replace(tmp_path, path)
+        return result
+
+    def get_blob_path(self, blob: str) -> t.Optional[Path]:
+        path = self.cache_dir / "blobs" / os.path.basename(blob)
+        if not path.exists():
+            return None
+        return path
+
+
+class Gateway:
+    """Runs synthesis and transcription jobs on a backend.
+
+    The backend implements ``synthesize(config, texts)``, which returns a
+    dictionary with the ``audio`` bytes, their ``extension`` and the ``data``
+    of the voiceover (word boundaries, ...) for each text, and
+    ``transcribe(config, clips)``, which returns the ``data`` of each
+    ``(audio, extension)`` clip. See :class:`SpeechServiceBackend`.
+    """
+
+    def __init__(
+        self,
+        backend,
+        cache_dir: str,
+        batch_window: float = 0.05,
+        max_batch_size: int = 16,
+        requests_per_second: t.Optional[float] = None,
+        max_concurrency: int = 4,
+    ):
+        """
+        Args:
+            backend: The backend that runs the jobs.
+            cache_dir (str): The directory of the content-addressed cache.
+            batch_window (float, optional): How long to wait for more jobs before
+                sending a batch to the backend, in seconds. Defaults to 0.05.
+            max_batch_size (int, optional): Maximum number of jobs per batch.
+                Defaults to 16.
+            requests_per_second (float, optional): Maximum number of backend
+                requests per second, counting one request per job. Defaults to
+                None, i.e. no limit.
+            max_concurrency (int, optional): Maximum number of batches running
+                at the same time. Backends run the jobs of a batch one after the
+                other, so this is also the maximum number of concurrent backend
+                requests. Defaults to 4.
+        """
+        self.backend = backend
+        self.cache = ContentCache(cache_dir)
+        self.batch_window = batch_window
+        self.max_batch_size = max_batch_size
+        self.rate_limiter = None
+        if requests_per_second is not None:
+            self.rate_limiter = TokenBucket(requests_per_second)
+
+        self.lock = threading.Condition()
+        self.in_flight: t.Dict[str, Future] = {}
+        self.pending: t.List[t.Tuple[str, str, dict, dict]] = []
+        self.stats = {
+            "jobs": 0,
+            "cache_hits": 0,
+            "deduplicated": 0,
+            "batches": 0,
+            "backend_jobs": 0,
+            "rate_limited_seconds": 0.0,
+        }
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency)
+        self._closed = False
+        self._dispatcher = threading.Thread(target=self._dispatch, daemon=True)
+        self._dispatcher.start()
+
+    def submit(self, kind: str, payload: dict, config: dict) -> Future:
+        """Submits a job, or joins the identical job that is already in flight.
+
+        Args:
+            kind (str): ``"synthesize"`` or ``"transcribe"``.
+            payload (dict): ``{"text": ...}`` for synthesis, or
+                ``{"audio": <base64>, "extension": ...}`` for transcription.
+            config (dict): The settings of the job, passed to the backend.
+
+        Returns:
+            Future: A future that resolves to the cached result.
+        """
+        key = get_job_key(kind, payload, config)
+        with self.lock:
+            self.stats["jobs"] += 1
+            if key in self.in_flight:
+                self.stats["deduplicated"] += 1
+                return self.in_flight[key]
+
+            future = Future()
+            cached = self.cache.get(key)
+            if cached is not None:
+                self.stats["cache_hits"] += 1
+                future.set_result(cached)
+                return future
+
+            self.in_flight[key] = future
+            self.pending.append((key, kind, payload, config))
+            self.lock.notify()
+        return future
+
+    def close(self) -> None:
+        with self.lock:
+            self._closed = True
+            self.lock.notify()
+        self._dispatcher.join()
+        self._executor.shutdown(wait=True)
+
+    def _dispatch(self) -> None:
+        while True:
+            with self.lock:
+                while not self.pending and not self._closed:
+                    self.lock.wait()
+                if self._closed and not self.pending:
+                    return
+
+            # Let concurrent requests join the batch
+            time.sleep(self.batch_window)
+
+            with self.lock:
+                batches = self._take_batches()
+            for batch in batches:
+                self._executor.submit(self._run_batch, batch)
+
+    def _take_batches(self) -> t.List[t.List[tuple]]:
+        """Groups the pending jobs by kind and config, in batches of at most
+        `max_batch_size` jobs."""
+        groups = {}
+        for job in self.pending:
+            _, kind, _, config = job
+            group_key = (kind, json.dumps(config, sort_keys=True))
+            groups.setdefault(group_key, []).append(job)
+        self.pending = []
+
+        batches = []
+        for jobs in groups.values():
+            for idx in range(0, len(jobs), self.max_batch_size):
+                batches.append(jobs[idx : idx + self.max_batch_size])
+        return batches
+
+    def _run_batch(self, batch: t.List[tuple]) -> None:
+        _, kind, _, config = batch[0]
+        try:
+            # Backends may send one request per job, so each job takes a token
+            if self.rate_limiter is not None:
+                waited = sum(self.rate_limiter.acquire() for _ in batch)
+                with self.lock:
+                    self.stats["rate_limited_seconds"] += waited
+
+            if kind == SYNTHESIZE:
+                results = self.backend.synthesize(
+                    config, [payload["text"] for _, _, payload, _ in batch]
+                )
+            elif kind == TRANSCRIBE:
+                results = self.backend.transcribe(
+                    config,
+                    [
+                        (base64.b64decode(payload["audio"]), payload["extension"])
+                        for _, _, payload, _ in batch
+                    ],
+                )
+            else:
+                raise ValueError(f"Unknown job kind {kind!r}")
+            if len(results) != len(batch):
+                raise ValueError(
+                    f"The backend returned {len(results)} results for {len(batch)} jobs"
+                )
+
+            with self.lock:
+                self.stats["batches"] += 1
+                self.stats["backend_jobs"] += len(batch)
+            stored = [
+                self.cache.put(key, result)
+                for (key, _, _, _), result in zip(batch, results)
+            ]
+        except Exception as e:
+            logger.error(f"Gateway batch of {len(batch)} {kind} jobs failed: {e}")
+            with self.lock:
+                for key, _, _, _ in batch:
+                    self.in_flight.pop(key).set_exception(e)
+            return
+
+        with self.lock:
+            for (key, _, _, _), result in zip(batch, stored):
+                self.in_flight.pop(key).set_result(result)
+
+
+class SpeechServiceBackend:
+    """Gateway backend that synthesizes with a speech service, in batches with
+    :meth:`~manim_voiceover.services.base.SpeechService.prefetch`, and
+    transcribes with
+    :meth:`~manim_voiceover.transcription.CloudWhisperTranscriber.transcribe_batch`.
+
+    The config of a synthesis job holds keyword arguments of the speech
+    service, e.g. the voice. One speech service is created per config.
+    """
+
+    def __init__(
+        self, service_class, cache_dir: str, service_kwargs: t.Optional[dict] = None
+    ):
+        """
+        Args:
+            service_class: The class of the speech service.
+            cache_dir (str): The cache directory of the speech services.
+            service_kwargs (dict, optional): Keyword arguments of all the speech
+                services, overridden by the config of the jobs. Defaults to None.
+        """
+        self.service_class = service_class
+        self.cache_dir = cache_dir
+        self.service_kwargs = service_kwargs or {}
+        self._services = {}
+        self._lock = threading.Lock()
+
+    def get_speech_service(self, config: dict):
+        """Returns the speech service of a config, creating it on first use.
+
+        Raises:
+            TypeError: If the config has arguments unknown to the speech service.
+        """
+        key = json.dumps(config, sort_keys=True)
+        with self._lock:
+            if key not in self._services:
+                self._services[key] = self.service_class(
+                    cache_dir=self.cache_dir, **dict(self.service_kwargs, **config)
+                )
+            return self._services[key]
+
+    def synthesize(self, config: dict, texts: t.List[str]) -> t.List[dict]:
+        speech_service = self.get_speech_service(config)
+        results = []
+        # The gateway already runs several batches concurrently
+        for dict_ in speech_service.prefetch(texts, max_workers=1):
+            audio_path = Path(speech_service.cache_dir) / dict_["final_audio"]
+            with open(audio_path, "rb") as f:
+                audio = f.read()
+            results.append(
+                {
+                    "audio": audio,
+                    "extension": audio_path.suffix[1:],
+                    "data": {
+                        key: dict_[key]
+                        for key in ["word_boundaries", "bookmarks", "transcribed_text"]
+                        if key in dict_
+                    },
+                }
+            )
+        return results
+
+    def transcribe(
+        self, config: dict, clips: t.List[t.Tuple[bytes, str]]
+    ) -> t.List[dict]:
+        from manim_voiceover.transcription import CloudWhisperTranscriber
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            paths = []
+            for idx, (audio, extension) in enumerate(clips):
+                path = os.path.join(tmp_dir, f"{idx}.{extension}")
+                with open(path, "wb") as f:
+                    f.write(audio)
+                paths.append(path)
+            transcriber = CloudWhisperTranscriber(**config)
+            return [{"data": result} for result in transcriber.transcribe_batch(paths)]
+
+
+def make_handler(gateway: Gateway):
+    class GatewayHandler(BaseHTTPRequestHandler):
+        def _send_json(self, data: dict, status: int = 200) -> None:
+            body = json.dumps(data).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            kind = self.path.strip("/")
+            if kind not in [SYNTHESIZE, TRANSCRIBE]:
+                return self._send_json({"error": f"Unknown path {self.path}"}, 404)
+
+            request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            config = request.pop("config", {})
+            try:
+                result = gateway.submit(kind, request, config).result()
+            except Exception as e:
+                return self._send_json({"error": str(e)}, 502)
+            self._send_json(result)
+
+        def do_GET(self):
+            if self.path == "/stats":
+                with gateway.lock:
+                    return self._send_json(dict(gateway.stats))
+
+            if self.path.startswith("/blobs/"):
+                path = gateway.cache.get_blob_path(self.path[len("/blobs/") :])
+                if path is not None:
+                    with open(path, "rb") as f:
+                        body = f.read()
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/octet-stream")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                    return
+            self._send_json({"error": f"Not found: {self.path}"}, 404)
+
+        def log_message(self, format, *args):
+            logger.debug(format % args)
+
+    return GatewayHandler
+
+
+def create_server(
+    gateway: Gateway, host: str = "127.0.0.1", port: int = DEFAULT_GATEWAY_PORT
+) -> ThreadingHTTPServer:
+    """Creates the HTTP server of a gateway. Each request is handled in its own
+    thread, so that concurrent requests can be batched together.
+
+    Endpoints:
+        - ``POST /synthesize`` with ``{"text": ..., "config": {...}}``
+        - ``POST /transcribe`` with ``{"audio": <base64>, "extension": ..., "config": {...}}``
+        - ``GET /blobs/<name>`` returns the audio referenced by ``audio_blob``
+        - ``GET /stats``
+    """
+    return ThreadingHTTPServer((host, port), make_handler(gateway))
+
+
+def load_class(path: str):
+    """Loads a class from a ``module:Class`` path."""
+    module_name, class_name = path.split(":")
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+parser = argparse.ArgumentParser(
+    description="Run a synthesis gateway shared by several render workers"
+)
+parser.add_argument(
+    "--service",
+    type=str,
+    required=True,
+    help="Speech service of the backend, e.g. manim_voiceover.services.gtts:GTTSService",
+)
+parser.add_argument(
+    "--service-kwargs",
+    type=json.loads,
+    default={},
+    help="Keyword arguments of the speech service, as JSON",
+)
+parser.add_argument(
+    "--cache-dir",
+    type=str,
+    default="gateway_cache",
+    help="Directory of the gateway cache",
+)
+parser.add_argument("--host", type=str, default="127.0.0.1", help="Host to bind to")
+parser.add_argument(
+    "--port", type=int, default=DEFAULT_GATEWAY_PORT, help="Port to listen on"
+)
+parser.add_argument(
+    "--batch-window",
+    type=float,
+    default=0.05,
+    help="Seconds to wait for more jobs before sending a batch",
+)
+parser.add_argument(
+    "--max-batch-size", type=int, default=16, help="Maximum number of jobs per batch"
+)
+parser.add_argument(
+    "--rate",
+    type=float,
+    default=None,
+    help="Maximum number of backend requests per second",
+)
+
+
+def main():
+    args = parser.parse_args()
+    backend = SpeechServiceBackend(
+        load_class(args.service),
+        str(Path(args.cache_dir) / "service"),
+        args.service_kwargs,
+    )
+    speech_service = backend.get_speech_service({})
+    gateway = Gateway(
+        backend,
+        args.cache_dir,
+        batch_window=args.batch_window,
+        max_batch_size=args.max_batch_size,
+        requests_per_second=args.rate,
+        max_concurrency=speech_service.max_concurrency,
+    )
+    server = create_server(gateway, args.host, args.port)
+    logger.info(f"Gateway listening on http://{args.host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        gateway.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Folds the audio of the current voiceover into manim's animation hashes, so
+that partial movie files are only reused when the voiceover they were rendered
+for is unchanged.
+"""
+
+import json
+import os
+import typing as t
+import zlib
+from pathlib import Path
+
+from manim import config, logger
+from manim.renderer import cairo_renderer
+
+original_get_hash_from_play_call = cairo_renderer.get_hash_from_play_call
+
+
+def patched_get_hash_from_play_call(
+    scene_object, camera_object, animations_list, current_mobjects_list
+) -> str:
+    hash_ = original_get_hash_from_play_call(
+        scene_object, camera_object, animations_list, current_mobjects_list
+    )
+    # Only voiceover scenes salt their hashes
+    salt_hash = getattr(scene_object, "_salt_animation_hash", None)
+    if salt_hash is None:
+        return hash_
+    return salt_hash(hash_)
+
+
+def install() -> None:
+    """Patches manim's Cairo renderer to use :func:`patched_get_hash_from_play_call`.
+    Called by :class:`~manim_voiceover.voiceover_scene.VoiceoverScene` when a
+    speech service is set."""
+    cairo_renderer.get_hash_from_play_call = patched_get_hash_from_play_call
+
+
+def salt_hash(hash_: str, salt: str) -> str:
+    return f"{hash_}_{zlib.crc32(salt.encode())}"
+
+
+def rename_partial_movie_file(renderer, old_hash: str, new_hash: str) -> None:
+    """Renames the partial movie file of an animation that was rendered under
+    a provisional hash, and the references to it in the renderer, so that the
+    next render can reuse it.
+
+    Args:
+        renderer: The Cairo renderer of the scene.
+        old_hash (str): The hash the animation was rendered under.
+        new_hash (str): The final hash of the animation.
+    """
+    file_writer = renderer.file_writer
+    extension = config["movie_file_extension"]
+    old_name = f"{old_hash}{extension}"
+    new_name = f"{new_hash}{extension}"
+    old_path = os.path.join(file_writer.partial_movie_directory, old_name)
+    if os.path.exists(old_path):
+        os.replace(old_path, os.path.join(file_writer.partial_movie_directory, new_name))
+
+    file_lists = [getattr(file_writer, "partial_movie_files", None)]
+    file_lists += [section.partial_movie_files for section in getattr(file_writer, "sections", [])]
+    for files in file_lists:
+        for idx, path in enumerate(files or []):
+            if path is not None and os.path.basename(path) == old_name:
+                files[idx] = os.path.join(os.path.dirname(path), new_name)
+
+    hashes = getattr(renderer, "animations_hashes", [])
+    for idx, hash_ in enumerate(hashes):
+        if hash_ == old_hash:
+            hashes[idx] = new_hash
+
+
+def get_invalidation_reasons(block: dict, previous: t.Optional[dict]) -> t.List[str]:
+    """Explains why the animations of a voiceover block were rendered again
+    instead of being reused from the partial movie files.
+
+    Args:
+        block (dict): The voiceover block of the current render.
+        previous (t.Optional[dict]): The block at the same position in the
+            previous render, if any.
+
+    Returns:
+        t.List[str]: The reasons, empty if all the animations were reused.
+    """
+    if all(block["cached"]):
+        return []
+    if previous is None:
+        return ["new voiceover"]
+
+    reasons = []
+    if block["text"] != previous["text"]:
+        reasons.append("text changed")
+    if block["audio_hash"] != previous["audio_hash"]:
+        reasons.append("audio changed")
+    if abs(block["duration"] - previous["duration"]) > 1e-6:
+        reasons.append(
+            f"duration changed from {previous['duration']:.2f}s to {block['duration']:.2f}s"
+        )
+    if block["animation_hashes"] != previous["animation_hashes"]:
+        reasons.append("animations changed")
+    if not reasons:
+        reasons.append("partial movie files missing")
+    return reasons
+
+
+def write_invalidation_report(blocks: t.List[dict], path: str) -> t.List[dict]:
+    """Compares the voiceover blocks of a render with the ones of the previous
+    render of the scene, logs which blocks were rendered again and why, and
+    stores the blocks in `path` for the next render.
+
+    Args:
+        blocks (t.List[dict]): The voiceover blocks, with the keys ``text``,
+            ``audio_hash``, ``duration``, ``animation_hashes`` and ``cached``.
+        path (str): The JSON file with the blocks of the previous render.
+
+    Returns:
+        t.List[dict]: The blocks, with their ``reasons``.
+    """
+    previous_blocks = []
+    if os.path.exists(path):
+        with open(path, "r") as f:
+            previous_blocks = json.load(f)["blocks"]
+
+    for idx, block in enumerate(blocks):
+        previous = previous_blocks[idx] if idx < len(previous_blocks) else None
+        block["reasons"] = get_invalidation_reasons(block, previous)
+        if block["reasons"]:
+            logger.info(
+                f"Voiceover {idx} ({block['text'][:40]!r}) rendered again: "
+                + ", ".join(block["reasons"])
+            )
+
+    n_invalidated = sum(1 for block in blocks if block["reasons"])
+    logger.info(
+        f"{len(blocks) - n_invalidated} of {len(blocks)} voiceover blocks reused from cache"
+    )
+
+    os.makedirs(Path(path).parent, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({"blocks": blocks}, f, indent=2)
+    return blocks
@@ -17,8 +17,79 @@ def chunks(lst: list, n: int):
         yield lst[i : i + n]
 
 
+#: Matches a bookmark tag, e.g. ``<bookmark mark='intro-1'/>``. Marks can hold
+#: any character but their own quote, like XML attributes.
+BOOKMARK_PATTERN = r"""<bookmark\s*mark\s*=\s*(?:'[^']*'|"[^"]*")\s*/>"""
+
+
 def remove_bookmarks(input: str) -> str:
-    return re.sub("<bookmark\s*mark\s*=['\"]\w*[\"']\s*/>", "", input)
+    return re.sub(BOOKMARK_PATTERN, "", input)
+
+
+def get_bookmark_mark(tag: str) -> str:
+    """Returns the mark of a bookmark tag matched by :data:`BOOKMARK_PATTERN`."""
+    return re.match(r"<bookmark\s*mark\s*=\s*(['\"])(.*)\1", tag).group(2)
+
+
+def format_bookmark(mark: str) -> str:
+    """Returns the bookmark tag of `mark`, quoted so that
+    :data:`BOOKMARK_PATTERN` matches it."""
+    if "'" in mark:
+        return f'<bookmark mark="{mark}"/>'
+    return f"<bookmark mark='{mark}'/>"
+
+
+def split_sentences(text: str) -> list:
+    """Split text into sentences at sentence-ending punctuation."""
+    return [s for s in re.split(r"(?<=[.!?])\s+", text.strip()) if s]
+
+
+def split_text(text: str, max_length: int) -> list:
+    """Split text into chunks of at most `max_length` characters, not counting
+    bookmarks. Splits at sentence boundaries where possible, then at clause
+    boundaries, then between words. Bookmarks are never split."""
+    # Whitespace inside a tag is followed by its closing ">" before any "<"
+    outside_tags = r"(?![^<]*>)"
+    patterns = [
+        r"(?<=[.!?])\s+" + outside_tags,
+        r"(?<=[,;:])\s+" + outside_tags,
+        r"\s+" + outside_tags,
+    ]
+
+    def pieces(segment: str, level: int) -> list:
+        if len(remove_bookmarks(segment)) <= max_length or level == len(patterns):
+            return [segment]
+        result = []
+        for sub in re.split(patterns[level], segment):
+            if sub:
+                result += pieces(sub, level + 1)
+        return result
+
+    chunks = []
+    current = ""
+    for piece in pieces(text.strip(), 0):
+        candidate = current + " " + piece if current else piece
+        if not current or len(remove_bookmarks(candidate)) <= max_length:
+            current = candidate
+        else:
+            chunks.append(current)
+            current = piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def array2mp3(samples, sample_rate: int, mp3_path, bitrate="312k"):
+    """Encode a mono float waveform in [-1, 1] directly to an mp3 file"""
+    import numpy as np
+
+    pcm = (np.clip(np.asarray(samples, dtype=np.float32), -1, 1) * 32767).astype(
+        np.int16
+    )
+    AudioSegment(
+        pcm.tobytes(), frame_rate=sample_rate, sample_width=2, channels=1
+    ).export(mp3_path, format="mp3", bitrate=bitrate)
+    logger.info(f"Saved {mp3_path}")
 
 
 def wav2mp3(wav_path, mp3_path=None, remove_wav=True, bitrate="312k"):
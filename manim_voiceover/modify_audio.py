@@ -1,7 +1,12 @@
 import os
 import sox
 import uuid
-from mutagen.mp3 import MP3
+import wave
+import mutagen
+import numpy as np
+from typing import List, Optional, Tuple
+from pydub import AudioSegment
+from pydub.silence import detect_silence
 
 
 def adjust_speed(input_path: str, output_path: str, tempo: float) -> None:
@@ -18,7 +23,337 @@ def adjust_speed(input_path: str, output_path: str, tempo: float) -> None:
         os.rename(output_path, input_path)
 
 
+def get_audio_info(path: str) -> dict:
+    """Reads the duration, sample rate, number of channels and size of an
+    audio file. Only the file headers are parsed, the audio is not decoded.
+
+    Args:
+        path (str): The path to the audio file.
+
+    Returns:
+        dict: A dictionary with the keys ``duration`` (in seconds),
+            ``sample_rate``, ``channels`` and ``bytes``.
+    """
+    n_bytes = os.path.getsize(path)
+    if str(path).lower().endswith(".wav"):
+        with wave.open(str(path), "rb") as f:
+            sample_rate = f.getframerate()
+            return {
+                "duration": f.getnframes() / sample_rate,
+                "sample_rate": sample_rate,
+                "channels": f.getnchannels(),
+                "bytes": n_bytes,
+            }
+
+    audio = mutagen.File(path)
+    if audio is None or audio.info is None:
+        raise ValueError(f"Could not read the audio metadata of {path}")
+    return {
+        "duration": audio.info.length,
+        # Opus streams don't report a sample rate, they are always decoded at 48 kHz
+        "sample_rate": getattr(audio.info, "sample_rate", 48000),
+        "channels": getattr(audio.info, "channels", None),
+        "bytes": n_bytes,
+    }
+
+
 def get_duration(path: str) -> float:
-    audio = MP3(path)
-    return audio.info.length
+    return get_audio_info(path)["duration"]
     # return sox.file_info.duration(path)
+
+
+def concatenate_audio(
+    input_paths: List[str], output_path: str, gap: float = 0.0, bitrate="312k"
+) -> List[float]:
+    """Concatenates audio files into one, with `gap` seconds of silence
+    between them.
+
+    Args:
+        input_paths (List[str]): The audio files to concatenate.
+        output_path (str): The path of the resulting audio file. The format is
+            inferred from its extension.
+        gap (float, optional): Duration of the silence between two files, in
+            seconds. Defaults to 0.
+        bitrate (str, optional): Bitrate used when encoding the result. Defaults to "312k".
+
+    Returns:
+        List[float]: The start time of each input in the resulting file, in seconds.
+    """
+    segments = [AudioSegment.from_file(path) for path in input_paths]
+    silence = AudioSegment.silent(duration=gap * 1000, frame_rate=segments[0].frame_rate)
+
+    combined = segments[0]
+    offsets = [0.0]
+    for segment in segments[1:]:
+        if gap > 0:
+            combined += silence
+        offsets.append(combined.duration_seconds)
+        combined += segment
+
+    format_ = os.path.splitext(output_path)[1][1:].lower()
+    combined.export(output_path, format=format_, bitrate=bitrate)
+    return offsets
+
+
+def find_split_points(
+    path: str,
+    n_parts: int,
+    windows: Optional[List[Tuple[float, float]]] = None,
+    weights: Optional[List[float]] = None,
+    max_ratio: float = 2.0,
+    min_silence_len: int = 150,
+) -> Optional[List[float]]:
+    """Finds where to cut an audio file that contains `n_parts` utterances
+    separated by pauses.
+
+    Args:
+        path (str): The path to the audio file.
+        n_parts (int): The number of utterances in the file.
+        windows (Optional[List[Tuple[float, float]]], optional): For each cut,
+            the time range in seconds it must fall in, e.g. from the end of the
+            last word of an utterance to the start of the next one. The cut is
+            placed in the longest pause of the window, or at its end if there is
+            none. Defaults to None, in which case the longest pauses of the file
+            are used.
+        weights (Optional[List[float]], optional): Only used without
+            `windows`. The expected share of each utterance in the speech, e.g.
+            its number of characters. The cuts are rejected if an utterance
+            gets more than `max_ratio` times its share, or less than its share
+            divided by `max_ratio`. Defaults to None, i.e. no check.
+        max_ratio (float, optional): See `weights`. Defaults to 2.
+        min_silence_len (int, optional): Minimum duration of a pause, in
+            milliseconds. Defaults to 150.
+
+    Returns:
+        Optional[List[float]]: The `n_parts - 1` cut points in seconds, or None
+            if the file doesn't contain enough pauses, or if the cuts don't match
+            the `weights`.
+    """
+    audio = AudioSegment.from_file(path)
+    pauses = [
+        (start / 1000, end / 1000)
+        for start, end in detect_silence(
+            audio, min_silence_len=min_silence_len, silence_thresh=audio.dBFS - 16
+        )
+    ]
+
+    if windows is not None:
+        cuts = []
+        for low, high in windows:
+            candidates = [
+                (min(end, high) - max(start, low), max(start, low), min(end, high))
+                for start, end in pauses
+                if start < high and low < end
+            ]
+            if candidates:
+                _, start, end = max(candidates)
+                cuts.append((start + end) / 2)
+            else:
+                cuts.append(high)
+        return cuts
+
+    # Leading and trailing silences don't separate utterances
+    speech_start = 0.0
+    speech_end = audio.duration_seconds
+    inner_pauses = []
+    for start, end in pauses:
+        if start <= 0:
+            speech_start = end
+        elif end >= audio.duration_seconds:
+            speech_end = start
+        else:
+            inner_pauses.append((start, end))
+    if len(inner_pauses) < n_parts - 1:
+        return None
+    longest = sorted(inner_pauses, key=lambda p: p[1] - p[0], reverse=True)
+    cuts = sorted((start + end) / 2 for start, end in longest[: n_parts - 1])
+
+    if weights is not None:
+        bounds = [speech_start] + cuts + [speech_end]
+        total = sum(weights)
+        for start, end, weight in zip(bounds, bounds[1:], weights):
+            expected = (speech_end - speech_start) * weight / total
+            if not expected / max_ratio <= end - start <= expected * max_ratio:
+                return None
+    return cuts
+
+
+def split_audio(
+    input_path: str, output_paths: List[str], cut_points: List[float], bitrate="312k"
+) -> None:
+    """Cuts an audio file at `cut_points` (in seconds) and saves the parts
+    to `output_paths`. The formats are inferred from the extensions."""
+    audio = AudioSegment.from_file(input_path)
+    bounds = [0.0] + list(cut_points) + [audio.duration_seconds]
+    for output_path, start, end in zip(output_paths, bounds, bounds[1:]):
+        format_ = os.path.splitext(output_path)[1][1:].lower()
+        audio[int(start * 1000) : int(end * 1000)].export(
+            output_path, format=format_, bitrate=bitrate
+        )
+
+
+def mix_audio(
+    clips: List[Tuple[str, float]],
+    output_path: str,
+    duration: Optional[float] = None,
+    frame_rate: int = 44100,
+    channels: int = 2,
+    gains: Optional[List[float]] = None,
+    bitrate="312k",
+) -> None:
+    """Mixes audio files into one track. The clips are decoded once and summed
+    into a single buffer, so overlapping clips are mixed in one pass.
+
+    Args:
+        clips (List[Tuple[str, float]]): The path and the start time in seconds
+            of each clip.
+        output_path (str): The path of the mixed audio file. The format is
+            inferred from its extension.
+        duration (Optional[float], optional): The duration of the track, in
+            seconds. Defaults to the end of the last clip.
+        frame_rate (int, optional): The sample rate of the track. Defaults to 44100.
+        channels (int, optional): The number of channels of the track. Defaults to 2.
+        gains (Optional[List[float]], optional): The gain of each clip in dB.
+            Defaults to None.
+        bitrate (str, optional): Bitrate used when encoding the result. Defaults to "312k".
+    """
+    decoded = []
+    for path, start in clips:
+        segment = (
+            AudioSegment.from_file(path)
+            .set_frame_rate(frame_rate)
+            .set_channels(channels)
+            .set_sample_width(2)
+        )
+        samples = np.array(segment.get_array_of_samples(), dtype=np.float32)
+        decoded.append((samples.reshape(-1, channels), int(round(start * frame_rate))))
+
+    n_frames = max([offset + len(samples) for samples, offset in decoded] + [0])
+    if duration is not None:
+        n_frames = max(n_frames, int(round(duration * frame_rate)))
+
+    track = np.zeros((n_frames, channels), dtype=np.float32)
+    for idx, (samples, offset) in enumerate(decoded):
+        if offset < 0:
+            samples = samples[-offset:]
+            offset = 0
+        if gains is not None and gains[idx]:
+            samples = samples * 10 ** (gains[idx] / 20)
+        track[offset : offset + len(samples)] += samples
+
+    track = np.clip(track, -32768, 32767).astype(np.int16)
+    mixed = AudioSegment(
+        track.tobytes(), frame_rate=frame_rate, sample_width=2, channels=channels
+    )
+    format_ = os.path.splitext(output_path)[1][1:].lower()
+    mixed.export(output_path, format=format_, bitrate=bitrate)
+
+
+def get_ducking_envelope(
+    intervals: List[Tuple[float, float]],
+    n_frames: int,
+    frame_rate: int,
+    duck_gain: float = -12.0,
+    attack: float = 0.1,
+    release: float = 0.3,
+) -> np.ndarray:
+    """Computes the gain of a music bed that is ducked under the voiceovers.
+    The gain ramps down to `duck_gain` over `attack` seconds before each
+    interval, and back up over `release` seconds after it.
+
+    Args:
+        intervals (List[Tuple[float, float]]): The start and end of each
+            voiceover, in seconds.
+        n_frames (int): The number of frames of the music.
+        frame_rate (int): The sample rate of the music.
+        duck_gain (float, optional): The gain of the music under the voiceovers,
+            in dB. Defaults to -12.
+        attack (float, optional): The duration of the fade down, in seconds.
+            Defaults to 0.1.
+        release (float, optional): The duration of the fade up, in seconds.
+            Defaults to 0.3.
+
+    Returns:
+        np.ndarray: The linear gain of each frame.
+    """
+    active = np.zeros(n_frames + 1, dtype=np.int32)
+    for start, end in intervals:
+        start = min(max(int(round(start * frame_rate)), 0), n_frames)
+        end = min(max(int(round(end * frame_rate)), 0), n_frames)
+        if end > start:
+            active[start] += 1
+            active[end] -= 1
+    active = np.cumsum(active[:-1]) > 0
+
+    # Distance of each frame to the previous and to the next voiced frame
+    idx = np.arange(n_frames)
+    previous = np.maximum.accumulate(np.where(active, idx, -(10**12)))
+    next_ = np.minimum.accumulate(np.where(active, idx, 10**12)[::-1])[::-1]
+    since = (idx - previous) / frame_rate
+    until = (next_ - idx) / frame_rate
+
+    depth = np.maximum(
+        np.clip(1 - until / max(attack, 1e-6), 0, 1),
+        np.clip(1 - since / max(release, 1e-6), 0, 1),
+    )
+    return 10 ** (duck_gain * depth / 20)
+
+
+def duck_audio(
+    music_path: str,
+    intervals: List[Tuple[float, float]],
+    output_path: str,
+    duration: Optional[float] = None,
+    gain: float = 0.0,
+    duck_gain: float = -12.0,
+    attack: float = 0.1,
+    release: float = 0.3,
+    loop: bool = True,
+    frame_rate: int = 44100,
+    channels: int = 2,
+    bitrate="312k",
+) -> None:
+    """Writes a music bed that is ducked under the voiceovers, see
+    :func:`get_ducking_envelope`. The envelope is applied to the whole track
+    in one pass.
+
+    Args:
+        music_path (str): The path to the music file.
+        intervals (List[Tuple[float, float]]): The start and end of each
+            voiceover, in seconds.
+        output_path (str): The path of the ducked music file. The format is
+            inferred from its extension.
+        duration (Optional[float], optional): The duration of the track, in
+            seconds. Defaults to the duration of the music.
+        gain (float, optional): The gain of the music outside the voiceovers, in dB.
+            Defaults to 0.
+        loop (bool, optional): Whether to loop the music if it is shorter than
+            `duration`. Defaults to True.
+        Other arguments are passed to :func:`get_ducking_envelope`.
+    """
+    segment = (
+        AudioSegment.from_file(music_path)
+        .set_frame_rate(frame_rate)
+        .set_channels(channels)
+        .set_sample_width(2)
+    )
+    samples = np.array(segment.get_array_of_samples(), dtype=np.float32)
+    samples = samples.reshape(-1, channels)
+
+    if duration is not None:
+        n_frames = int(round(duration * frame_rate))
+        if loop and 0 < len(samples) < n_frames:
+            samples = np.tile(samples, (-(-n_frames // len(samples)), 1))
+        samples = samples[:n_frames]
+
+    envelope = get_ducking_envelope(
+        intervals, len(samples), frame_rate, duck_gain, attack, release
+    )
+    samples = samples * (envelope * 10 ** (gain / 20))[:, None]
+
+    track = np.clip(samples, -32768, 32767).astype(np.int16)
+    ducked = AudioSegment(
+        track.tobytes(), frame_rate=frame_rate, sample_width=2, channels=channels
+    )
+    format_ = os.path.splitext(output_path)[1][1:].lower()
+    ducked.export(output_path, format=format_, bitrate=bitrate)
@@ -0,0 +1,148 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import typing as t
+from pathlib import Path
+
+from manim_voiceover.helper import remove_bookmarks
+from manim_voiceover.modify_audio import mix_audio
+
+
+def get_timeline(
+    trackers: list, gains: t.Optional[t.List[float]] = None
+) -> t.List[dict]:
+    """Describes when each voiceover and each bookmark happens in the scene.
+
+    Args:
+        trackers (list): The trackers of the voiceovers of the scene.
+        gains (t.Optional[t.List[float]], optional): The gain of each voiceover
+            in dB, i.e. the gain of its track. Defaults to None, i.e. 0 dB.
+
+    Returns:
+        t.List[dict]: For each voiceover, a dictionary with the keys ``text``,
+            ``start``, ``end``, ``audio``, ``gain`` and ``bookmarks``.
+    """
+    if gains is None:
+        gains = [0.0] * len(trackers)
+    timeline = []
+    for tracker, gain in zip(trackers, gains):
+        data = tracker.data
+        audio = None
+        if data["final_audio"] is not None:
+            audio = str(Path(tracker.cache_dir) / data["final_audio"])
+        timeline.append(
+            {
+                "text": remove_bookmarks(data["input_text"]),
+                "start": tracker.start_t,
+                "end": tracker.end_t,
+                "audio": audio,
+                "gain": gain,
+                "bookmarks": tracker.get_bookmark_times(),
+            }
+        )
+    return timeline
+
+
+def format_srt_time(seconds: float) -> str:
+    milliseconds = int(round(seconds * 1000))
+    hours, milliseconds = divmod(milliseconds, 3600_000)
+    minutes, milliseconds = divmod(milliseconds, 60_000)
+    seconds, milliseconds = divmod(milliseconds, 1000)
+    return f"{hours:02}:{minutes:02}:{seconds:02},{milliseconds:03}"
+
+
+def write_srt(timeline: t.List[dict], path: str) -> None:
+    with open(path, "w") as f:
+        for idx, item in enumerate(timeline):
+            f.write(f"{idx + 1}\n")
+            f.write(f"{format_srt_time(item['start'])} --> {format_srt_time(item['end'])}\n")
+            f.write(f"{item['text']}\n\n")
+
+
+def write_narration_preview(
+    trackers: list,
+    output_dir: str,
+    name: str,
+    duration: float,
+    gains: t.Optional[t.List[float]] = None,
+) -> t.Dict[str, str]:
+    """Writes the mixed narration track of a scene, and its timeline as JSON
+    and SRT files. The voiceovers are mixed like the tracks of the rendered
+    scene, see :meth:`~manim_voiceover.voiceover_scene.VoiceoverScene.mix_tracks`.
+
+    Args:
+        trackers (list): The trackers of the voiceovers of the scene.
+        output_dir (str): The directory to write the files to.
+        name (str): The base name of the files, usually the name of the scene.
+        duration (float): The duration of the scene, in seconds.
+        gains (t.Optional[t.List[float]], optional): The gain of each voiceover
+            in dB. Defaults to None, i.e. 0 dB.
+
+    Returns:
+        t.Dict[str, str]: The paths of the ``audio``, ``json`` and ``srt`` files.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    timeline = get_timeline(trackers, gains)
+    paths = {
+        "audio": str(Path(output_dir) / f"{name}.wav"),
+        "json": str(Path(output_dir) / f"{name}.json"),
+        "srt": str(Path(output_dir) / f"{name}.srt"),
+    }
+
+    clips = [item for item in timeline if item["audio"]]
+    mix_audio(
+        [(item["audio"], item["start"]) for item in clips],
+        paths["audio"],
+        duration=duration,
+        gains=[item["gain"] for item in clips],
+    )
+    with open(paths["json"], "w") as f:
+        json.dump({"scene": name, "duration": duration, "voiceovers": timeline}, f, indent=2)
+    write_srt(timeline, paths["srt"])
+    return paths
+
+
+parser = argparse.ArgumentParser(
+    description="Preview the narration of a scene without rendering any frame"
+)
+parser.add_argument(
+    "file",
+    type=str,
+    help="Python file containing the scene",
+)
+parser.add_argument(
+    "scene",
+    type=str,
+    help="Scene to preview",
+)
+parser.add_argument(
+    "--draft",
+    action="store_true",
+    help="Use placeholders with estimated durations instead of synthesizing",
+)
+
+
+def main():
+    args = parser.parse_args()
+
+    if not os.path.exists(args.file):
+        raise FileNotFoundError(f"File {args.file} does not exist")
+
+    env = dict(os.environ, MANIM_VOICEOVER_PREVIEW="1")
+    if args.draft:
+        env["MANIM_VOICEOVER_DRAFT"] = "1"
+
+    cmd = ["manim", "-ql", args.file, args.scene]
+    try:
+        result = subprocess.run(cmd, env=env).returncode
+    except KeyboardInterrupt:
+        print("KeyboardInterrupt")
+        sys.exit(0)
+
+    sys.exit(result)
+
+
+if __name__ == "__main__":
+    main()
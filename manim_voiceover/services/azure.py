@@ -1,16 +1,23 @@
 import os
+import queue
+import re
 import sys
+import threading
+import typing as t
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from dotenv import find_dotenv, load_dotenv
 from manim import logger
 
 from manim_voiceover.helper import (
+    BOOKMARK_PATTERN,
     create_dotenv_file,
     prompt_ask_missing_extras,
     remove_bookmarks,
 )
 from manim_voiceover.services.base import SpeechService
+from manim_voiceover.ssml import align_word_boundaries, is_ssml_document, ssml_to_text
 
 try:
     import azure.cognitiveservices.speech as speechsdk
@@ -22,6 +29,8 @@ except ImportError:
 
 load_dotenv(find_dotenv(usecwd=True))
 
+BOOKMARK_REGEX = re.compile(BOOKMARK_PATTERN)
+
 
 def serialize_word_boundary(wb):
     return {
@@ -34,6 +43,16 @@ def serialize_word_boundary(wb):
     }
 
 
+def remove_bookmark_offset(text_offset: int, bookmark_spans: list) -> int:
+    """Converts an offset in a text that contains bookmark tags into an
+    offset in the same text with the bookmark tags removed."""
+    shift = 0
+    for start, end in bookmark_spans:
+        if end <= text_offset:
+            shift += end - start
+    return text_offset - shift
+
+
 def create_dotenv_azure():
     logger.info(
         "Check out https://voiceover.manim.community/en/stable/services.html#azureservice to learn how to create an account and get your subscription key."
@@ -46,6 +65,44 @@ def create_dotenv_azure():
     sys.exit()
 
 
+class _PooledSynthesizer:
+    """A speech synthesizer with an open connection, together with the
+    events it collected during the current synthesis."""
+
+    def __init__(self, speech_config):
+        # No audio config, the audio is returned in memory
+        self.synthesizer = speechsdk.SpeechSynthesizer(
+            speech_config=speech_config, audio_config=None
+        )
+        self.word_boundaries = []
+        self.bookmarks = {}
+
+        def process_event(evt):
+            # print(f'{type(evt)=}')
+            result = {label[1:]: val for label, val in evt.__dict__.items()}
+            result["boundary_type"] = result["boundary_type"].name
+            return result
+
+        self.synthesizer.synthesis_word_boundary.connect(
+            lambda evt: self.word_boundaries.append(process_event(evt))
+        )
+        # Bookmark offsets are in ticks of 100 ns, same as AUDIO_OFFSET_RESOLUTION
+        self.synthesizer.bookmark_reached.connect(
+            lambda evt: self.bookmarks.__setitem__(evt.text, evt.audio_offset)
+        )
+
+        # Pre-connect so that the first request doesn't pay for the connection setup
+        self.connection = speechsdk.Connection.from_speech_synthesizer(
+            self.synthesizer
+        )
+        self.connection.open(True)
+
+    def speak_ssml(self, ssml: str):
+        self.word_boundaries = []
+        self.bookmarks = {}
+        return self.synthesizer.speak_ssml_async(ssml).get()
+
+
 class AzureService(SpeechService):
     """Speech service for Azure TTS API."""
 
@@ -56,6 +113,7 @@ class AzureService(SpeechService):
         style: str = None,
         output_format: str = "Audio48Khz192KBitRateMonoMp3",
         prosody: dict = None,
+        max_synthesizers: int = 1,
         **kwargs,
     ):
         """
@@ -64,6 +122,9 @@ class AzureService(SpeechService):
             style (str, optional): The style to use. See the `API page <https://learn.microsoft.com/en-us/azure/cognitive-services/speech-service/rest-text-to-speech?tabs=streaming#style>`__ to see how you can see available styles for a given voice. Defaults to None.
             output_format (str, optional): The output format to use. See the `API page <https://learn.microsoft.com/en-us/azure/cognitive-services/speech-service/rest-text-to-speech?tabs=streaming#audio-outputs>`__ for all the available options. Defaults to ``Audio48Khz192KBitRateMonoMp3``.
             prosody (dict, optional): Global prosody settings to use. See the `API page <https://learn.microsoft.com/en-us/azure/cognitive-services/speech-service/speech-synthesis-markup#adjust-prosody>`__ for all the available options. Defaults to None.
+            max_synthesizers (int, optional): Maximum number of synthesizers, and thus
+                of concurrent requests, used by :meth:`prefetch`. Synthesizers are
+                created lazily and reused. Defaults to 1.
         """
         prompt_ask_missing_extras(
             "azure.cognitiveservices.speech", "azure", "AzureService"
@@ -73,21 +134,85 @@ class AzureService(SpeechService):
         self.style = style
         self.output_format = output_format
         self.prosody = prosody
+        self.max_concurrency = max_synthesizers
+
+        self._speech_config = None
+        self._synthesizers = queue.Queue()
+        self._n_synthesizers = 0
+        self._synthesizer_lock = threading.Lock()
         SpeechService.__init__(self, **kwargs)
 
-    def generate_from_text(
-        self, text: str, cache_dir: str = None, path: str = None, **kwargs
-    ) -> dict:
-        """"""
-        inner = text
-        # Remove bookmarks
-        inner = remove_bookmarks(inner)
-        if cache_dir is None:
-            cache_dir = self.cache_dir
+    def _get_speech_config(self):
+        if self._speech_config is not None:
+            return self._speech_config
 
-        # Apply prosody
-        prosody = kwargs.get("prosody", self.prosody)
+        try:
+            azure_subscription_key = os.environ["AZURE_SUBSCRIPTION_KEY"]
+            azure_service_region = os.environ["AZURE_SERVICE_REGION"]
+        except KeyError:
+            logger.error(
+                "Could not find the environment variables AZURE_SUBSCRIPTION_KEY and AZURE_SERVICE_REGION. Microsoft Azure's text-to-speech API needs account credentials to connect. You can create an account for free and (as of writing this) get a free quota of TTS minutes."
+            )
+            create_dotenv_azure()
 
+        speech_config = speechsdk.SpeechConfig(
+            subscription=azure_subscription_key,
+            region=azure_service_region,
+        )
+        speech_config.set_speech_synthesis_output_format(
+            speechsdk.SpeechSynthesisOutputFormat[self.output_format]
+        )
+        self._speech_config = speech_config
+        return speech_config
+
+    def _acquire_synthesizer(self) -> _PooledSynthesizer:
+        with self._synthesizer_lock:
+            create = (
+                self._synthesizers.empty()
+                and self._n_synthesizers < self.max_concurrency
+            )
+            if create:
+                self._n_synthesizers += 1
+        if not create:
+            return self._synthesizers.get()
+
+        try:
+            return _PooledSynthesizer(self._get_speech_config())
+        except Exception:
+            # Otherwise the pool would wait forever for a synthesizer that
+            # was never created
+            with self._synthesizer_lock:
+                self._n_synthesizers -= 1
+            raise
+
+    def _release_synthesizer(self, synthesizer: _PooledSynthesizer) -> None:
+        self._synthesizers.put(synthesizer)
+
+    def _open_synthesizers(self, n: int) -> None:
+        """Creates up to `n` more synthesizers, opening their connections
+        concurrently, so that the first requests don't wait for them."""
+        with self._synthesizer_lock:
+            n = min(n, self.max_concurrency - self._n_synthesizers)
+            if n <= 0:
+                return
+            self._n_synthesizers += n
+
+        speech_config = self._get_speech_config()
+        try:
+            with ThreadPoolExecutor(max_workers=n) as executor:
+                synthesizers = list(
+                    executor.map(lambda _: _PooledSynthesizer(speech_config), range(n))
+                )
+        except Exception:
+            with self._synthesizer_lock:
+                self._n_synthesizers -= n
+            raise
+        for synthesizer in synthesizers:
+            self._release_synthesizer(synthesizer)
+
+    def _get_ssml_envelope(self, prosody: dict = None):
+        """Returns the SSML that goes before and after the text to synthesize,
+        with the voice, prosody and style of the service."""
         ssml_beginning = r"""<speak version="1.0" xmlns="http://www.w3.org/2001/10/synthesis"
     xmlns:mstts="https://www.w3.org/2001/mstts" xml:lang="en-US">
     <voice name="%s">
@@ -122,76 +247,26 @@ class AzureService(SpeechService):
             ssml_beginning = ssml_beginning + style_opening_tag
             ssml_end = style_closing_tag + ssml_end
 
-        ssml = ssml_beginning + inner + ssml_end
-        initial_offset = len(ssml_beginning)
+        return ssml_beginning, ssml_end
 
-        input_data = {
-            "input_text": text,
-            "ssml": ssml,
-            "service": "azure",
-            "config": {
-                "voice": self.voice,
-                "style": self.style,
-                "output_format": self.output_format,
-                "prosody": self.prosody,
-            },
+    def _get_config(self) -> dict:
+        return {
+            "voice": self.voice,
+            "style": self.style,
+            "output_format": self.output_format,
+            "prosody": self.prosody,
         }
 
-        cached_result = self.get_cached_result(input_data, cache_dir)
-        if cached_result is not None:
-            return cached_result
-
-        if path is None:
-            audio_path = self.get_audio_basename(input_data) + ".mp3"
-        else:
-            audio_path = path
-
+    def _speak_ssml(self, ssml: str):
+        """Synthesizes an SSML document, and returns the result together with
+        the word boundaries and the bookmarks reported by Azure."""
+        synthesizer = self._acquire_synthesizer()
         try:
-            azure_subscription_key = os.environ["AZURE_SUBSCRIPTION_KEY"]
-            azure_service_region = os.environ["AZURE_SERVICE_REGION"]
-        except KeyError:
-            logger.error(
-                "Could not find the environment variables AZURE_SUBSCRIPTION_KEY and AZURE_SERVICE_REGION. Microsoft Azure's text-to-speech API needs account credentials to connect. You can create an account for free and (as of writing this) get a free quota of TTS minutes."
-            )
-            create_dotenv_azure()
-
-        speech_config = speechsdk.SpeechConfig(
-            subscription=azure_subscription_key,
-            region=azure_service_region,
-        )
-        speech_config.set_speech_synthesis_output_format(
-            speechsdk.SpeechSynthesisOutputFormat[self.output_format]
-        )
-        audio_config = speechsdk.audio.AudioOutputConfig(
-            filename=str(Path(cache_dir) / audio_path)
-        )
-
-        speech_service = speechsdk.SpeechSynthesizer(
-            speech_config=speech_config, audio_config=audio_config
-        )
-        word_boundaries = []
-        # speech_synthesizer.bookmark_reached.connect(lambda evt: print(
-        #     "Bookmark reached: {}, audio offset: {}ms, bookmark text: {}.".format(evt, evt.audio_offset, evt.text)))
-
-        def process_event(evt):
-            # print(f'{type(evt)=}')
-            result = {label[1:]: val for label, val in evt.__dict__.items()}
-            result["boundary_type"] = result["boundary_type"].name
-            result["text_offset"] = result["text_offset"] - initial_offset
-            return result
-
-        speech_service.synthesis_word_boundary.connect(
-            lambda evt: word_boundaries.append(process_event(evt))
-        )
-        speech_synthesis_result = speech_service.speak_ssml_async(ssml).get()
-
-        json_dict = {
-            "input_text": text,
-            "input_data": input_data,
-            "ssml": ssml,
-            "word_boundaries": [serialize_word_boundary(wb) for wb in word_boundaries],
-            "original_audio": audio_path,
-        }
+            speech_synthesis_result = synthesizer.speak_ssml(ssml)
+            word_boundaries = synthesizer.word_boundaries
+            bookmarks = synthesizer.bookmarks
+        finally:
+            self._release_synthesizer(synthesizer)
 
         if (
             speech_synthesis_result.reason
@@ -220,4 +295,136 @@ class AzureService(SpeechService):
 
             raise Exception("Speech synthesis failed")
 
+        return speech_synthesis_result, word_boundaries, bookmarks
+
+    def prefetch(
+        self, texts: t.List[str], max_workers: t.Optional[int] = None, **kwargs
+    ) -> t.List[dict]:
+        """Opens the connections of the synthesizers needed for the uncached
+        `texts` at once, then synthesizes them like
+        :meth:`~manim_voiceover.services.base.SpeechService.prefetch`."""
+        n_uncached = 0
+        for text in self._get_prefetch_units(texts):
+            input_data = self.get_input_data(text, **kwargs)
+            if self.get_cached_result(input_data, self.cache_dir) is None:
+                n_uncached += 1
+        if max_workers is not None:
+            n_uncached = min(n_uncached, max_workers)
+        self._open_synthesizers(n_uncached)
+        return SpeechService.prefetch(self, texts, max_workers=max_workers, **kwargs)
+
+    def get_input_data(self, text: str, **kwargs) -> dict:
+        # Bookmarks are kept in the input text, but not in the synthesized SSML
+        ssml_beginning, ssml_end = self._get_ssml_envelope(
+            kwargs.get("prosody", self.prosody)
+        )
+        return {
+            "input_text": text,
+            "ssml": ssml_beginning + remove_bookmarks(text) + ssml_end,
+            "service": "azure",
+            "config": self._get_config(),
+        }
+
+    def generate_from_text(
+        self, text: str, cache_dir: str = None, path: str = None, **kwargs
+    ) -> dict:
+        """"""
+        # Bookmarks are kept in the synthesized SSML so that Azure reports
+        # their exact audio offsets, but not in the cache key
+        bookmark_spans = [m.span() for m in BOOKMARK_REGEX.finditer(text)]
+        if cache_dir is None:
+            cache_dir = self.cache_dir
+
+        ssml_beginning, ssml_end = self._get_ssml_envelope(
+            kwargs.get("prosody", self.prosody)
+        )
+        ssml_with_bookmarks = ssml_beginning + text + ssml_end
+        initial_offset = len(ssml_beginning)
+
+        input_data = self.get_input_data(text, **kwargs)
+        ssml = input_data["ssml"]
+
+        cached_result = self.get_cached_result(input_data, cache_dir)
+        if cached_result is not None:
+            return cached_result
+
+        if path is None:
+            audio_path = self.get_audio_basename(input_data) + ".mp3"
+        else:
+            audio_path = path
+
+        speech_synthesis_result, word_boundaries, bookmarks = self._speak_ssml(
+            ssml_with_bookmarks
+        )
+
+        for wb in word_boundaries:
+            wb["text_offset"] = remove_bookmark_offset(
+                wb["text_offset"] - initial_offset, bookmark_spans
+            )
+
+        json_dict = {
+            "input_text": text,
+            "input_data": input_data,
+            "ssml": ssml,
+            "word_boundaries": [serialize_word_boundary(wb) for wb in word_boundaries],
+            "bookmarks": bookmarks,
+            "original_audio": audio_path,
+        }
+
+        with open(Path(cache_dir) / audio_path, "wb") as f:
+            f.write(speech_synthesis_result.audio_data)
+
         return json_dict
+
+    def generate_from_ssml(
+        self, ssml: str, cache_dir: str = None, path: str = None, **kwargs
+    ) -> dict:
+        """"""
+        # Fragments get the voice, prosody and style of the service, complete
+        # documents are synthesized as they are
+        if cache_dir is None:
+            cache_dir = self.cache_dir
+        if is_ssml_document(ssml):
+            document = ssml
+        else:
+            ssml_beginning, ssml_end = self._get_ssml_envelope(
+                kwargs.get("prosody", self.prosody)
+            )
+            document = ssml_beginning + ssml + ssml_end
+        text = ssml_to_text(ssml)
+
+        input_data = {
+            "input_text": text,
+            "ssml": document,
+            "service": "azure",
+            "config": self._get_config(),
+        }
+
+        cached_result = self.get_cached_result(input_data, cache_dir)
+        if cached_result is not None:
+            return cached_result
+
+        if path is None:
+            audio_path = self.get_audio_basename(input_data) + ".mp3"
+        else:
+            audio_path = path
+
+        speech_synthesis_result, word_boundaries, bookmarks = self._speak_ssml(document)
+
+        # Azure reports offsets in the SSML, match the words in the text instead
+        word_boundaries = align_word_boundaries(
+            [serialize_word_boundary(wb) for wb in word_boundaries],
+            remove_bookmarks(text),
+        )
+
+        with open(Path(cache_dir) / audio_path, "wb") as f:
+            f.write(speech_synthesis_result.audio_data)
+
+        return {
+            "input_text": text,
+            "input_data": input_data,
+            "ssml": document,
+            "word_boundaries": word_boundaries,
+            "bookmarks": bookmarks,
+            "original_audio": audio_path,
+        }
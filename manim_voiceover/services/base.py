@@ -4,20 +4,40 @@ import os
 import json
 import sys
 import hashlib
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 from manim import config, logger
 from slugify import slugify
-from manim_voiceover.defaults import (
-    DEFAULT_VOICEOVER_CACHE_DIR,
-    DEFAULT_VOICEOVER_CACHE_JSON_FILENAME,
+from manim_voiceover.cache import (
+    CacheStoragePolicy,
+    get_audio_hash,
+    get_cache_index,
+    get_cache_stats,
+    get_cached_transcription,
+    get_transcription_key,
+    get_storage_info,
+    restore_entry,
+    store_transcription,
+    update_cache_entry,
 )
+from manim_voiceover.defaults import DEFAULT_VOICEOVER_CACHE_DIR
 from manim_voiceover.helper import (
-    append_to_json_file,
     prompt_ask_missing_extras,
     remove_bookmarks,
+    split_sentences,
+    split_text,
 )
-from manim_voiceover.modify_audio import adjust_speed
+from manim_voiceover.modify_audio import (
+    adjust_speed,
+    concatenate_audio,
+    find_split_points,
+    get_audio_info,
+    split_audio,
+)
+from manim_voiceover.ssml import canonicalize_ssml, ssml_to_text
 from manim_voiceover.tracker import AUDIO_OFFSET_RESOLUTION
+from manim_voiceover.transcription import CloudWhisperTranscriber
 
 
 def timestamps_to_word_boundaries(segments):
@@ -74,9 +94,126 @@ def timestamps_to_word_boundaries(segments):
     return word_boundaries
 
 
+def merge_part_timings(parts: t.List[dict], offsets: t.List[float]) -> dict:
+    """Merges the word boundaries and bookmarks of voiceovers that were
+    concatenated into a single audio file.
+
+    Args:
+        parts (t.List[dict]): The output data dictionaries of the voiceovers.
+        offsets (t.List[float]): The start time of each voiceover in the
+            concatenated audio, in seconds.
+
+    Returns:
+        dict: A dictionary with the keys ``word_boundaries`` and ``bookmarks``,
+            and ``transcribed_text`` if any of the parts was transcribed.
+    """
+    word_boundaries = []
+    bookmarks = {}
+    texts = []
+    text_offset = 0
+    for part, offset in zip(parts, offsets):
+        audio_offset = int(offset * AUDIO_OFFSET_RESOLUTION)
+        if "transcribed_text" in part:
+            part_text = part["transcribed_text"].strip()
+        else:
+            part_text = remove_bookmarks(part["input_text"])
+
+        part_boundaries = part.get("word_boundaries")
+        if not part_boundaries:
+            # Anchor at least the start and the end of the part
+            duration = part["audio_info"]["duration"]
+            part_boundaries = [
+                {
+                    "audio_offset": 0,
+                    "text_offset": 0,
+                    "word_length": len(part_text),
+                    "text": part_text,
+                    "boundary_type": "Word",
+                },
+                {
+                    "audio_offset": int(duration * AUDIO_OFFSET_RESOLUTION),
+                    "text_offset": len(part_text),
+                    "word_length": 0,
+                    "text": "",
+                    "boundary_type": "Word",
+                },
+            ]
+
+        for wb in part_boundaries:
+            wb = dict(wb)
+            wb["audio_offset"] += audio_offset
+            wb["text_offset"] += text_offset
+            word_boundaries.append(wb)
+
+        for mark, mark_offset in part.get("bookmarks", {}).items():
+            bookmarks[mark] = mark_offset + audio_offset
+
+        texts.append(part_text)
+        text_offset += len(part_text) + 1
+
+    result = {"word_boundaries": word_boundaries, "bookmarks": bookmarks}
+    if any("transcribed_text" in part for part in parts):
+        result["transcribed_text"] = " ".join(texts)
+    return result
+
+
+def split_word_boundaries(
+    word_boundaries: t.List[dict], spans: t.List[t.Tuple[int, int]]
+) -> t.Optional[t.List[t.List[dict]]]:
+    """Assigns the word boundaries of texts that were synthesized together
+    to each text, by their offsets in the joined text.
+
+    Args:
+        word_boundaries (t.List[dict]): The word boundaries of the joined text.
+        spans (t.List[t.Tuple[int, int]]): The start and end offset of each text.
+
+    Returns:
+        t.Optional[t.List[t.List[dict]]]: The word boundaries of each text, with
+            text offsets relative to the text, or None if a text has no words.
+    """
+    parts = [[] for _ in spans]
+    for wb in word_boundaries:
+        for idx, (start, end) in enumerate(spans):
+            if start <= wb["text_offset"] < end:
+                wb = dict(wb)
+                wb["text_offset"] -= start
+                parts[idx].append(wb)
+                break
+
+    if any(not part for part in parts):
+        return None
+    return parts
+
+
+#: Speech services handed out by :meth:`SpeechService.shared`, by class and config
+_SERVICE_POOL: t.Dict[tuple, "SpeechService"] = {}
+_SERVICE_POOL_LOCK = threading.Lock()
+
+
+def _get_shared_key(obj: t.Any) -> list:
+    # Transcribers are compared by their settings, other objects by identity
+    if hasattr(obj, "get_cache_key"):
+        return [type(obj).__qualname__, obj.get_cache_key()]
+    return [type(obj).__qualname__, id(obj)]
+
+
 class SpeechService(ABC):
     """Abstract base class for a speech service."""
 
+    #: Default number of voiceovers synthesized concurrently by :meth:`prefetch`
+    max_concurrency: int = 1
+
+    #: Maximum number of characters per request. Longer texts are split into
+    #: chunks that are synthesized concurrently and concatenated.
+    max_input_length: t.Optional[int] = None
+
+    #: Separator between the texts synthesized together when coalescing short
+    #: lines, so that the voice pauses between them
+    coalesce_separator: str = "\n\n"
+
+    #: Maximum number of texts synthesized together when coalescing short lines
+    coalesce_group_size: int = 10
+
     def __init__(
         self,
         global_speed: float = 1.00,
@@ -84,6 +221,12 @@ class SpeechService(ABC):
         transcription_model: t.Optional[str] = "whisper-1",
         transcription_kwargs: dict = {},
         use_cloud_whisper: bool = True,
+        storage_policy: t.Optional[CacheStoragePolicy] = None,
+        sentence_cache: bool = False,
+        sentence_gap: float = 0.1,
+        transcriber: t.Optional[CloudWhisperTranscriber] = None,
+        coalesce_max_length: t.Optional[int] = None,
+        lazy_transcription: bool = False,
         **kwargs,
     ):
         """Initialize the speech service.
@@ -99,8 +242,36 @@ class SpeechService(ABC):
                 to the transcribe() function. Defaults to {}.
             use_cloud_whisper (bool, optional): Whether to use OpenAI's cloud-based
                 Whisper API for transcription instead of the local model. Defaults to True.
+            storage_policy (t.Optional[CacheStoragePolicy], optional): The policy
+                used to compact cold cache entries and to decode them back on a hit.
+                Defaults to None.
+            sentence_cache (bool, optional): Whether to synthesize and cache each
+                sentence of a voiceover separately, so that editing one sentence
+                only resynthesizes that sentence. Defaults to False.
+            sentence_gap (float, optional): Silence inserted between sentences when
+                `sentence_cache` is enabled, in seconds. Defaults to 0.1.
+            transcriber (t.Optional[CloudWhisperTranscriber], optional): The transcriber
+                used for cloud-based Whisper. Defaults to one created with
+                `transcription_kwargs`.
+            coalesce_max_length (t.Optional[int], optional): When set, :meth:`prefetch`
+                synthesizes the uncached texts of at most this many characters together
+                in a single request, then splits the audio back into one cached clip
+                per text. Only for services that implement :meth:`get_input_data`.
+                Defaults to None.
+            lazy_transcription (bool, optional): Whether to transcribe voiceovers only
+                when their word boundaries are needed, i.e. when the tracker is asked
+                for the time of a bookmark. Voiceovers with bookmarks are transcribed
+                in the background in the meantime. Defaults to False.
         """
         self.global_speed = global_speed
+        self.storage_policy = storage_policy
+        self.sentence_cache = sentence_cache
+        self.sentence_gap = sentence_gap
+        self.coalesce_max_length = coalesce_max_length
+        self.lazy_transcription = lazy_transcription
+        self._transcription_executor = None
+        self._executor = None
+        self._transcription_futures = {}
 
         if cache_dir is not None:
             self.cache_dir = cache_dir
@@ -113,115 +284,153 @@ class SpeechService(ABC):
         self.transcription_model = None
         self._whisper_model = None
         self.use_cloud_whisper = use_cloud_whisper
+        self.transcriber = transcriber
         self.set_transcription(model=transcription_model, kwargs=transcription_kwargs)
 
         self.additional_kwargs = kwargs
 
+    @classmethod
+    def shared(cls, *args, **kwargs) -> "SpeechService":
+        """Returns the instance of the service with the given arguments that is
+        shared by all the scenes of the process, creating it on first use. When
+        several scenes are rendered at once, e.g. with ``manim -a``, they reuse
+        the same transcription model, clients and cache index instead of setting
+        them up again for every scene.
+
+        .. code-block:: python
+
+            self.set_speech_service(AzureService.shared(voice="en-US-AriaNeural"))
+
+        Arguments are compared by value if they are JSON serializable, and
+        transcribers by their settings. Other objects, e.g. a storage policy,
+        only match when the same object is passed again, so create them once
+        at module level to share the service.
+
+        Args:
+            *args: Positional arguments passed to the constructor.
+            **kwargs: Keyword arguments passed to the constructor.
+
+        Returns:
+            SpeechService: The shared instance.
+        """
+        key = (cls, json.dumps([args, kwargs], sort_keys=True, default=_get_shared_key))
+        with _SERVICE_POOL_LOCK:
+            if key not in _SERVICE_POOL:
+                _SERVICE_POOL[key] = cls(*args, **kwargs)
+            return _SERVICE_POOL[key]
+
     def _wrap_generate_from_text(self, text: str, path: str = None, **kwargs) -> dict:
         # Replace newlines with spaces, reduce multiple consecutive spaces to single
         text = " ".join(text.split())
 
+        if path is None and self.sentence_cache:
+            sentences = split_sentences(text)
+            if len(sentences) > 1:
+                return self._generate_segmented(
+                    text, sentences, gap=self.sentence_gap, **kwargs
+                )
+
+        if path is None and self.max_input_length is not None:
+            if len(remove_bookmarks(text)) > self.max_input_length:
+                chunks = split_text(text, self.max_input_length)
+                return self._generate_segmented(
+                    text, chunks, max_workers=self.max_concurrency, **kwargs
+                )
+
         dict_ = self.generate_from_text(text, cache_dir=None, path=path, **kwargs)
+        dict_ = self._process_generated(text, dict_, **kwargs)
+        if self._defers_transcription(dict_) and remove_bookmarks(text) != text:
+            self._submit_transcription(dict_)
+        return dict_
+
+    def _wrap_generate_from_ssml(self, ssml: str, path: str = None, **kwargs) -> dict:
+        ssml = canonicalize_ssml(ssml)
+        text = ssml_to_text(ssml)
+        # Services without native SSML support synthesize the text of the SSML
+        if not self.supports_ssml():
+            return self._wrap_generate_from_text(text, path=path, **kwargs)
+
+        dict_ = self.generate_from_ssml(ssml, cache_dir=None, path=path, **kwargs)
+        dict_ = self._process_generated(text, dict_, **kwargs)
+        if self._defers_transcription(dict_) and remove_bookmarks(text) != text:
+            self._submit_transcription(dict_)
+        return dict_
+
+    def _generate_segmented(
+        self,
+        text: str,
+        segments: t.List[str],
+        gap: float = 0.0,
+        max_workers: int = 1,
+        **kwargs,
+    ) -> dict:
+        """Synthesizes each segment of `text` as a separate, cached voiceover,
+        then splices them into a single entry for the tracker."""
+
+        def generate_part(segment: str) -> dict:
+            dict_ = self.generate_from_text(segment, cache_dir=None, **kwargs)
+            return self._process_generated(segment, dict_, **kwargs)
+
+        if max_workers > 1 and len(segments) > 1:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                parts = list(executor.map(generate_part, segments))
+        else:
+            parts = [generate_part(segment) for segment in segments]
+
+        input_data = {
+            "input_text": text,
+            "service": "segments",
+            "parts": [part["input_data"] for part in parts],
+            "gap": gap,
+        }
+        cached_result = self.get_cached_result(input_data, self.cache_dir)
+        if cached_result is not None:
+            cached_result["input_text"] = text
+            return cached_result
+
+        if self.lazy_transcription and remove_bookmarks(text) != text:
+            # The merged word boundaries are needed to place the bookmarks
+            for part in parts:
+                self.resolve_word_boundaries(part)
+
+        extension = os.path.splitext(parts[0]["final_audio"])[1]
+        audio_path = self.get_audio_basename(input_data) + extension
+        offsets = concatenate_audio(
+            [str(Path(self.cache_dir) / part["final_audio"]) for part in parts],
+            str(Path(self.cache_dir) / audio_path),
+            gap=gap,
+        )
+
+        dict_ = {
+            "input_text": text,
+            "input_data": input_data,
+            "original_audio": audio_path,
+            "final_audio": audio_path,
+        }
+        dict_.update(merge_part_timings(parts, offsets))
+        dict_["audio_info"] = get_audio_info(str(Path(self.cache_dir) / audio_path))
+        dict_["audio_hash"] = get_audio_hash(str(Path(self.cache_dir) / audio_path))
+        dict_["storage"] = get_storage_info(dict_, self.cache_dir)
+
+        update_cache_entry(self.cache_dir, dict_)
+        return dict_
+
+    def _process_generated(self, text: str, dict_: dict, **kwargs) -> dict:
+        """Transcribes, post-processes and caches the output of
+        :meth:`generate_from_text`. Cached entries are returned as they are."""
+        if "audio_info" in dict_:
+            # Cache hit, the entry has already been processed. The cache key
+            # might not include the bookmarks, so use the current text.
+            dict_["input_text"] = text
+            if not self.lazy_transcription and self._needs_transcription(dict_):
+                self._transcribe_entry(dict_)
+            return dict_
+
         original_audio = dict_["original_audio"]
 
         # Check whether word boundaries exist and if not run stt
-        if "word_boundaries" not in dict_ and (self._whisper_model is not None or self.use_cloud_whisper):
-            if self.use_cloud_whisper:
-                # Use OpenAI's cloud-based Whisper API
-                try:
-                    import openai
-                    from dotenv import find_dotenv, load_dotenv
-                    load_dotenv(find_dotenv(usecwd=True))
-                    
-                    if os.getenv("OPENAI_API_KEY") is None:
-                        from manim_voiceover.services.openai import create_dotenv_openai
-                        create_dotenv_openai()
-                    
-                    audio_file_path = str(Path(self.cache_dir) / original_audio)
-                    with open(audio_file_path, "rb") as audio_file:
-                        transcription_result = openai.audio.transcriptions.create(
-                            model="whisper-1",
-                            file=audio_file,
-                            response_format="verbose_json",
-                            timestamp_granularities=["word"],
-                            **self.transcription_kwargs
-                        )
-                    
-                    # Convert the word timestamps to word boundaries directly
-                    logger.info("Cloud Transcription: " + transcription_result.text)
-                    logger.info(f"Word count: {len(transcription_result.words) if hasattr(transcription_result, 'words') else 0}")
-                    
-                    word_boundaries = []
-                    current_text_offset = 0
-                    
-                    if hasattr(transcription_result, 'words') and transcription_result.words:
-                        logger.info(f"Processing {len(transcription_result.words)} words")
-                        for word_obj in transcription_result.words:
-                            try:
-                                word = word_obj.word.strip()  # Remove any leading/trailing whitespace
-                                start_time = word_obj.start
-                                
-                                # Skip words that are just punctuation or empty
-                                if not word or word.isspace() or (len(word) == 1 and not word.isalnum()):
-                                    continue
-                                
-                                word_boundary = {
-                                    "audio_offset": int(start_time * AUDIO_OFFSET_RESOLUTION),
-                                    "text_offset": current_text_offset,
-                                    "word_length": len(word),
-                                    "text": word,
-                                    "boundary_type": "Word",
-                                }
-                                
-                                word_boundaries.append(word_boundary)
-                                current_text_offset += len(word) + 1  # +1 for space
-                                
-                                logger.info(f"Added word boundary: {word} at {start_time}s")
-                            except Exception as e:
-                                logger.error(f"Error processing word: {e}")
-                    else:
-                        logger.warning("No words found in transcription result")
-                    
-                    logger.info(f"Created {len(word_boundaries)} word boundaries")
-                    dict_["word_boundaries"] = word_boundaries
-                    dict_["transcribed_text"] = transcription_result.text
-                    
-                except ImportError:
-                    logger.error(
-                        'Missing packages. Run `pip install "manim-voiceover[openai]"` to use cloud-based Whisper.'
-                    )
-                    return dict_
-                except Exception as e:
-                    logger.error(f"Error using cloud-based Whisper: {str(e)}")
-                    return dict_
-            else:
-                # Use local Whisper model only if it's properly loaded
-                if self._whisper_model is not None and not isinstance(self._whisper_model, bool):
-                    try:
-                        transcription_result = self._whisper_model.transcribe(
-                            str(Path(self.cache_dir) / original_audio), **self.transcription_kwargs
-                        )
-                        
-                        logger.info("Transcription: " + transcription_result.text)
-                        
-                        # For local Whisper model, use segments_to_dicts
-                        if hasattr(transcription_result, 'segments_to_dicts'):
-                            word_boundaries = timestamps_to_word_boundaries(
-                                transcription_result.segments_to_dicts()
-                            )
-                            dict_["word_boundaries"] = word_boundaries
-                            dict_["transcribed_text"] = transcription_result.text
-                        else:
-                            logger.error("Local Whisper model returned unexpected result format.")
-                            return dict_
-                    except Exception as e:
-                        logger.error(f"Error using local Whisper model: {str(e)}")
-                        return dict_
-                else:
-                    logger.error(
-                        "Local Whisper model is not available. Please set use_cloud_whisper=True or install the local model with `pip install \"manim-voiceover[transcribe]\"`."
-                    )
-                    return dict_
+        if not self.lazy_transcription and self._needs_transcription(dict_):
+            self._transcribe(dict_)
 
         # Audio callback
         self.audio_callback(original_audio, dict_, **kwargs)
@@ -236,19 +445,443 @@ class SpeechService(ABC):
                 self.global_speed,
             )
             dict_["final_audio"] = adjusted_path
-            if "word_boundaries" in dict_:
-                for word_boundary in dict_["word_boundaries"]:
-                    word_boundary["audio_offset"] = int(
-                        word_boundary["audio_offset"] / self.global_speed
-                    )
+            self._adjust_offsets_to_speed(dict_)
         else:
             dict_["final_audio"] = dict_["original_audio"]
 
-        append_to_json_file(
-            Path(self.cache_dir) / DEFAULT_VOICEOVER_CACHE_JSON_FILENAME, dict_
+        # Store the audio metadata so that trackers don't need to parse the file
+        dict_["audio_info"] = get_audio_info(
+            str(Path(self.cache_dir) / dict_["final_audio"])
+        )
+        dict_["audio_hash"] = get_audio_hash(
+            str(Path(self.cache_dir) / dict_["final_audio"])
         )
+        dict_["storage"] = get_storage_info(dict_, self.cache_dir)
+
+        update_cache_entry(self.cache_dir, dict_)
         return dict_
-    
+
+    def submit(self, text: str, **kwargs) -> Future:
+        """Starts synthesizing a voiceover in the background. Up to
+        ``max_concurrency`` voiceovers are synthesized at the same time.
+
+        Args:
+            text (str): The text to synthesize.
+            **kwargs: Keyword arguments passed to :meth:`generate_from_text`.
+
+        Returns:
+            Future: A future that resolves to the output data dictionary.
+        """
+        return self._get_executor().submit(self._wrap_generate_from_text, text, **kwargs)
+
+    def submit_ssml(self, ssml: str, **kwargs) -> Future:
+        """Same as :meth:`submit`, for SSML input."""
+        return self._get_executor().submit(self._wrap_generate_from_ssml, ssml, **kwargs)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency)
+        return self._executor
+
+    def prefetch(
+        self, texts: t.List[str], max_workers: t.Optional[int] = None, **kwargs
+    ) -> t.List[dict]:
+        """Synthesizes several voiceovers ahead of time, so that they are
+        already cached when the scene is rendered.
+
+        Args:
+            texts (t.List[str]): The texts to synthesize.
+            max_workers (t.Optional[int], optional): Number of voiceovers to
+                synthesize concurrently. Defaults to ``max_concurrency``.
+            **kwargs: Keyword arguments passed to :meth:`generate_from_text`.
+
+        Returns:
+            t.List[dict]: The output data dictionaries, in the order of `texts`.
+        """
+        if max_workers is None:
+            max_workers = self.max_concurrency
+
+        units = self._get_prefetch_units(texts)
+        groups = []
+        if self.coalesce_max_length is not None:
+            groups = self._get_coalesce_groups(units, **kwargs)
+            coalesced = [text for group in groups for text in group]
+            units = [text for text in units if text not in coalesced]
+
+        def generate(text: str) -> dict:
+            return self.generate_from_text(text, cache_dir=None, **kwargs)
+
+        def generate_group(group: t.List[str]) -> t.List[t.Tuple[str, dict]]:
+            items = self._generate_coalesced(group, **kwargs)
+            if items is None:
+                logger.info("Could not split the coalesced voiceovers, retrying")
+                items = [(text, generate(text)) for text in group]
+            return items
+
+        if max_workers <= 1:
+            items = [item for group in groups for item in generate_group(group)]
+            items += [(text, generate(text)) for text in units]
+        else:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                group_items = list(executor.map(generate_group, groups))
+                generated = list(executor.map(generate, units))
+            items = [item for items_ in group_items for item in items_]
+            items += list(zip(units, generated))
+
+        self._finalize_batch(items, **kwargs)
+
+        # Everything is cached now, this only splices the segmented texts
+        results_by_text = {
+            text: self._wrap_generate_from_text(text, **kwargs)
+            for text in dict.fromkeys(texts)
+        }
+        # Saved right away, so that other processes can use them
+        get_cache_index(self.cache_dir).flush()
+        return [results_by_text[text] for text in texts]
+
+    def _get_prefetch_units(self, texts: t.List[str]) -> t.List[str]:
+        """Returns the texts that :meth:`generate_from_text` is called with to
+        synthesize `texts`, without duplicates. Long texts are cached segment
+        by segment, so these are the segments."""
+        units = []
+        for text in dict.fromkeys(texts):
+            text = " ".join(text.split())
+            segments = [text]
+            if self.sentence_cache:
+                segments = split_sentences(text)
+            elif self.max_input_length is not None:
+                if len(remove_bookmarks(text)) > self.max_input_length:
+                    segments = split_text(text, self.max_input_length)
+            units.extend(segment for segment in segments if segment not in units)
+        return units
+
+    def get_input_data(self, text: str, **kwargs) -> t.Optional[dict]:
+        """Returns the cache key of `text` without synthesizing it. Services that
+        implement it support coalescing short lines, see `coalesce_max_length`.
+
+        Args:
+            text (str): The text to synthesize speech from.
+            **kwargs: Keyword arguments passed to :meth:`generate_from_text`.
+
+        Returns:
+            t.Optional[dict]: The input data, or None if not supported.
+        """
+        return None
+
+    def _get_coalesce_groups(self, texts: t.List[str], **kwargs) -> t.List[t.List[str]]:
+        """Groups the short uncached texts that can be synthesized together."""
+        max_length = self.max_input_length
+        groups = []
+        current = []
+        length = 0
+        for text in texts:
+            input_data = self.get_input_data(text, **kwargs)
+            input_text = remove_bookmarks(text)
+            if (
+                input_data is None
+                or len(input_text) > self.coalesce_max_length
+                or self.get_cached_result(input_data, self.cache_dir) is not None
+            ):
+                continue
+            length_ = len(input_text) + len(self.coalesce_separator)
+            if current and (
+                len(current) >= self.coalesce_group_size
+                or (max_length is not None and length + length_ > max_length)
+            ):
+                groups.append(current)
+                current = []
+                length = 0
+            current.append(text)
+            length += length_
+        groups.append(current)
+        return [group for group in groups if len(group) > 1]
+
+    def _generate_coalesced(
+        self, texts: t.List[str], **kwargs
+    ) -> t.Optional[t.List[t.Tuple[str, dict]]]:
+        """Synthesizes `texts` in a single request and splits the audio into
+        one clip per text, cut in the pauses between them. The word boundaries
+        are used to locate the pauses when the service returns them. Otherwise
+        the clips must match the length of the texts, or the texts are
+        synthesized one by one.
+
+        Returns:
+            t.Optional[t.List[t.Tuple[str, dict]]]: The texts with their output
+                data dictionaries, or None if the audio could not be split.
+        """
+        input_texts = [remove_bookmarks(text) for text in texts]
+        spans = []
+        offset = 0
+        for input_text in input_texts:
+            spans.append((offset, offset + len(input_text)))
+            offset += len(input_text) + len(self.coalesce_separator)
+
+        joined = self.generate_from_text(
+            self.coalesce_separator.join(input_texts), cache_dir=None, **kwargs
+        )
+        if "audio_info" in joined:
+            # Cached as a voiceover of its own, leave it alone
+            return None
+        joined_path = str(Path(self.cache_dir) / joined["original_audio"])
+
+        try:
+            part_boundaries = None
+            windows = None
+            if joined.get("word_boundaries"):
+                part_boundaries = split_word_boundaries(joined["word_boundaries"], spans)
+                if part_boundaries is None:
+                    return None
+                windows = [
+                    (
+                        prev[-1]["audio_offset"] / AUDIO_OFFSET_RESOLUTION,
+                        next_[0]["audio_offset"] / AUDIO_OFFSET_RESOLUTION,
+                    )
+                    for prev, next_ in zip(part_boundaries, part_boundaries[1:])
+                ]
+            # Without word boundaries, the pauses might not be between the
+            # texts, so the clips must match the length of the texts
+            cuts = find_split_points(
+                joined_path,
+                len(texts),
+                windows=windows,
+                weights=[len(input_text) for input_text in input_texts],
+            )
+            if cuts is None:
+                return None
+
+            extension = os.path.splitext(joined_path)[1]
+            items = []
+            for text in texts:
+                input_data = self.get_input_data(text, **kwargs)
+                audio_path = self.get_audio_basename(input_data) + extension
+                items.append(
+                    (
+                        text,
+                        {
+                            "input_text": text,
+                            "input_data": input_data,
+                            "original_audio": audio_path,
+                        },
+                    )
+                )
+            split_audio(
+                joined_path,
+                [str(Path(self.cache_dir) / d["original_audio"]) for _, d in items],
+                cuts,
+            )
+
+            if part_boundaries is not None:
+                for (_, dict_), boundaries, start in zip(
+                    items, part_boundaries, [0.0] + cuts
+                ):
+                    for wb in boundaries:
+                        wb["audio_offset"] = max(
+                            wb["audio_offset"] - int(start * AUDIO_OFFSET_RESOLUTION), 0
+                        )
+                    dict_["word_boundaries"] = boundaries
+        finally:
+            os.remove(joined_path)
+
+        logger.info(f"Synthesized {len(texts)} voiceovers in one request")
+        return items
+
+    def _finalize_batch(self, items: t.List[t.Tuple[str, dict]], **kwargs) -> None:
+        """Runs :meth:`_process_generated` on several outputs of
+        :meth:`generate_from_text`. With cloud-based Whisper, the fresh entries
+        that need to be transcribed are transcribed together beforehand."""
+        pending = [
+            dict_
+            for _, dict_ in items
+            if not self.lazy_transcription
+            and "audio_info" not in dict_
+            and self._needs_transcription(dict_)
+            and not self._load_transcription(dict_)
+        ]
+        if self.use_cloud_whisper and len(pending) > 1:
+            try:
+                results = self._get_transcriber().transcribe_batch(
+                    [str(Path(self.cache_dir) / d["original_audio"]) for d in pending]
+                )
+                for dict_, result in zip(pending, results):
+                    dict_.update(result)
+                    dict_.pop("approximate_word_boundaries", None)
+                    self._store_transcription(dict_)
+            except Exception as e:
+                # Left to _process_generated, which transcribes them one by one
+                logger.error(f"Error using cloud-based Whisper: {str(e)}")
+
+        for text, dict_ in items:
+            self._process_generated(text, dict_, **kwargs)
+
+    def _adjust_offsets_to_speed(self, dict_: dict, bookmarks: bool = True) -> None:
+        if self.global_speed == 1:
+            return
+        for word_boundary in dict_.get("word_boundaries", []):
+            word_boundary["audio_offset"] = int(
+                word_boundary["audio_offset"] / self.global_speed
+            )
+        if not bookmarks:
+            return
+        for mark, audio_offset in dict_.get("bookmarks", {}).items():
+            dict_["bookmarks"][mark] = int(audio_offset / self.global_speed)
+
+    def _needs_transcription(self, dict_: dict) -> bool:
+        # Approximate word boundaries are only used if there is no transcription
+        has_word_boundaries = "word_boundaries" in dict_ and not dict_.get(
+            "approximate_word_boundaries", False
+        )
+        return not has_word_boundaries and (
+            self._whisper_model is not None or self.use_cloud_whisper
+        )
+
+    def _get_transcriber(self) -> CloudWhisperTranscriber:
+        if self.transcriber is not None:
+            return self.transcriber
+        return CloudWhisperTranscriber(**self.transcription_kwargs)
+
+    def _transcribe_entry(self, dict_: dict) -> bool:
+        """Transcribes an entry that is already cached and updates it in the
+        cache. Returns True on success."""
+        if not self._transcribe(dict_):
+            return False
+        self._adjust_offsets_to_speed(dict_, bookmarks=False)
+        update_cache_entry(self.cache_dir, dict_)
+        return True
+
+    def _defers_transcription(self, dict_: dict) -> bool:
+        return self.lazy_transcription and self._needs_transcription(dict_)
+
+    def _submit_transcription(self, dict_: dict) -> None:
+        """Starts transcribing an entry in the background, see :meth:`resolve_word_boundaries`."""
+        if dict_["final_audio"] in self._transcription_futures:
+            return
+        if self._transcription_executor is None:
+            self._transcription_executor = ThreadPoolExecutor(max_workers=1)
+        self._transcription_futures[dict_["final_audio"]] = (
+            self._transcription_executor.submit(self._transcribe_entry, dict(dict_))
+        )
+
+    def resolve_word_boundaries(self, dict_: dict) -> dict:
+        """Makes sure that the word boundaries of an entry are available when
+        transcription is deferred with `lazy_transcription`. Waits for the
+        background transcription of the entry if there is one, and transcribes
+        it otherwise.
+
+        Args:
+            dict_ (dict): The output data dictionary of the voiceover.
+
+        Returns:
+            dict: The same dictionary, with the word boundaries.
+        """
+        if not self._needs_transcription(dict_):
+            return dict_
+
+        future = self._transcription_futures.get(dict_["final_audio"])
+        if future is not None:
+            future.result()
+            # The background job worked on a copy, read it back from the cache
+            cached_result = self.get_cached_result(dict_["input_data"], self.cache_dir)
+            if cached_result is not None and not self._needs_transcription(
+                cached_result
+            ):
+                dict_["word_boundaries"] = cached_result["word_boundaries"]
+                dict_.pop("approximate_word_boundaries", None)
+                if "transcribed_text" in cached_result:
+                    dict_["transcribed_text"] = cached_result["transcribed_text"]
+                return dict_
+
+        self._transcribe_entry(dict_)
+        return dict_
+
+    def _get_transcription_key(self, dict_: dict) -> str:
+        if self.use_cloud_whisper:
+            transcriber = self._get_transcriber().get_cache_key()
+        else:
+            transcriber = {
+                "engine": "whisper",
+                "model": self.transcription_model,
+                "kwargs": self.transcription_kwargs,
+            }
+        return get_transcription_key(
+            str(Path(self.cache_dir) / dict_["original_audio"]), transcriber
+        )
+
+    def _load_transcription(self, dict_: dict) -> bool:
+        """Looks up the transcription of the original audio of an entry in the
+        transcription cache, which is keyed by the audio content, so that the
+        same audio is never transcribed twice with the same model. Returns True
+        if it was found."""
+        cached = get_cached_transcription(
+            self.cache_dir, self._get_transcription_key(dict_)
+        )
+        if cached is None:
+            return False
+        dict_["word_boundaries"] = [dict(wb) for wb in cached["word_boundaries"]]
+        dict_.pop("approximate_word_boundaries", None)
+        if cached.get("transcribed_text") is not None:
+            dict_["transcribed_text"] = cached["transcribed_text"]
+        return True
+
+    def _store_transcription(self, dict_: dict) -> None:
+        store_transcription(self.cache_dir, self._get_transcription_key(dict_), dict_)
+
+    def _transcribe(self, dict_: dict) -> bool:
+        """Transcribes the original audio of an entry and stores the resulting
+        word boundaries in it. Returns True on success."""
+        original_audio = dict_["original_audio"]
+
+        if self._load_transcription(dict_):
+            return True
+
+        if self.use_cloud_whisper:
+            # Use OpenAI's cloud-based Whisper API
+            try:
+                dict_.update(
+                    self._get_transcriber().transcribe(
+                        str(Path(self.cache_dir) / original_audio)
+                    )
+                )
+            except ImportError:
+                logger.error(
+                    'Missing packages. Run `pip install "manim-voiceover[openai]"` to use cloud-based Whisper.'
+                )
+                return False
+            except Exception as e:
+                logger.error(f"Error using cloud-based Whisper: {str(e)}")
+                return False
+        else:
+            # Use local Whisper model only if it's properly loaded
+            if self._whisper_model is not None and not isinstance(self._whisper_model, bool):
+                try:
+                    transcription_result = self._whisper_model.transcribe(
+                        str(Path(self.cache_dir) / original_audio), **self.transcription_kwargs
+                    )
+                    
+                    logger.info("Transcription: " + transcription_result.text)
+                    
+                    # For local Whisper model, use segments_to_dicts
+                    if hasattr(transcription_result, 'segments_to_dicts'):
+                        word_boundaries = timestamps_to_word_boundaries(
+                            transcription_result.segments_to_dicts()
+                        )
+                        dict_["word_boundaries"] = word_boundaries
+                        dict_["transcribed_text"] = transcription_result.text
+                    else:
+                        logger.error("Local Whisper model returned unexpected result format.")
+                        return False
+                except Exception as e:
+                    logger.error(f"Error using local Whisper model: {str(e)}")
+                    return False
+            else:
+                logger.error(
+                    "Local Whisper model is not available. Please set use_cloud_whisper=True or install the local model with `pip install \"manim-voiceover[transcribe]\"`."
+                )
+                return False
+
+        dict_.pop("approximate_word_boundaries", None)
+        self._store_transcription(dict_)
+        return True
+
     def set_transcription(self, model: str = None, kwargs: dict = {}):
         """Set the transcription model and keyword arguments to be passed
         to the transcribe() function.
@@ -318,14 +951,60 @@ class SpeechService(ABC):
         """
         raise NotImplementedError
 
+    def generate_from_ssml(
+        self, ssml: str, cache_dir: str = None, path: str = None, **kwargs
+    ) -> dict:
+        """Implement this method for speech services that support SSML natively.
+        The other services synthesize the text of the SSML instead, with the
+        bookmarks placed by transcription like for text input.
+
+        Args:
+            ssml (str): The canonical SSML to synthesize speech from, see
+                :func:`~manim_voiceover.ssml.canonicalize_ssml`.
+            cache_dir (str, optional): The output directory to save the audio file and data to. Defaults to None.
+            path (str, optional): The path to save the audio file to. Defaults to None.
+
+        Returns:
+            dict: Output data dictionary, like :meth:`generate_from_text`. Its
+                ``input_text`` is the text of the SSML, with bookmarks.
+        """
+        raise NotImplementedError
+
+    def supports_ssml(self) -> bool:
+        """Whether the service implements :meth:`generate_from_ssml`."""
+        return type(self).generate_from_ssml is not SpeechService.generate_from_ssml
+
     def get_cached_result(self, input_data, cache_dir):
-        json_path = os.path.join(cache_dir, DEFAULT_VOICEOVER_CACHE_JSON_FILENAME)
-        if os.path.exists(json_path):
-            json_data = json.load(open(json_path, "r"))
-            for entry in json_data:
-                if entry["input_data"] == input_data:
-                    return entry
-        return None
+        entry = get_cache_index(cache_dir).get(input_data)
+        if entry is None:
+            return None
+        # Entries compacted by the cache CLI are restored even without a policy
+        restore_entry(entry, cache_dir)
+        final_audio_path = Path(cache_dir) / entry["final_audio"]
+        if (
+            "audio_info" not in entry or "audio_hash" not in entry
+        ) and os.path.exists(final_audio_path):
+            # Entry from an older version, store the audio metadata once
+            entry["audio_info"] = get_audio_info(str(final_audio_path))
+            entry["audio_hash"] = get_audio_hash(str(final_audio_path))
+            update_cache_entry(cache_dir, entry)
+        return entry
+
+    def compact_cache(self) -> dict:
+        """Transcodes the cold entries of the cache with the storage policy
+        of the service.
+
+        Returns:
+            dict: The cache statistics after compaction.
+        """
+        if self.storage_policy is None:
+            raise ValueError("No storage policy has been set for this service.")
+        return self.storage_policy.compact(self.cache_dir)
+
+    def get_cache_stats(self) -> dict:
+        """Returns the number of entries, the total bytes and the bytes saved by
+        compaction in the cache directory of the service."""
+        return get_cache_stats(self.cache_dir)
 
     def audio_callback(self, audio_path: str, data: dict, **kwargs):
         """Callback function for when the audio file is ready.
@@ -1,7 +1,19 @@
+import multiprocessing
+import os
+import typing as t
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+import numpy as np
 from manim import logger
-from manim_voiceover.helper import prompt_ask_missing_package, remove_bookmarks, wav2mp3
+from manim_voiceover.cache import get_cache_index
+from manim_voiceover.helper import (
+    array2mp3,
+    chunks,
+    prompt_ask_missing_package,
+    remove_bookmarks,
+    split_sentences,
+)
 from manim_voiceover.services.base import SpeechService
 
 try:
@@ -12,6 +24,38 @@ except ImportError:
 # DEFAULT_MODEL = TTS.list_models()[0]
 DEFAULT_MODEL = "tts_models/en/ljspeech/tacotron2-DDC"
 
+# Model loaded once in each worker process
+_worker_tts = None
+
+
+def _init_worker(model_kwargs: dict, num_threads: int) -> None:
+    global _worker_tts
+    import torch
+
+    torch.set_num_threads(num_threads)
+    _worker_tts = TTS(**model_kwargs)
+
+
+def _synthesize_in_worker(text: str, speaker, language) -> np.ndarray:
+    return _synthesize(_worker_tts, text, speaker, language)
+
+
+def _get_voice_in_worker(speaker_idx: int, language_idx: int) -> tuple:
+    return _get_voice(_worker_tts, speaker_idx, language_idx)
+
+
+def _get_voice(tts, speaker_idx: int, language_idx: int) -> tuple:
+    """Returns the speaker, the language and the sample rate of a model."""
+    speaker = tts.speakers[speaker_idx] if tts.speakers is not None else None
+    language = tts.languages[language_idx] if tts.languages is not None else None
+    return speaker, language, tts.synthesizer.output_sample_rate
+
+
+def _synthesize(tts, text: str, speaker, language) -> np.ndarray:
+    return np.asarray(
+        tts.tts(text=text, speaker=speaker, language=language), dtype=np.float32
+    )
+
 
 class CoquiService(SpeechService):
     """Speech service for Coqui TTS.
@@ -28,36 +72,155 @@ class CoquiService(SpeechService):
         gpu=False,
         speaker_idx=0,
         language_idx=0,
+        num_workers: int = 1,
+        sentence_pause: float = 0.4,
         **kwargs,
     ):
-        self.tts = TTS(
-            model_name=model_name,
-            config_path=config_path,
-            vocoder_path=vocoder_path,
-            vocoder_config_path=vocoder_config_path,
-            progress_bar=progress_bar,
-            gpu=gpu,
-        )
-
-        # Run TTS
-        self.speaker = (
-            self.tts.speakers[speaker_idx] if self.tts.speakers is not None else None
-        )
-        self.language = (
-            self.tts.languages[language_idx] if self.tts.languages is not None else None
-        )
+        """
+        Args:
+            num_workers (int, optional): Number of worker processes, each with its
+                own copy of the model, that synthesize sentences in parallel. The
+                model is then not loaded in the rendering process. With 1, the
+                sentences are synthesized in the rendering process. Defaults to 1.
+            sentence_pause (float, optional): Silence inserted between sentences,
+                in seconds. Defaults to 0.4.
+        """
+        self.model_kwargs = {
+            "model_name": model_name,
+            "config_path": config_path,
+            "vocoder_path": vocoder_path,
+            "vocoder_config_path": vocoder_config_path,
+            "progress_bar": progress_bar,
+            "gpu": gpu,
+        }
+        self.num_workers = num_workers
+        self.sentence_pause = sentence_pause
+        self._pool = None
+
+        if num_workers > 1:
+            # The model is only loaded in the workers
+            self.tts = None
+            voice = self._get_pool().submit(
+                _get_voice_in_worker, speaker_idx, language_idx
+            )
+            self.speaker, self.language, self.sample_rate = voice.result()
+        else:
+            self.tts = TTS(**self.model_kwargs)
+            self.speaker, self.language, self.sample_rate = _get_voice(
+                self.tts, speaker_idx, language_idx
+            )
 
         self.init_kwargs = kwargs
         prompt_ask_missing_package("TTS", "TTS>=0.13.3")
         SpeechService.__init__(self, **kwargs)
 
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # Split the cores between the workers instead of oversubscribing them
+            num_threads = max(1, (os.cpu_count() or 1) // self.num_workers)
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.num_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.model_kwargs, num_threads),
+            )
+        return self._pool
+
+    def _synthesize_texts(
+        self, texts: t.List[str], max_workers: t.Optional[int] = None
+    ) -> t.List[np.ndarray]:
+        """Synthesizes each of the `texts` sentence by sentence and returns
+        their waveforms. With several workers, the sentences of all the texts
+        are spread over the worker pool, at most `max_workers` at a time."""
+        sentences = [split_sentences(remove_bookmarks(text)) for text in texts]
+        flat_sentences = [s for sentences_ in sentences for s in sentences_]
+
+        if self.num_workers > 1:
+            pool = self._get_pool()
+            waveforms = []
+            for batch in chunks(flat_sentences, max_workers or self.num_workers):
+                futures = [
+                    pool.submit(_synthesize_in_worker, s, self.speaker, self.language)
+                    for s in batch
+                ]
+                waveforms += [future.result() for future in futures]
+        else:
+            waveforms = [
+                _synthesize(self.tts, s, self.speaker, self.language)
+                for s in flat_sentences
+            ]
+
+        pause = np.zeros(int(self.sentence_pause * self.sample_rate), dtype=np.float32)
+        results = []
+        idx = 0
+        for sentences_ in sentences:
+            parts = []
+            for waveform in waveforms[idx : idx + len(sentences_)]:
+                if parts:
+                    parts.append(pause)
+                parts.append(waveform)
+            idx += len(sentences_)
+            results.append(np.concatenate(parts) if parts else pause)
+        return results
+
+    def prefetch(
+        self, texts: t.List[str], max_workers: t.Optional[int] = None, **kwargs
+    ) -> t.List[dict]:
+        """Synthesizes all the uncached `texts` at once, so that their sentences
+        can be spread over the worker pool, then returns the output data
+        dictionaries in the order of `texts`. Long texts are synthesized segment
+        by segment, like in
+        :meth:`~manim_voiceover.services.base.SpeechService.prefetch`.
+
+        Args:
+            texts (t.List[str]): The texts to synthesize.
+            max_workers (t.Optional[int], optional): Number of sentences
+                synthesized concurrently by the worker pool. Defaults to
+                `num_workers`. Ignored without worker pool.
+
+        Raises:
+            TypeError: If keyword arguments are given, as Coqui takes none.
+        """
+        if kwargs:
+            raise TypeError(
+                f"CoquiService takes no synthesis arguments, got {sorted(kwargs)}"
+            )
+
+        pending = {}
+        for text in self._get_prefetch_units(texts):
+            input_data = {"input_text": text, "service": "coqui"}
+            if self.get_cached_result(input_data, self.cache_dir):
+                continue
+            pending[text] = {
+                "input_text": text,
+                "input_data": input_data,
+                "original_audio": self.get_audio_basename(input_data) + ".mp3",
+            }
+
+        if pending:
+            waveforms = self._synthesize_texts(list(pending), max_workers=max_workers)
+            for dict_, waveform in zip(pending.values(), waveforms):
+                array2mp3(
+                    waveform,
+                    self.sample_rate,
+                    str(Path(self.cache_dir) / dict_["original_audio"]),
+                )
+            self._finalize_batch(list(pending.items()))
+
+        # Everything is cached now, this only splices the segmented texts
+        results_by_text = {
+            text: self._wrap_generate_from_text(text) for text in dict.fromkeys(texts)
+        }
+        # Saved right away, so that other processes can use them
+        get_cache_index(self.cache_dir).flush()
+        return [results_by_text[text] for text in texts]
+
     def generate_from_text(
         self, text: str, cache_dir: str = None, path: str = None, **kwargs
     ) -> dict:
         if cache_dir is None:
             cache_dir = self.cache_dir
 
-        input_text = remove_bookmarks(text)
         input_data = {"input_text": text, "service": "coqui"}
 
         cached_result = self.get_cached_result(input_data, cache_dir)
@@ -72,17 +235,9 @@ class CoquiService(SpeechService):
         if not kwargs:
             kwargs = self.init_kwargs
 
-        output_path = str(Path(cache_dir) / audio_path)
-        wav_path = Path(output_path).with_suffix(".wav")
-
-        # Text to speech to a file
-        self.tts.tts_to_file(
-            text=input_text,
-            speaker=self.speaker,
-            language=self.language,
-            file_path=wav_path,
-        )
-        wav2mp3(wav_path, output_path)
+        # Write the waveform to the mp3 file directly, without an intermediate wav
+        waveform = self._synthesize_texts([text])[0]
+        array2mp3(waveform, self.sample_rate, str(Path(cache_dir) / audio_path))
 
         json_dict = {
             "input_text": text,
@@ -0,0 +1,194 @@
+import os
+import re
+import typing as t
+from pathlib import Path
+
+from manim import logger
+from pydub import AudioSegment
+from pydub.generators import Sine
+
+from manim_voiceover.cache import estimate_chars_per_second
+from manim_voiceover.helper import remove_bookmarks
+from manim_voiceover.modify_audio import get_audio_info
+from manim_voiceover.services.base import SpeechService
+from manim_voiceover.ssml import canonicalize_ssml, ssml_to_text
+from manim_voiceover.tracker import AUDIO_OFFSET_RESOLUTION
+
+#: Subdirectory of the cache directory where placeholder audio is written
+DRAFTS_DIR = "drafts"
+
+PLACEHOLDER_FRAME_RATE = 24000
+
+
+class VoiceoverRecorder:
+    """Collects the voiceovers requested from the speech services of a scene."""
+
+    def __init__(self):
+        self.calls = []
+
+    def record(self, service: SpeechService, text: str, kwargs: dict) -> None:
+        self.calls.append((service, text, kwargs))
+
+    def get_requests(self) -> t.List[t.Tuple[SpeechService, dict, t.List[str]]]:
+        """Groups the recorded texts by speech service and keyword arguments,
+        without duplicates.
+
+        Returns:
+            t.List[t.Tuple[SpeechService, dict, t.List[str]]]: The speech service,
+                the keyword arguments and the texts of each group.
+        """
+        groups = {}
+        for service, text, kwargs in self.calls:
+            key = (id(service), repr(sorted(kwargs.items())))
+            if key not in groups:
+                groups[key] = (service, kwargs, [])
+            if text not in groups[key][2]:
+                groups[key][2].append(text)
+        return list(groups.values())
+
+
+def estimate_word_boundaries(text: str, duration: float) -> t.List[dict]:
+    """Spreads the words of `text` over `duration` seconds proportionally to
+    their length, as if the text was spoken at a constant rate."""
+    word_boundaries = []
+    for match in re.finditer(r"\S+", text):
+        word_boundaries.append(
+            {
+                "audio_offset": int(
+                    match.start() / len(text) * duration * AUDIO_OFFSET_RESOLUTION
+                ),
+                "text_offset": match.start(),
+                "word_length": len(match.group()),
+                "text": match.group(),
+                "boundary_type": "Word",
+            }
+        )
+    word_boundaries.append(
+        {
+            "audio_offset": int(duration * AUDIO_OFFSET_RESOLUTION),
+            "text_offset": len(text),
+            "word_length": 0,
+            "text": "",
+            "boundary_type": "Word",
+        }
+    )
+    return word_boundaries
+
+
+class DryRunService(SpeechService):
+    """Speech service that doesn't synthesize anything. It returns placeholders
+    whose duration and word timings are estimated from the length of the text,
+    so that a scene can be run without waiting for, or paying for, synthesis.
+
+    The speaking rate is fitted on the cached voiceovers of the wrapped service
+    when there are enough of them and the service implements
+    :meth:`~manim_voiceover.services.base.SpeechService.get_input_data`. The
+    placeholders are never added to the cache.
+    """
+
+    #: Speaking rate used when it can't be fitted on the cache
+    chars_per_second: float = 15.0
+
+    def __init__(
+        self,
+        speech_service: SpeechService,
+        recorder: t.Optional[VoiceoverRecorder] = None,
+        placeholder: t.Optional[str] = None,
+        chars_per_second: t.Optional[float] = None,
+    ):
+        """
+        Args:
+            speech_service (SpeechService): The speech service of the scene.
+            recorder (VoiceoverRecorder, optional): Records the requested voiceovers.
+                Defaults to None.
+            placeholder (str, optional): The placeholder audio to write, ``"silence"``
+                or ``"beep"``. Defaults to None, in which case no audio is written.
+            chars_per_second (float, optional): The speaking rate. Defaults to the
+                rate fitted on the cache entries of the voice of `speech_service`,
+                or 15 characters per second if it can't be fitted.
+        """
+        if placeholder not in [None, "silence", "beep"]:
+            raise ValueError("placeholder must be None, 'silence' or 'beep'")
+
+        self.speech_service = speech_service
+        self.recorder = recorder
+        self.placeholder = placeholder
+        SpeechService.__init__(
+            self,
+            cache_dir=speech_service.cache_dir,
+            transcription_model=None,
+            use_cloud_whisper=False,
+        )
+
+        # The rate is only fitted on the voice of the service, which is known
+        # if the service can compute its cache key without synthesizing
+        voice = speech_service.get_input_data("")
+        if chars_per_second is None and voice is not None:
+            voice.pop("input_text")
+            chars_per_second = estimate_chars_per_second(self.cache_dir, voice)
+            if chars_per_second is not None:
+                logger.info(f"Estimated speaking rate: {chars_per_second:.1f} chars/s")
+        if chars_per_second is not None:
+            self.chars_per_second = chars_per_second
+
+    def _wrap_generate_from_text(self, text: str, path: str = None, **kwargs) -> dict:
+        text = " ".join(text.split())
+        if self.recorder is not None:
+            self.recorder.record(self.speech_service, text, kwargs)
+        return self.generate_from_text(text, **kwargs)
+
+    def _wrap_generate_from_ssml(self, ssml: str, path: str = None, **kwargs) -> dict:
+        text = ssml_to_text(canonicalize_ssml(ssml))
+        # Prefetching only covers SSML that is synthesized as text
+        if self.recorder is not None and not self.speech_service.supports_ssml():
+            self.recorder.record(self.speech_service, text, kwargs)
+        return self.generate_from_text(text, **kwargs)
+
+    def generate_from_text(
+        self, text: str, cache_dir: str = None, path: str = None, **kwargs
+    ) -> dict:
+        input_text = remove_bookmarks(text)
+        duration = max(len(input_text) / self.chars_per_second, 0.1)
+        input_data = {
+            "input_text": text,
+            "service": "dry_run",
+            "duration": round(duration, 3),
+        }
+
+        audio_path = None
+        audio_info = {
+            "duration": duration,
+            "sample_rate": None,
+            "channels": None,
+            "bytes": 0,
+        }
+        if self.placeholder is not None:
+            audio_path = str(
+                Path(DRAFTS_DIR)
+                / (self.get_audio_basename(input_data) + f"-{self.placeholder}.wav")
+            )
+            output_path = Path(self.cache_dir) / audio_path
+            if not os.path.exists(output_path):
+                os.makedirs(output_path.parent, exist_ok=True)
+                write_placeholder(str(output_path), duration, self.placeholder)
+            audio_info = get_audio_info(str(output_path))
+
+        return {
+            "input_text": text,
+            "input_data": input_data,
+            "original_audio": audio_path,
+            "final_audio": audio_path,
+            "word_boundaries": estimate_word_boundaries(input_text, duration),
+            "audio_info": audio_info,
+            "audio_hash": "",
+        }
+
+
+def write_placeholder(path: str, duration: float, kind: str = "silence") -> None:
+    """Writes a placeholder wav file of `duration` seconds, either silent or
+    starting with a short beep."""
+    audio = AudioSegment.silent(duration=duration * 1000, frame_rate=PLACEHOLDER_FRAME_RATE)
+    if kind == "beep":
+        beep = Sine(880).to_audio_segment(duration=min(150, len(audio))) - 20
+        audio = audio.overlay(beep.set_frame_rate(PLACEHOLDER_FRAME_RATE))
+    audio.export(path, format="wav")
@@ -1,3 +1,4 @@
+import base64
 import os
 import sys
 from pathlib import Path
@@ -8,8 +9,10 @@ from manim import logger
 
 from manim_voiceover.helper import create_dotenv_file, remove_bookmarks
 from manim_voiceover.services.base import SpeechService
+from manim_voiceover.tracker import AUDIO_OFFSET_RESOLUTION
 
 try:
+    import requests
     from elevenlabs import OutputFormat, Voice, VoiceSettings, generate, save, voices
 except ImportError:
     logger.error(
@@ -20,6 +23,48 @@ except ImportError:
 
 load_dotenv(find_dotenv(usecwd=True))
 
+ELEVENLABS_API_URL = "https://api.elevenlabs.io/v1"
+
+
+def alignment_to_word_boundaries(alignment: dict) -> List[dict]:
+    """Converts the character alignment returned by the ElevenLabs
+    with-timestamps endpoint into word boundaries.
+
+    Args:
+        alignment (dict): A dictionary with the keys ``characters`` and
+            ``character_start_times_seconds``.
+
+    Returns:
+        List[dict]: The word boundaries, in the same format as the ones
+            returned by the other speech services.
+    """
+    characters = alignment["characters"]
+    start_times = alignment["character_start_times_seconds"]
+
+    word_boundaries = []
+    word_start = None
+    # Append a space to close the last word
+    for idx, char in enumerate(characters + [" "]):
+        if char.isspace():
+            if word_start is not None:
+                word = "".join(characters[word_start:idx])
+                word_boundaries.append(
+                    {
+                        "audio_offset": int(
+                            start_times[word_start] * AUDIO_OFFSET_RESOLUTION
+                        ),
+                        "text_offset": word_start,
+                        "word_length": len(word),
+                        "text": word,
+                        "boundary_type": "Word",
+                    }
+                )
+                word_start = None
+        elif word_start is None:
+            word_start = idx
+
+    return word_boundaries
+
 
 def create_dotenv_elevenlabs():
     logger.info(
@@ -44,6 +89,9 @@ create_dotenv_elevenlabs()
 class ElevenLabsService(SpeechService):
     """Speech service for ElevenLabs API."""
 
+    max_concurrency = 2
+    max_input_length = 5000
+
     def __init__(
         self,
         voice_name: Optional[str] = None,
@@ -52,6 +100,7 @@ class ElevenLabsService(SpeechService):
         voice_settings: Optional[Union["VoiceSettings", dict]] = None,
         output_format: "OutputFormat" = "mp3_44100_128",
         transcription_model: str = "base",
+        use_timestamps: bool = True,
         **kwargs,
     ):
         """
@@ -84,6 +133,10 @@ class ElevenLabsService(SpeechService):
                 subscription. See the `API page:
                 <https://elevenlabs.io/docs/api-reference/text-to-speech>`
                 for reference. Defaults to `mp3_44100_128`.
+            use_timestamps (bool, optional): Whether to request the character
+                alignment along with the audio. The word boundaries are then
+                taken from the alignment and no transcription is needed.
+                Defaults to `True`.
         """
         if not voice_name and not voice_id:
             logger.warn(
@@ -139,9 +192,20 @@ class ElevenLabsService(SpeechService):
             )
 
         self.output_format = output_format
+        self.use_timestamps = use_timestamps
 
         SpeechService.__init__(self, transcription_model=transcription_model, **kwargs)
 
+    def get_input_data(self, text: str, **kwargs) -> dict:
+        return {
+            "input_text": remove_bookmarks(text),
+            "service": "elevenlabs",
+            "config": {
+                "model": self.model,
+                "voice": self.voice.model_dump(exclude_none=True),
+            },
+        }
+
     def generate_from_text(
         self,
         text: str,
@@ -153,14 +217,7 @@ class ElevenLabsService(SpeechService):
             cache_dir = self.cache_dir  # type: ignore
 
         input_text = remove_bookmarks(text)
-        input_data = {
-            "input_text": input_text,
-            "service": "elevenlabs",
-            "config": {
-                "model": self.model,
-                "voice": self.voice.model_dump(exclude_none=True),
-            },
-        }
+        input_data = self.get_input_data(text)
 
         # if not config.disable_caching:
         cached_result = self.get_cached_result(input_data, cache_dir)
@@ -173,22 +230,51 @@ class ElevenLabsService(SpeechService):
         else:
             audio_path = path
 
-        try:
-            audio = generate(
-                text=input_text,
-                voice=self.voice,
-                model=self.model,
-                output_format=self.output_format,
-            )
-            save(audio, str(Path(cache_dir) / audio_path))  # type: ignore
-        except Exception as e:
-            logger.error(e)
-            raise Exception("Failed to initialize ElevenLabs.")
-
         json_dict = {
             "input_text": text,
             "input_data": input_data,
             "original_audio": audio_path,
         }
 
+        try:
+            if self.use_timestamps:
+                json_dict["word_boundaries"] = self._generate_with_timestamps(
+                    input_text, str(Path(cache_dir) / audio_path)
+                )
+            else:
+                audio = generate(
+                    text=input_text,
+                    voice=self.voice,
+                    model=self.model,
+                    output_format=self.output_format,
+                )
+                save(audio, str(Path(cache_dir) / audio_path))  # type: ignore
+        except Exception as e:
+            logger.error(e)
+            raise Exception("Failed to initialize ElevenLabs.")
+
         return json_dict
+
+    def _generate_with_timestamps(self, text: str, output_path: str) -> List[dict]:
+        """Synthesizes `text` with the with-timestamps endpoint, saves the audio
+        to `output_path` and returns the word boundaries."""
+        payload = {"text": text, "model_id": self.model}
+        if self.voice.settings is not None:
+            payload["voice_settings"] = self.voice.settings.model_dump(
+                exclude_none=True
+            )
+
+        response = requests.post(
+            f"{ELEVENLABS_API_URL}/text-to-speech/{self.voice.voice_id}/with-timestamps",
+            params={"output_format": self.output_format},
+            headers={"xi-api-key": os.environ["ELEVEN_API_KEY"]},
+            json=payload,
+            timeout=120,
+        )
+        response.raise_for_status()
+        result = response.json()
+
+        with open(output_path, "wb") as f:
+            f.write(base64.b64decode(result["audio_base64"]))
+
+        return alignment_to_word_boundaries(result["alignment"])
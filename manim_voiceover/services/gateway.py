@@ -0,0 +1,159 @@
+import base64
+import json
+import os
+import typing as t
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from manim import logger
+
+from manim_voiceover.gateway import DEFAULT_GATEWAY_PORT, SYNTHESIZE, TRANSCRIBE
+from manim_voiceover.helper import remove_bookmarks
+from manim_voiceover.services.base import SpeechService
+
+DEFAULT_GATEWAY_URL = os.environ.get(
+    "MANIM_VOICEOVER_GATEWAY_URL", f"http://127.0.0.1:{DEFAULT_GATEWAY_PORT}"
+)
+
+
+def request_gateway(url: str, path: str, data: dict = None, timeout: float = 600) -> bytes:
+    """Sends a request to a synthesis gateway, a POST with a JSON body if
+    `data` is given, a GET otherwise, and returns the response body."""
+    body = None
+    headers = {}
+    if data is not None:
+        body = json.dumps(data).encode("utf-8")
+        headers["Content-Type"] = "application/json"
+    request = urllib.request.Request(url.rstrip("/") + path, data=body, headers=headers)
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.read()
+    except urllib.error.HTTPError as e:
+        raise Exception(f"Gateway request {path} failed: {e.read().decode()}") from e
+
+
+class GatewayTranscriber:
+    """Transcriber that sends the audio to a synthesis gateway, so that the
+    transcriptions of several render workers are batched and cached together.
+    Can be passed as ``transcriber`` to any speech service."""
+
+    def __init__(self, url: str = DEFAULT_GATEWAY_URL, timeout: float = 600, **kwargs):
+        """
+        Args:
+            url (str, optional): The URL of the gateway. Defaults to the
+                ``MANIM_VOICEOVER_GATEWAY_URL`` environment variable, or a gateway
+                on localhost.
+            timeout (float, optional): Timeout of a request, in seconds. Defaults to 600.
+            **kwargs: Arguments of the
+                :class:`~manim_voiceover.transcription.CloudWhisperTranscriber`
+                run by the gateway.
+        """
+        self.url = url
+        self.timeout = timeout
+        self.kwargs = kwargs
+
+    def get_cache_key(self) -> dict:
+        return {"engine": "gateway", "kwargs": self.kwargs}
+
+    def transcribe(self, path: str) -> dict:
+        with open(path, "rb") as f:
+            audio = base64.b64encode(f.read()).decode("ascii")
+        response = request_gateway(
+            self.url,
+            f"/{TRANSCRIBE}",
+            {
+                "audio": audio,
+                "extension": os.path.splitext(path)[1][1:],
+                "config": self.kwargs,
+            },
+            timeout=self.timeout,
+        )
+        return json.loads(response)["data"]
+
+    def transcribe_batch(self, paths: t.List[str]) -> t.List[dict]:
+        # Sent concurrently so that the gateway batches them
+        with ThreadPoolExecutor(max_workers=max(len(paths), 1)) as executor:
+            return list(executor.map(self.transcribe, paths))
+
+
+class GatewayService(SpeechService):
+    """Speech service that sends the synthesis to a shared gateway, see
+    :mod:`manim_voiceover.gateway`. Identical voiceovers requested by several
+    render workers at the same time are only synthesized once, and the results
+    are cached by the gateway for all the workers."""
+
+    # Concurrent requests are batched by the gateway
+    max_concurrency = 8
+
+    def __init__(
+        self,
+        url: str = DEFAULT_GATEWAY_URL,
+        config: t.Optional[dict] = None,
+        timeout: float = 600,
+        **kwargs,
+    ):
+        """
+        Args:
+            url (str, optional): The URL of the gateway. Defaults to the
+                ``MANIM_VOICEOVER_GATEWAY_URL`` environment variable, or a gateway
+                on localhost.
+            config (dict, optional): Keyword arguments of the speech service
+                of the gateway, e.g. the voice. The gateway creates one speech
+                service per config, and fails the jobs whose config has
+                arguments unknown to the speech service. Defaults to None.
+            timeout (float, optional): Timeout of a request, in seconds. Defaults to 600.
+        """
+        self.url = url
+        self.config = config or {}
+        self.timeout = timeout
+        SpeechService.__init__(self, **kwargs)
+
+    def get_input_data(self, text: str, **kwargs) -> dict:
+        return {
+            "input_text": text,
+            "service": "gateway",
+            "config": dict(self.config, **kwargs),
+        }
+
+    def generate_from_text(
+        self, text: str, cache_dir: str = None, path: str = None, **kwargs
+    ) -> dict:
+        """"""
+        if cache_dir is None:
+            cache_dir = self.cache_dir
+
+        input_data = self.get_input_data(remove_bookmarks(text), **kwargs)
+        cached_result = self.get_cached_result(input_data, cache_dir)
+        if cached_result is not None:
+            return cached_result
+
+        response = json.loads(
+            request_gateway(
+                self.url,
+                f"/{SYNTHESIZE}",
+                {"text": text, "config": input_data["config"]},
+                timeout=self.timeout,
+            )
+        )
+        extension = os.path.splitext(response["audio_blob"])[1]
+        if path is None:
+            audio_path = self.get_audio_basename(input_data) + extension
+        else:
+            audio_path = path
+
+        audio = request_gateway(
+            self.url, f"/blobs/{response['audio_blob']}", timeout=self.timeout
+        )
+        with open(Path(cache_dir) / audio_path, "wb") as f:
+            f.write(audio)
+        logger.info(f"Received {audio_path} from the gateway")
+
+        json_dict = {
+            "input_text": text,
+            "input_data": input_data,
+            "original_audio": audio_path,
+        }
+        json_dict.update(response["data"])
+        return json_dict
@@ -45,6 +45,9 @@ class OpenAIService(SpeechService):
     for more information about voices and models.
     """
 
+    max_concurrency = 4
+    max_input_length = 4096
+
     def __init__(
         self,
         voice: str = "alloy",
@@ -77,6 +80,18 @@ class OpenAIService(SpeechService):
             **kwargs
         )
 
+    def get_input_data(self, text: str, **kwargs) -> dict:
+        """"""
+        return {
+            "input_text": remove_bookmarks(text),
+            "service": "openai",
+            "config": {
+                "voice": self.voice,
+                "model": self.model,
+                "speed": kwargs.get("speed", 1.0),
+            },
+        }
+
     def generate_from_text(
         self, text: str, cache_dir: str = None, path: str = None, **kwargs
     ) -> dict:
@@ -90,15 +105,7 @@ class OpenAIService(SpeechService):
             raise ValueError("The speed must be between 0.25 and 4.0.")
 
         input_text = remove_bookmarks(text)
-        input_data = {
-            "input_text": input_text,
-            "service": "openai",
-            "config": {
-                "voice": self.voice,
-                "model": self.model,
-                "speed": speed,
-            },
-        }
+        input_data = self.get_input_data(text, **kwargs)
 
         cached_result = self.get_cached_result(input_data, cache_dir)
         if cached_result is not None:
@@ -1,6 +1,14 @@
+import multiprocessing
+import os
+import time
+import typing as t
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from manim import logger
-from manim_voiceover.helper import prompt_ask_missing_extras
+from manim_voiceover.cache import get_cache_index
+from manim_voiceover.helper import prompt_ask_missing_extras, remove_bookmarks
+from manim_voiceover.modify_audio import get_duration
+from manim_voiceover.tracker import AUDIO_OFFSET_RESOLUTION
 
 try:
     from pyttsx3 import Engine
@@ -12,19 +20,222 @@ except ImportError:
 from manim_voiceover.services.base import SpeechService
 
 
+def synthesize_with_word_events(engine, jobs: list) -> dict:
+    """Saves each of the `(name, text, path)` jobs to a file in a single run of
+    the engine loop, and collects the ``started-word`` events of each utterance
+    together with the time at which they were emitted.
+
+    Returns:
+        dict: Maps each job name to a dictionary with the keys ``start``,
+            ``end`` and ``words``, a list of ``(time, location, length)`` tuples.
+    """
+    events = {name: {"words": []} for name, _, _ in jobs}
+
+    def on_start(name):
+        events[name]["start"] = time.perf_counter()
+
+    def on_word(name, location, length):
+        events[name]["words"].append((time.perf_counter(), location, length))
+
+    def on_end(name, completed):
+        events[name]["end"] = time.perf_counter()
+
+    tokens = [
+        engine.connect("started-utterance", on_start),
+        engine.connect("started-word", on_word),
+        engine.connect("finished-utterance", on_end),
+    ]
+    try:
+        for name, text, path in jobs:
+            engine.save_to_file(text, path, name=name)
+        engine.runAndWait()
+        engine.stop()
+    finally:
+        for token in tokens:
+            engine.disconnect(token)
+
+    return events
+
+
+def word_events_to_word_boundaries(events: dict, text: str, duration: float):
+    """Converts the word events of an utterance to word boundaries.
+
+    The engine synthesizes to a file faster than real time and doesn't report
+    audio positions, so the event times are scaled from the synthesis time of
+    the utterance onto the duration of the audio. The result is only an
+    approximation, which is replaced by a transcription if
+    ``transcribe_word_boundaries`` is set on the service.
+
+    Returns:
+        list: The word boundaries, or None if the engine didn't emit word events.
+    """
+    if not events["words"] or "start" not in events or "end" not in events:
+        return None
+    elapsed = events["end"] - events["start"]
+    if elapsed <= 0:
+        return None
+
+    word_boundaries = []
+    for event_time, location, length in events["words"]:
+        fraction = min(max((event_time - events["start"]) / elapsed, 0), 1)
+        word_boundaries.append(
+            {
+                "audio_offset": int(fraction * duration * AUDIO_OFFSET_RESOLUTION),
+                "text_offset": location,
+                "word_length": length,
+                "text": text[location : location + length],
+                "boundary_type": "Word",
+            }
+        )
+    return word_boundaries
+
+
+#: Engine properties copied to the worker process
+ENGINE_PROPERTIES = ["rate", "volume", "voice"]
+
+
+# Engine created once in the worker process
+_worker_engine = None
+
+
+def _init_worker() -> None:
+    global _worker_engine
+    _worker_engine = Engine()
+
+
+def _synthesize_in_worker(properties: dict, jobs: list) -> dict:
+    for name, value in properties.items():
+        _worker_engine.setProperty(name, value)
+    return synthesize_with_word_events(_worker_engine, jobs)
+
+
 class PyTTSX3Service(SpeechService):
     """Speech service class for pyttsx3."""
 
-    def __init__(self, engine=None, **kwargs):
-        """"""
+    def __init__(
+        self,
+        engine=None,
+        use_worker_process: bool = None,
+        transcribe_word_boundaries: bool = False,
+        **kwargs,
+    ):
+        """
+        Args:
+            engine (pyttsx3.Engine, optional): The engine to use. Defaults to a new
+                engine with the default settings.
+            use_worker_process (bool, optional): Whether to run the engine loop in a
+                dedicated worker process instead of the rendering process. The worker
+                creates its own engine once, and uses the rate, volume and voice of
+                `engine`. The worker only isolates the engine loop, the calling thread
+                still waits for each synthesis. Use ``background_synthesis`` or
+                :meth:`prefetch` to render while synthesizing. Defaults to True if no
+                engine is given, False otherwise.
+            transcribe_word_boundaries (bool, optional): Whether to replace the word
+                boundaries reported by the engine with a transcription. By default
+                they are kept, so that the service works offline, and voiceovers
+                are only transcribed if the engine reported no word boundaries.
+                Defaults to False.
+        """
         prompt_ask_missing_extras("pyttsx3", "pyttsx3", "PyTTSX3Service")
 
-        if engine is None:
-            engine = Engine()
+        if use_worker_process is None:
+            use_worker_process = engine is None
 
+        # Without worker process, the engine is created on first use
         self.engine = engine
+        self.use_worker_process = use_worker_process
+        self._worker = None
+        self.transcribe_word_boundaries = transcribe_word_boundaries
         SpeechService.__init__(self, **kwargs)
 
+    def _needs_transcription(self, dict_: dict) -> bool:
+        approximate = dict_.get("approximate_word_boundaries", False)
+        if approximate and not self.transcribe_word_boundaries:
+            return False
+        return SpeechService._needs_transcription(self, dict_)
+
+    def _synthesize(self, jobs: list) -> dict:
+        """Saves all the `(name, text, path)` jobs in a single run of the engine
+        loop, see :func:`synthesize_with_word_events`."""
+        if not self.use_worker_process:
+            if self.engine is None:
+                self.engine = Engine()
+            return synthesize_with_word_events(self.engine, jobs)
+
+        if self._worker is None:
+            self._worker = ProcessPoolExecutor(
+                max_workers=1,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+            )
+        properties = {}
+        if self.engine is not None:
+            properties = {
+                name: self.engine.getProperty(name) for name in ENGINE_PROPERTIES
+            }
+        return self._worker.submit(_synthesize_in_worker, properties, jobs).result()
+
+    def prefetch(
+        self, texts: t.List[str], max_workers: t.Optional[int] = None, **kwargs
+    ) -> t.List[dict]:
+        """Synthesizes all the uncached `texts` in a single run of the engine loop,
+        then returns the output data dictionaries in the order of `texts`. Long
+        texts are synthesized segment by segment, like in
+        :meth:`~manim_voiceover.services.base.SpeechService.prefetch`.
+
+        Raises:
+            TypeError: If keyword arguments are given, as pyttsx3 takes none.
+        """
+        if kwargs:
+            raise TypeError(
+                f"PyTTSX3Service takes no synthesis arguments, got {sorted(kwargs)}"
+            )
+
+        pending = {}
+        for text in self._get_prefetch_units(texts):
+            input_data = {"input_text": text, "service": "pyttsx3"}
+            if self.get_cached_result(input_data, self.cache_dir):
+                continue
+            audio_path = self.get_audio_basename(input_data) + ".mp3"
+            pending[text] = {
+                "input_text": text,
+                "input_data": input_data,
+                "original_audio": audio_path,
+            }
+
+        if pending:
+            logger.info(f"Synthesizing {len(pending)} voiceovers with pyttsx3")
+            jobs = [
+                (
+                    dict_["original_audio"],
+                    remove_bookmarks(text),
+                    str(Path(self.cache_dir) / dict_["original_audio"]),
+                )
+                for text, dict_ in pending.items()
+            ]
+            events = self._synthesize(jobs)
+
+            generated = []
+            for (name, input_text, output_path), (text, dict_) in zip(
+                jobs, pending.items()
+            ):
+                if not os.path.exists(output_path) or os.path.getsize(output_path) == 0:
+                    # Left to generate_from_text below
+                    logger.warning(f"pyttsx3 did not produce {name}, retrying")
+                    continue
+                word_boundaries = word_events_to_word_boundaries(
+                    events[name], input_text, get_duration(output_path)
+                )
+                if word_boundaries is not None:
+                    dict_["word_boundaries"] = word_boundaries
+                    dict_["approximate_word_boundaries"] = True
+                generated.append((text, dict_))
+            self._finalize_batch(generated)
+
+        results = [self._wrap_generate_from_text(text) for text in texts]
+        get_cache_index(self.cache_dir).flush()
+        return results
+
     def generate_from_text(
         self, text: str, cache_dir: str = None, path: str = None
     ) -> dict:
@@ -43,9 +254,9 @@ class PyTTSX3Service(SpeechService):
         else:
             audio_path = path
 
-        self.engine.save_to_file(text, str(Path(cache_dir) / audio_path))
-        self.engine.runAndWait()
-        self.engine.stop()
+        input_text = remove_bookmarks(text)
+        output_path = str(Path(cache_dir) / audio_path)
+        events = self._synthesize([(audio_path, input_text, output_path)])
 
         json_dict = {
             "input_text": text,
@@ -53,4 +264,11 @@ class PyTTSX3Service(SpeechService):
             "original_audio": audio_path,
         }
 
+        word_boundaries = word_events_to_word_boundaries(
+            events[audio_path], input_text, get_duration(output_path)
+        )
+        if word_boundaries is not None:
+            json_dict["word_boundaries"] = word_boundaries
+            json_dict["approximate_word_boundaries"] = True
+
         return json_dict
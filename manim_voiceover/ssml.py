@@ -0,0 +1,191 @@
+import re
+import xml.etree.ElementTree as ET
+import typing as t
+
+from manim_voiceover.helper import format_bookmark
+
+#: Namespace prefixes that can be used in SSML fragments without declaring them
+SSML_NAMESPACES = {"mstts": "https://www.w3.org/2001/mstts"}
+
+# Elements whose content is not spoken as it is written
+UNSPOKEN_ELEMENTS = ["audio", "backgroundaudio", "lexicon", "meta", "metadata"]
+
+
+def is_ssml_document(ssml: str) -> bool:
+    """Whether `ssml` is a complete SSML document, as opposed to a fragment
+    that still needs to be wrapped in a ``<speak>`` element."""
+    return re.match(r"\s*(<\?xml[^>]*\?>\s*)?<speak[\s>]", ssml) is not None
+
+
+def _wrap_fragment(ssml: str) -> str:
+    ssml = " ".join(ssml.split())
+    if is_ssml_document(ssml):
+        return ssml
+    namespaces = " ".join(
+        f'xmlns:{prefix}="{uri}"' for prefix, uri in SSML_NAMESPACES.items()
+    )
+    return f"<speak {namespaces}>{ssml}</speak>"
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+XML_NAMESPACE = "http://www.w3.org/XML/1998/namespace"
+
+
+def _parse(ssml: str) -> t.Tuple[ET.Element, t.List[t.Tuple[str, str]]]:
+    """Parses SSML, and returns the ``<speak>`` element together with the
+    ``(prefix, uri)`` namespaces declared in the SSML."""
+    parser = ET.XMLPullParser(events=["start", "start-ns"])
+    try:
+        parser.feed(_wrap_fragment(ssml))
+        parser.close()
+    except ET.ParseError as e:
+        raise ValueError(f"Invalid SSML: {e}") from e
+
+    root = None
+    namespaces = []
+    for event, value in parser.read_events():
+        if event == "start-ns":
+            namespaces.append(value)
+        elif root is None:
+            root = value
+    return root, namespaces
+
+
+def parse_ssml(ssml: str) -> ET.Element:
+    """Parses an SSML document or fragment.
+
+    Args:
+        ssml (str): The SSML. Fragments are wrapped in a ``<speak>`` element.
+
+    Returns:
+        ET.Element: The ``<speak>`` element.
+    """
+    return _parse(ssml)[0]
+
+
+def _escape(text: str, quote: bool = False) -> str:
+    text = text.replace("&", "&amp;").replace("<", "&lt;")
+    if quote:
+        text = text.replace('"', "&quot;").replace("\t", "&#x9;")
+        return text.replace("\n", "&#xA;")
+    return text.replace(">", "&gt;")
+
+
+def _serialize(
+    element: ET.Element,
+    prefixes: t.Dict[str, str],
+    namespaces: t.Sequence[t.Tuple[str, str]] = (),
+) -> str:
+    """Serializes an element in canonical form: namespace declarations first,
+    then the attributes sorted by name, and no empty-element tags."""
+
+    def qualify(name: str) -> str:
+        if not name.startswith("{"):
+            return name
+        uri, local = name[1:].split("}", 1)
+        prefix = prefixes.get(uri, "")
+        return f"{prefix}:{local}" if prefix else local
+
+    tag = qualify(element.tag)
+    declarations = [
+        f'{"xmlns:" + prefix if prefix else "xmlns"}="{_escape(uri, True)}"'
+        for prefix, uri in sorted(namespaces)
+    ]
+    attributes = [
+        f'{name}="{_escape(value, True)}"'
+        for name, value in sorted(
+            (qualify(name), value) for name, value in element.attrib.items()
+        )
+    ]
+    parts = ["<" + " ".join([tag] + declarations + attributes) + ">"]
+    parts.append(_escape(element.text or ""))
+    for child in element:
+        parts.append(_serialize(child, prefixes))
+        parts.append(_escape(child.tail or ""))
+    parts.append(f"</{tag}>")
+    return "".join(parts)
+
+
+def canonicalize_ssml(ssml: str) -> str:
+    """Returns the canonical form of an SSML document or fragment, so that
+    SSML that only differs by whitespace, attribute order or quoting gets the
+    same cache key.
+
+    Args:
+        ssml (str): The SSML.
+
+    Returns:
+        str: The canonical SSML. Fragments stay fragments.
+    """
+    speak, namespaces = _parse(ssml)
+    prefixes = {uri: prefix for prefix, uri in namespaces}
+    prefixes[XML_NAMESPACE] = "xml"
+    if is_ssml_document(ssml):
+        return _serialize(speak, prefixes, namespaces)
+
+    # Only the content of the <speak> element the fragment was wrapped in
+    parts = [_escape(speak.text or "")]
+    for child in speak:
+        parts.append(_serialize(child, prefixes))
+        parts.append(_escape(child.tail or ""))
+    return "".join(parts)
+
+
+def ssml_to_text(ssml: str) -> str:
+    """Removes the tags of an SSML document or fragment, except for the
+    ``<bookmark>`` tags, which are converted to the bookmarks used in text
+    voiceovers.
+
+    Args:
+        ssml (str): The SSML.
+
+    Returns:
+        str: The text, with bookmarks.
+    """
+    parts = []
+
+    def visit(element: ET.Element) -> None:
+        tag = _local_name(element.tag)
+        if tag == "bookmark":
+            parts.append(format_bookmark(element.get("mark", "")))
+            return
+        if tag == "break":
+            parts.append(" ")
+            return
+        if tag in UNSPOKEN_ELEMENTS:
+            return
+        if element.text:
+            parts.append(element.text)
+        for child in element:
+            visit(child)
+            if child.tail:
+                parts.append(child.tail)
+
+    visit(parse_ssml(ssml))
+    return " ".join("".join(parts).split())
+
+
+def align_word_boundaries(word_boundaries: t.List[dict], text: str) -> t.List[dict]:
+    """Sets the text offsets of word boundaries that were reported for SSML
+    input to the offsets of the same words in `text`, the SSML without tags.
+    Words are matched in order.
+
+    Args:
+        word_boundaries (t.List[dict]): The word boundaries, with a ``text`` key.
+        text (str): The text of the SSML, without bookmarks.
+
+    Returns:
+        t.List[dict]: The word boundaries whose word was found in `text`.
+    """
+    aligned = []
+    position = 0
+    for wb in word_boundaries:
+        idx = text.find(wb["text"], position)
+        if idx == -1:
+            continue
+        aligned.append(dict(wb, text_offset=idx))
+        position = idx + len(wb["text"])
+    return aligned
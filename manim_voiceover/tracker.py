@@ -1,3 +1,4 @@
+from concurrent.futures import Future
 from pathlib import Path
 import re
 import numpy as np
@@ -8,7 +9,11 @@ from scipy.interpolate import interp1d
 
 from manim import Scene
 from manim_voiceover.modify_audio import get_duration
-from manim_voiceover.helper import remove_bookmarks
+from manim_voiceover.helper import (
+    BOOKMARK_PATTERN,
+    get_bookmark_mark,
+    remove_bookmarks,
+)
 
 AUDIO_OFFSET_RESOLUTION = 10_000_000
 
@@ -36,25 +41,102 @@ class TimeInterpolator:
 class VoiceoverTracker:
     """Class to track the progress of a voiceover in a scene."""
 
-    def __init__(self, scene: Scene, data: dict, cache_dir: str):
+    def __init__(
+        self,
+        scene: Scene,
+        data: Optional[dict],
+        cache_dir: str,
+        speech_service=None,
+        future: Optional[Future] = None,
+    ):
         """Initializes a VoiceoverTracker object.
 
         Args:
             scene (Scene): The scene to which the voiceover belongs.
             path (str): The path to the JSON file containing the voiceover data.
+            speech_service (SpeechService, optional): The speech service that
+                synthesized the voiceover. If it defers transcription, the word
+                boundaries are requested from it the first time bookmark timings
+                are needed. Defaults to None.
+            future (Future, optional): A future that resolves to the voiceover
+                data, if it is still being synthesized. `data` is ignored and the
+                future is waited for the first time the duration or the bookmarks
+                are needed. Defaults to None.
         """
         self.scene = scene
-        self.data = data
         self.cache_dir = cache_dir
-        self.duration = get_duration(Path(cache_dir) / self.data["final_audio"])
+        self.speech_service = speech_service
         # last_t = scene.last_t
         last_t = scene.renderer.time
         if last_t is None:
             last_t = 0
         self.start_t = last_t
-        self.end_t = last_t + self.duration
 
-        if "word_boundaries" in self.data:
+        self._future = future
+        self._done_callbacks = []
+        if future is None:
+            self._set_data(data)
+
+    def _set_data(self, data: dict) -> None:
+        self._data = data
+        if "audio_info" in data:
+            self._duration = data["audio_info"]["duration"]
+        else:
+            self._duration = get_duration(Path(self.cache_dir) / data["final_audio"])
+
+        # Bookmark timings are computed on first use if transcription is deferred
+        self._timing_pending = (
+            self.speech_service is not None
+            and self.speech_service._defers_transcription(data)
+        )
+        if self._timing_pending:
+            return
+        if "word_boundaries" in data or "bookmarks" in data:
+            self._process_bookmarks()
+
+    def is_ready(self) -> bool:
+        """Returns whether the voiceover has been synthesized."""
+        return self._future is None or self._future.done()
+
+    def wait(self) -> None:
+        """Waits until the voiceover has been synthesized."""
+        if self._future is None:
+            return
+        future = self._future
+        self._future = None
+        self._set_data(future.result())
+        for callback in self._done_callbacks:
+            callback(self)
+        self._done_callbacks = []
+
+    def add_done_callback(self, callback) -> None:
+        """Calls `callback` with the tracker once the voiceover has been
+        synthesized, or right away if it already has been."""
+        if self._future is None:
+            callback(self)
+        else:
+            self._done_callbacks.append(callback)
+
+    @property
+    def data(self) -> dict:
+        self.wait()
+        return self._data
+
+    @property
+    def duration(self) -> float:
+        self.wait()
+        return self._duration
+
+    @property
+    def end_t(self) -> float:
+        return self.start_t + self.duration
+
+    def _resolve_timing(self) -> None:
+        if not self._timing_pending:
+            return
+        self._timing_pending = False
+        self.speech_service.resolve_word_boundaries(self.data)
+        if "word_boundaries" in self.data or "bookmarks" in self.data:
             self._process_bookmarks()
 
     def _get_fallback_word_boundaries(self):
@@ -84,7 +166,35 @@ class VoiceoverTracker:
         self.bookmark_times = {}
         self.bookmark_distances = {}
 
-        word_boundaries = self.data["word_boundaries"]
+        self.input_text = self.data["input_text"]
+        self.content = ""
+
+        # Mark bookmark distances
+        # parts = re.split("(<bookmark .*/>)", self.input_text)
+        parts = re.split(f"({BOOKMARK_PATTERN})", self.input_text)
+        for p in parts:
+            if re.fullmatch(BOOKMARK_PATTERN, p):
+                self.bookmark_distances[get_bookmark_mark(p)] = len(self.content)
+            else:
+                self.content += p
+
+        # Use the exact bookmark offsets reported by the speech service, if any
+        native_bookmarks = self.data.get("bookmarks", {})
+        for mark in self.bookmark_distances:
+            if mark in native_bookmarks:
+                self.bookmark_times[mark] = (
+                    self.start_t + native_bookmarks[mark] / AUDIO_OFFSET_RESOLUTION
+                )
+
+        remaining_distances = {
+            mark: dist
+            for mark, dist in self.bookmark_distances.items()
+            if mark not in self.bookmark_times
+        }
+        if not remaining_distances:
+            return
+
+        word_boundaries = self.data.get("word_boundaries")
         if not word_boundaries or len(word_boundaries) < 2:
             logger.warning(
                 f"Word boundaries for voiceover {self.data['input_text']} are not "
@@ -100,26 +210,20 @@ class VoiceoverTracker:
         else:
             transcribed_text_len = net_text_len
 
-        self.input_text = self.data["input_text"]
-        self.content = ""
-
-        # Mark bookmark distances
-        # parts = re.split("(<bookmark .*/>)", self.input_text)
-        parts = re.split(r"(<bookmark\s*mark\s*=[\'\"]\w*[\"\']\s*/>)", self.input_text)
-        for p in parts:
-            matched = re.match(r"<bookmark\s*mark\s*=[\'\"](.*)[\"\']\s*/>", p)
-            if matched:
-                self.bookmark_distances[matched.group(1)] = len(self.content)
-            else:
-                self.content += p
-
-        for mark, dist in self.bookmark_distances.items():
+        for mark, dist in remaining_distances.items():
             # Normalize text offset
             elapsed = self.time_interpolator.interpolate(
                 dist * transcribed_text_len / net_text_len
             )
             self.bookmark_times[mark] = self.start_t + elapsed
 
+    def get_bookmark_times(self) -> dict:
+        """Returns the time of each bookmark of the voiceover in the scene, in
+        seconds. Empty if the voiceover has no bookmarks."""
+        self.wait()
+        self._resolve_timing()
+        return dict(getattr(self, "bookmark_times", {}))
+
     def get_remaining_duration(self, buff: float = 0.0) -> float:
         """Returns the remaining duration of the voiceover.
 
@@ -135,6 +239,8 @@ class VoiceoverTracker:
         return result
 
     def _check_bookmarks(self):
+        self.wait()
+        self._resolve_timing()
         if not hasattr(self, "bookmark_times"):
             raise Exception(
                 "Word boundaries are required for timing with bookmarks. "
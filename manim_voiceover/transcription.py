@@ -0,0 +1,365 @@
+import os
+import tempfile
+import typing as t
+
+from manim import logger
+from pydub import AudioSegment
+from pydub.silence import detect_nonsilent
+
+from manim_voiceover.tracker import AUDIO_OFFSET_RESOLUTION
+
+
+def _get(obj, key: str):
+    # The OpenAI client returns objects, older versions and raw responses dicts
+    if isinstance(obj, dict):
+        return obj.get(key)
+    return getattr(obj, key, None)
+
+
+def words_to_word_boundaries(words: list, offset: float = 0.0) -> t.List[dict]:
+    """Converts the word timestamps returned by the Whisper API to word boundaries.
+
+    Args:
+        words (list): The words, each with a ``word`` and a ``start`` time in seconds.
+        offset (float, optional): Time subtracted from each start time, in seconds.
+            Defaults to 0.
+
+    Returns:
+        t.List[dict]: The word boundaries.
+    """
+    word_boundaries = []
+    current_text_offset = 0
+    for word_obj in words:
+        word = _get(word_obj, "word").strip()  # Remove any leading/trailing whitespace
+        start_time = max(_get(word_obj, "start") - offset, 0)
+
+        # Skip words that are just punctuation or empty
+        if not word or word.isspace() or (len(word) == 1 and not word.isalnum()):
+            continue
+
+        word_boundaries.append(
+            {
+                "audio_offset": int(start_time * AUDIO_OFFSET_RESOLUTION),
+                "text_offset": current_text_offset,
+                "word_length": len(word),
+                "text": word,
+                "boundary_type": "Word",
+            }
+        )
+        current_text_offset += len(word) + 1  # +1 for space
+    return word_boundaries
+
+
+def trim_pauses(
+    segment: AudioSegment, max_pause: float = 0.5, keep_pause: float = 0.25
+) -> t.Tuple[AudioSegment, t.List[t.Tuple[float, float]]]:
+    """Shortens the pauses of an audio segment with a simple energy based voice
+    activity detection.
+
+    Args:
+        segment (AudioSegment): The audio to trim.
+        max_pause (float, optional): Pauses longer than this are shortened, in
+            seconds. Defaults to 0.5.
+        keep_pause (float, optional): Silence kept on each side of the speech, in
+            seconds. Defaults to 0.25.
+
+    Returns:
+        t.Tuple[AudioSegment, t.List[t.Tuple[float, float]]]: The trimmed audio,
+            and the ``(trimmed_time, original_time)`` of the start of each kept
+            piece, to map times back with :func:`map_time`.
+    """
+    speech = detect_nonsilent(
+        segment,
+        min_silence_len=int(max_pause * 1000),
+        silence_thresh=segment.dBFS - 16,
+    )
+    if not speech:
+        return segment, [(0.0, 0.0)]
+
+    keep = int(keep_pause * 1000)
+    trimmed = AudioSegment.empty()
+    pieces = []
+    previous_end = 0
+    for start, end in speech:
+        start = max(start - keep, previous_end)
+        end = min(end + keep, len(segment))
+        pieces.append((trimmed.duration_seconds, start / 1000))
+        trimmed += segment[start:end]
+        previous_end = end
+    return trimmed, pieces
+
+
+def map_time(time: float, pieces: t.List[t.Tuple[float, float]]) -> float:
+    """Maps a time of an audio trimmed by :func:`trim_pauses` back to the
+    original audio."""
+    trimmed_start, original_start = pieces[0]
+    for piece in pieces:
+        if piece[0] > time:
+            break
+        trimmed_start, original_start = piece
+    return original_start + time - trimmed_start
+
+
+class CloudWhisperTranscriber:
+    """Transcribes audio files with OpenAI's cloud-based Whisper API.
+
+    Whisper only needs 16 kHz mono audio, so the audio is downmixed,
+    resampled and encoded at a low bitrate before being uploaded, and the
+    returned timestamps are mapped back to the original audio.
+
+    Several short clips can be transcribed with a single request: they are
+    concatenated with silences in between, and the returned words are split
+    back to each clip using the known clip offsets.
+    """
+
+    def __init__(
+        self,
+        client=None,
+        model: str = "whisper-1",
+        max_batch_duration: float = 300.0,
+        marker_silence: float = 1.5,
+        downsample: bool = True,
+        sample_rate: int = 16000,
+        bitrate: str = "32k",
+        trim_silence: bool = False,
+        **kwargs,
+    ):
+        """
+        Args:
+            client (openai.OpenAI, optional): The client to use. Defaults to the
+                module-level client of the ``openai`` package.
+            model (str, optional): The transcription model. Defaults to ``"whisper-1"``.
+            max_batch_duration (float, optional): Maximum duration of the audio
+                uploaded in a single request, in seconds. Defaults to 300.
+            marker_silence (float, optional): Duration of the silence between
+                two clips of a batch, in seconds. Defaults to 1.5.
+            downsample (bool, optional): Whether to downmix and resample the audio
+                to `sample_rate` and encode it at `bitrate` before uploading it.
+                Defaults to True.
+            sample_rate (int, optional): The sample rate of the upload. Defaults to 16000.
+            bitrate (str, optional): The bitrate of the upload. Defaults to ``"32k"``.
+            trim_silence (bool, optional): Whether to shorten long pauses before
+                uploading, see :func:`trim_pauses`. Defaults to False.
+            **kwargs: Keyword arguments passed to ``audio.transcriptions.create``.
+        """
+        self.client = client
+        self.model = model
+        self.max_batch_duration = max_batch_duration
+        self.marker_silence = marker_silence
+        self.downsample = downsample
+        self.sample_rate = sample_rate
+        self.bitrate = bitrate
+        self.trim_silence = trim_silence
+        self.kwargs = kwargs
+
+    def get_cache_key(self) -> dict:
+        """Describes the model and the settings that affect the transcription,
+        for the transcription cache."""
+        return {
+            "engine": "cloud_whisper",
+            "model": self.model,
+            "trim_silence": self.trim_silence,
+            "kwargs": self.kwargs,
+        }
+
+    def _get_client(self):
+        if self.client is not None:
+            return self.client
+
+        import openai
+        from dotenv import find_dotenv, load_dotenv
+
+        load_dotenv(find_dotenv(usecwd=True))
+        if os.getenv("OPENAI_API_KEY") is None:
+            from manim_voiceover.services.openai import create_dotenv_openai
+
+            create_dotenv_openai()
+        return openai
+
+    def _request(self, audio_file):
+        return self._get_client().audio.transcriptions.create(
+            model=self.model,
+            file=audio_file,
+            response_format="verbose_json",
+            timestamp_granularities=["word"],
+            **self.kwargs,
+        )
+
+    def prepare(
+        self, segment: AudioSegment
+    ) -> t.Tuple[AudioSegment, t.List[t.Tuple[float, float]]]:
+        """Downmixes, resamples and trims the audio to upload.
+
+        Returns:
+            t.Tuple[AudioSegment, t.List[t.Tuple[float, float]]]: The audio, and
+                the pieces to map its times back with :func:`map_time`.
+        """
+        pieces = [(0.0, 0.0)]
+        if self.downsample:
+            segment = segment.set_channels(1).set_frame_rate(self.sample_rate)
+        if self.trim_silence:
+            segment, pieces = trim_pauses(segment)
+        return segment, pieces
+
+    def _upload(self, segment: AudioSegment):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            upload_path = os.path.join(tmp_dir, "upload.mp3")
+            if self.downsample:
+                segment.export(upload_path, format="mp3", bitrate=self.bitrate)
+            else:
+                segment.export(upload_path, format="mp3")
+            logger.debug(f"Uploading {os.path.getsize(upload_path)} bytes to Whisper")
+            with open(upload_path, "rb") as audio_file:
+                return self._request(audio_file)
+
+    def transcribe(self, path: str) -> dict:
+        """Transcribes a single audio file.
+
+        Returns:
+            dict: A dictionary with the keys ``word_boundaries`` and ``transcribed_text``.
+        """
+        if self.downsample or self.trim_silence:
+            segment, pieces = self.prepare(AudioSegment.from_file(path))
+            result = self._upload(segment)
+        else:
+            pieces = [(0.0, 0.0)]
+            with open(path, "rb") as audio_file:
+                result = self._request(audio_file)
+
+        logger.info("Cloud Transcription: " + _get(result, "text"))
+        words = _get(result, "words") or []
+        if not words:
+            logger.warning("No words found in transcription result")
+        return {
+            "word_boundaries": words_to_word_boundaries(map_words(words, pieces)),
+            "transcribed_text": _get(result, "text"),
+        }
+
+    def transcribe_batch(self, paths: t.List[str]) -> t.List[dict]:
+        """Transcribes several audio files with as few requests as possible.
+        Batches whose words can't be attributed unambiguously to the clips are
+        transcribed again clip by clip.
+
+        Returns:
+            t.List[dict]: The results of :meth:`transcribe`, in the order of `paths`.
+        """
+        segments = [AudioSegment.from_file(path) for path in paths]
+
+        # Group consecutive clips so that each upload stays under the limit
+        groups = []
+        current = []
+        current_duration = 0.0
+        for idx, segment in enumerate(segments):
+            duration = segment.duration_seconds + self.marker_silence
+            if current and current_duration + duration > self.max_batch_duration:
+                groups.append(current)
+                current = []
+                current_duration = 0.0
+            current.append(idx)
+            current_duration += duration
+        if current:
+            groups.append(current)
+
+        results = [None] * len(paths)
+        for group in groups:
+            group_results = None
+            if len(group) > 1:
+                group_results = self._transcribe_group([segments[i] for i in group])
+                if group_results is None:
+                    logger.info(
+                        "Could not split the batched transcription, "
+                        "transcribing the clips one by one."
+                    )
+            if group_results is None:
+                group_results = [self.transcribe(paths[i]) for i in group]
+            for idx, result in zip(group, group_results):
+                results[idx] = result
+        return results
+
+    def _transcribe_group(
+        self, segments: t.List[AudioSegment]
+    ) -> t.Optional[t.List[dict]]:
+        prepared = [self.prepare(segment) for segment in segments]
+        silence = AudioSegment.silent(
+            duration=self.marker_silence * 1000, frame_rate=prepared[0][0].frame_rate
+        )
+        combined = AudioSegment.empty()
+        intervals = []
+        for idx, (segment, _) in enumerate(prepared):
+            if idx > 0:
+                combined += silence
+            start = combined.duration_seconds
+            combined += segment
+            intervals.append((start, combined.duration_seconds))
+
+        result = self._upload(combined)
+
+        words = _get(result, "words") or []
+        clip_words = split_words_by_intervals(words, intervals, self.marker_silence / 2)
+        if clip_words is None:
+            return None
+
+        logger.info(f"Cloud Transcription of {len(segments)} clips in one request")
+        results = []
+        for words_, (start, _), (_, pieces) in zip(clip_words, intervals, prepared):
+            words_ = map_words(words_, pieces, offset=start)
+            results.append(
+                {
+                    "word_boundaries": words_to_word_boundaries(words_),
+                    "transcribed_text": " ".join(w["word"].strip() for w in words_),
+                }
+            )
+        return results
+
+
+def map_words(
+    words: list, pieces: t.List[t.Tuple[float, float]], offset: float = 0.0
+) -> t.List[dict]:
+    """Maps the times of the words of an uploaded audio back to the original
+    audio, see :meth:`CloudWhisperTranscriber.prepare`.
+
+    Args:
+        words (list): The words, each with a ``word``, a ``start`` and an ``end``.
+        pieces (t.List[t.Tuple[float, float]]): The pieces returned by :func:`trim_pauses`.
+        offset (float, optional): The start time of the audio in the upload. Defaults to 0.
+
+    Returns:
+        t.List[dict]: The words, as dictionaries.
+    """
+    return [
+        {
+            "word": _get(word, "word"),
+            "start": map_time(max(_get(word, "start") - offset, 0), pieces),
+            "end": map_time(max(_get(word, "end") - offset, 0), pieces),
+        }
+        for word in words
+    ]
+
+
+def split_words_by_intervals(
+    words: list, intervals: t.List[t.Tuple[float, float]], tolerance: float
+) -> t.Optional[t.List[list]]:
+    """Assigns each word of a batched transcription to the clip it belongs to.
+
+    Args:
+        words (list): The words, each with ``start`` and ``end`` times in seconds.
+        intervals (t.List[t.Tuple[float, float]]): The start and end time of each clip.
+        tolerance (float): How far outside of its clip a word may start or end.
+
+    Returns:
+        t.Optional[t.List[list]]: The words of each clip, or None if a word falls
+            into a gap, spans two clips, or a clip received no words at all.
+    """
+    clip_words = [[] for _ in intervals]
+    for word in words:
+        start, end = _get(word, "start"), _get(word, "end")
+        for idx, (clip_start, clip_end) in enumerate(intervals):
+            if clip_start - tolerance <= start and end <= clip_end + tolerance:
+                clip_words[idx].append(word)
+                break
+        else:
+            return None
+
+    if any(not words_ for words_ in clip_words):
+        return None
+    return clip_words
@@ -123,7 +123,6 @@ def main():
             scene,
             "-o",
             ofile,
-            "--disable_caching",
         ]
 
         # Run manim with the command
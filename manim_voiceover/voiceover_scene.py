@@ -2,12 +2,24 @@ from math import ceil
 from contextlib import contextmanager
 from pathlib import Path
 from typing import Optional, Generator
+import hashlib
+import json
 import re
 import typing as t
 import os
+import uuid
 
-from manim import Scene, config
+from concurrent.futures import ThreadPoolExecutor
+
+from manim import Scene, config, logger
+from manim.utils.exceptions import EndSceneEarlyException
+from manim_voiceover import hashing
+from manim_voiceover.cache import flush_cache_indices, get_audio_hash
+from manim_voiceover.modify_audio import duck_audio, mix_audio
+from manim_voiceover.preview import write_narration_preview
 from manim_voiceover.services.base import SpeechService
+from manim_voiceover.services.dry_run import DryRunService, VoiceoverRecorder
+from manim_voiceover.ssml import ssml_to_text
 from manim_voiceover.tracker import VoiceoverTracker
 from manim_voiceover.helper import chunks, remove_bookmarks
 
@@ -15,6 +27,38 @@ from manim_voiceover.helper import chunks, remove_bookmarks
 # SCRIPT_FILE_PATH = "media/script.txt"
 
 
+def voiceover_prefetch_enabled() -> bool:
+    """Whether scenes are rendered in two passes, see
+    :meth:`VoiceoverScene.prefetch_voiceovers`. Enabled with the
+    ``--voiceover-prefetch`` flag or ``MANIM_VOICEOVER_PREFETCH=1``."""
+    if os.environ.get("MANIM_VOICEOVER_PREFETCH") == "1":
+        return True
+    return getattr(config, "voiceover_prefetch", False)
+
+
+def voiceover_draft_mode() -> t.Optional[str]:
+    """The placeholder audio used in draft mode, ``"silence"`` or ``"beep"``,
+    or None if draft mode is disabled. In draft mode nothing is synthesized,
+    see :class:`~manim_voiceover.services.dry_run.DryRunService`. Enabled with
+    the ``--voiceover-draft`` flag or ``MANIM_VOICEOVER_DRAFT=1`` (or ``=beep``).
+    """
+    draft = os.environ.get("MANIM_VOICEOVER_DRAFT")
+    if draft in ["silence", "beep"]:
+        return draft
+    if draft == "1" or getattr(config, "voiceover_draft", False):
+        return "silence"
+    return None
+
+
+def voiceover_preview_enabled() -> bool:
+    """Whether scenes only write a narration preview instead of being rendered,
+    see :meth:`VoiceoverScene.render_narration_preview`. Enabled with the
+    ``--voiceover-preview`` flag or ``MANIM_VOICEOVER_PREVIEW=1``."""
+    if os.environ.get("MANIM_VOICEOVER_PREVIEW") == "1":
+        return True
+    return getattr(config, "voiceover_preview", False)
+
+
 class VoiceoverScene(Scene):
     """A scene class that can be used to add voiceover to a scene."""
 
@@ -27,6 +71,7 @@ class VoiceoverScene(Scene):
         self,
         speech_service: SpeechService,
         create_subcaption: bool = True,
+        background_synthesis: bool = False,
     ) -> None:
         """Sets the speech service to be used for the voiceover. This method
         should be called before adding any voiceover to the scene.
@@ -35,6 +80,10 @@ class VoiceoverScene(Scene):
             speech_service (SpeechService): The speech service to be used.
             create_subcaption (bool, optional): Whether to create subcaptions for the scene. Defaults to True. If `config.save_last_frame` is True, the argument is
             ignored and no subcaptions will be created.
+            background_synthesis (bool, optional): Whether to synthesize voiceovers in
+                the background, so that the animations of a voiceover block are rendered
+                while its audio is synthesized. The scene only waits for the audio when
+                the duration or the bookmarks of the voiceover are needed. Defaults to False.
         """
         # Check for environment variable to enable cloud-based Whisper
         if os.environ.get("MANIM_VOICEOVER_USE_CLOUD_WHISPER") == "1":
@@ -45,25 +94,69 @@ class VoiceoverScene(Scene):
         elif hasattr(config, "use_cloud_whisper"):
             speech_service.use_cloud_whisper = config.use_cloud_whisper
             
-        self.speech_service = speech_service
+        # Voiceover blocks salt the animation hashes of this scene
+        hashing.install()
+
+        self.speech_service = self._wrap_speech_service(speech_service)
         self.current_tracker = None
+        self.background_synthesis = background_synthesis
+        # The last voiceover that isn't on a named track
+        self._narration_tracker = None
+        self._trackers = []
+        self._tracker_gains = []
+        self.tracks = {}
+        self._track_clips = []
         if config.save_last_frame:
             self.create_subcaption = False
         else:
             self.create_subcaption = create_subcaption
 
+    def _wrap_speech_service(self, speech_service: SpeechService) -> SpeechService:
+        # In the dry pass of a two-pass render, only record the voiceovers
+        recorder = getattr(self, "_voiceover_recorder", None)
+        if recorder is not None:
+            return DryRunService(speech_service, recorder)
+        elif voiceover_draft_mode() is not None:
+            return DryRunService(speech_service, placeholder=voiceover_draft_mode())
+        return speech_service
+
+    def add_track(
+        self, name: str, speech_service: SpeechService, gain: float = 0.0
+    ) -> None:
+        """Adds a named narration track with its own speech service, e.g. for a
+        second voice in a dialogue or an ambient line under the narration.
+        Voiceovers on a track are synthesized in the background, concurrently
+        with the other tracks, and the clips of all tracks are mixed into a
+        single audio file when the scene ends.
+
+        Args:
+            name (str): The name of the track, passed as ``track`` to :meth:`voiceover`.
+            speech_service (SpeechService): The speech service of the track.
+            gain (float, optional): The gain of the track in dB. Defaults to 0.
+        """
+        if not hasattr(self, "speech_service"):
+            raise Exception("You need to call set_speech_service() before adding a track.")
+
+        self.tracks[name] = {
+            "speech_service": self._wrap_speech_service(speech_service),
+            "gain": gain,
+            "tracker": None,
+        }
+
     def add_voiceover_text(
         self,
         text: str,
         subcaption: Optional[str] = None,
         max_subcaption_len: int = 70,
         subcaption_buff: float = 0.1,
+        track: Optional[str] = None,
         **kwargs,
     ) -> VoiceoverTracker:
         """Adds voiceover to the scene.
 
         Args:
             text (str): The text to be spoken.
+            track (Optional[str], optional): The name of the track to add the voiceover to, see :meth:`add_track`. Defaults to None, which adds it to the main narration.
             subcaption (Optional[str], optional): Alternative subcaption text. If not specified, `text` is chosen as the subcaption. Defaults to None.
             max_subcaption_len (int, optional): Maximum number of characters for a subcaption. Subcaptions that are longer are split into chunks that are smaller than `max_subcaption_len`. Defaults to 70.
             subcaption_buff (float, optional): The duration between split subcaption chunks in seconds. Defaults to 0.1.
@@ -71,39 +164,146 @@ class VoiceoverScene(Scene):
         Returns:
             VoiceoverTracker: The tracker object for the voiceover.
         """
+        return self._add_voiceover(
+            text, False, subcaption, max_subcaption_len, subcaption_buff, track, **kwargs
+        )
+
+    def add_voiceover_ssml(
+        self,
+        ssml: str,
+        subcaption: Optional[str] = None,
+        max_subcaption_len: int = 70,
+        subcaption_buff: float = 0.1,
+        track: Optional[str] = None,
+        **kwargs,
+    ) -> VoiceoverTracker:
+        """Adds an SSML voiceover to the scene. The SSML is canonicalized, so
+        that formatting changes don't invalidate the cache. Speech services that
+        support SSML natively synthesize it as it is and report the time of each
+        ``<bookmark>``, the other ones synthesize its text, and the bookmarks are
+        placed by transcription like for text voiceovers.
+
+        Args:
+            ssml (str): The SSML to be spoken, either a fragment or a complete ``<speak>`` document.
+            subcaption (Optional[str], optional): Alternative subcaption text. If not specified, the text of the SSML is chosen as the subcaption. Defaults to None.
+            max_subcaption_len (int, optional): Maximum number of characters for a subcaption. Subcaptions that are longer are split into chunks that are smaller than `max_subcaption_len`. Defaults to 70.
+            subcaption_buff (float, optional): The duration between split subcaption chunks in seconds. Defaults to 0.1.
+            track (Optional[str], optional): The name of the track to add the voiceover to, see :meth:`add_track`. Defaults to None, which adds it to the main narration.
+
+        Returns:
+            VoiceoverTracker: The tracker object for the voiceover.
+        """
+        return self._add_voiceover(
+            ssml, True, subcaption, max_subcaption_len, subcaption_buff, track, **kwargs
+        )
+
+    def _add_voiceover(
+        self,
+        text: str,
+        is_ssml: bool,
+        subcaption: Optional[str],
+        max_subcaption_len: int,
+        subcaption_buff: float,
+        track: Optional[str],
+        **kwargs,
+    ) -> VoiceoverTracker:
         if not hasattr(self, "speech_service"):
             raise Exception(
                 "You need to call init_voiceover() before adding a voiceover."
             )
 
-        dict_ = self.speech_service._wrap_generate_from_text(text, **kwargs)
-        tracker = VoiceoverTracker(self, dict_, self.speech_service.cache_dir)
+        if track is not None and track not in self.tracks:
+            raise ValueError(f"Unknown track {track!r}, add it with add_track() first.")
+
+        speech_service = self.speech_service
+        if track is not None:
+            speech_service = self.tracks[track]["speech_service"]
+
+        if is_ssml:
+            submit = speech_service.submit_ssml
+            generate = speech_service._wrap_generate_from_ssml
+        else:
+            submit = speech_service.submit
+            generate = speech_service._wrap_generate_from_text
+
+        if self.background_synthesis or track is not None:
+            tracker = VoiceoverTracker(
+                self,
+                None,
+                speech_service.cache_dir,
+                speech_service,
+                future=submit(text, **kwargs),
+            )
+        else:
+            dict_ = generate(text, **kwargs)
+            tracker = VoiceoverTracker(
+                self, dict_, speech_service.cache_dir, speech_service
+            )
         self.renderer.skip_animations = self.renderer._original_skipping_status
-        self.add_sound(str(Path(self.speech_service.cache_dir) / dict_["final_audio"]))
         self.current_tracker = tracker
+        self._trackers.append(tracker)
+        if track is None:
+            self._narration_tracker = tracker
+            self._tracker_gains.append(0.0)
+        else:
+            self.tracks[track]["tracker"] = tracker
+            self._tracker_gains.append(self.tracks[track]["gain"])
 
         # if self.create_script:
         #     self.save_to_script_file(text)
 
-        if self.create_subcaption:
-            if subcaption is None:
+        if subcaption is None:
+            if is_ssml:
+                subcaption = remove_bookmarks(ssml_to_text(text))
+            else:
                 subcaption = remove_bookmarks(text)
 
+        # Added once the voiceover is synthesized, at the time the voiceover started
+        tracker.add_done_callback(
+            lambda tracker: self._add_voiceover_media(
+                tracker, subcaption, max_subcaption_len, subcaption_buff, track
+            )
+        )
+        return tracker
+
+    def _add_voiceover_media(
+        self,
+        tracker: VoiceoverTracker,
+        subcaption: str,
+        max_subcaption_len: int,
+        subcaption_buff: float,
+        track: Optional[str] = None,
+    ) -> None:
+        offset = tracker.start_t - self.renderer.time
+        if tracker.data["final_audio"] is not None:
+            path = str(Path(tracker.cache_dir) / tracker.data["final_audio"])
+            if track is None:
+                # A cached play() since the voiceover started leaves
+                # skip_animations set, in which case add_sound does nothing
+                self.renderer.skip_animations = self.renderer._original_skipping_status
+                self.add_sound(path, time_offset=offset)
+            else:
+                # Mixed with the other tracks when the scene ends
+                self._track_clips.append(
+                    (path, tracker.start_t, self.tracks[track]["gain"])
+                )
+
+        if self.create_subcaption:
             self.add_wrapped_subcaption(
                 subcaption,
                 tracker.duration,
                 subcaption_buff=subcaption_buff,
                 max_subcaption_len=max_subcaption_len,
+                offset=offset,
             )
 
-        return tracker
-
     def add_wrapped_subcaption(
         self,
         subcaption: str,
         duration: float,
         subcaption_buff: float = 0.1,
         max_subcaption_len: int = 70,
+        offset: float = 0.0,
     ) -> None:
         """Adds a subcaption to the scene. If the subcaption is longer than `max_subcaption_len`, it is split into chunks that are smaller than `max_subcaption_len`.
 
@@ -112,6 +312,7 @@ class VoiceoverScene(Scene):
             duration (float): The duration of the subcaption in seconds.
             max_subcaption_len (int, optional): Maximum number of characters for a subcaption. Subcaptions that are longer are split into chunks that are smaller than `max_subcaption_len`. Defaults to 70.
             subcaption_buff (float, optional): The duration between split subcaption chunks in seconds. Defaults to 0.1.
+            offset (float, optional): The start of the subcaption relative to the current time, in seconds. Defaults to 0.
         """
         subcaption = " ".join(subcaption.split())
         n_chunk = ceil(len(subcaption) / max_subcaption_len)
@@ -130,7 +331,7 @@ class VoiceoverScene(Scene):
             len(subcaption) / len("".join(subcaptions)) for subcaption in subcaptions
         ]
 
-        current_offset = 0
+        current_offset = offset
         for idx, subcaption in enumerate(subcaptions):
             chunk_duration = duration * subcaption_weights[idx]
             self.add_subcaption(
@@ -140,8 +341,264 @@ class VoiceoverScene(Scene):
             )
             current_offset += chunk_duration
 
-    def add_voiceover_ssml(self, ssml: str, **kwargs) -> None:
-        raise NotImplementedError("SSML input not implemented yet.")
+    def render(self, preview: bool = False):
+        if voiceover_preview_enabled():
+            # Like Scene.render, return None: a truthy result makes the
+            # OpenGL renderer render the scene again
+            self.render_narration_preview()
+            return None
+        if (
+            voiceover_prefetch_enabled()
+            and voiceover_draft_mode() is None
+            and getattr(self, "_voiceover_recorder", None) is None
+        ):
+            self.prefetch_voiceovers()
+        return super().render(preview)
+
+    def prefetch_voiceovers(self) -> None:
+        """Runs a dry pass of the scene with animations skipped to collect the
+        text of every voiceover, including the ones built at runtime, then
+        synthesizes them all in bulk so that the actual render hits a warm cache.
+        """
+        recorder = VoiceoverRecorder()
+        try:
+            scene = type(self)()
+            scene._voiceover_recorder = recorder
+            scene.renderer._original_skipping_status = True
+            scene.renderer.skip_animations = True
+            scene.setup()
+            scene.construct()
+        except Exception as e:
+            logger.warning(f"Could not collect the voiceovers of the scene: {e}")
+
+        requests = recorder.get_requests()
+        if not requests:
+            return
+        logger.info(
+            f"Prefetching {sum(len(texts) for _, _, texts in requests)} voiceovers"
+        )
+        with ThreadPoolExecutor(max_workers=len(requests)) as executor:
+            futures = [
+                executor.submit(service.prefetch, texts, **kwargs)
+                for service, kwargs, texts in requests
+            ]
+            for future in futures:
+                future.result()
+
+    def render_narration_preview(self) -> t.Dict[str, str]:
+        """Runs the scene with animations skipped, which only advances the
+        scene time without rendering any frame, then writes the mixed narration
+        track and the timeline of the voiceovers and bookmarks as JSON and SRT
+        files to ``<media_dir>/narration``.
+
+        Returns:
+            t.Dict[str, str]: The paths of the ``audio``, ``json`` and ``srt`` files.
+        """
+        self.renderer._original_skipping_status = True
+        self.renderer.skip_animations = True
+        self.setup()
+        try:
+            self.construct()
+        except EndSceneEarlyException:
+            pass
+        self.tear_down()
+
+        paths = write_narration_preview(
+            getattr(self, "_trackers", []),
+            str(Path(config.media_dir) / "narration"),
+            str(self),
+            self.renderer.time,
+            gains=getattr(self, "_tracker_gains", []),
+        )
+        logger.info(f"Narration preview of {str(self)} written to {paths['audio']}")
+        return paths
+
+    def _salt_animation_hash(self, hash_: str) -> str:
+        """Folds the audio hash and duration of the current voiceover block into
+        the hash of an animation, so that its partial movie file is only reused
+        if the voiceover is unchanged. With `background_synthesis`, animations
+        played before the audio of the block is ready get a provisional hash,
+        and their partial movie files are renamed when the scene ends."""
+        block = getattr(self, "_voiceover_block", None)
+        if block is None:
+            return hash_
+
+        if "audio_hash" not in block and block["tracker"].is_ready():
+            self._set_block_audio(block)
+
+        if "audio_hash" in block:
+            salted = hashing.salt_hash(hash_, self._get_block_salt(block))
+            cached = self.renderer.file_writer.is_already_cached(salted)
+        else:
+            # The audio is still being synthesized, so it is most likely new
+            salted = hashing.salt_hash(hash_, f"pending_{uuid.uuid4()}")
+            block["pending"].append((len(block["animation_hashes"]), salted))
+            cached = False
+        block["animation_hashes"].append(hash_)
+        block["cached"].append(cached)
+        return salted
+
+    def _set_block_audio(self, block: dict) -> None:
+        # The audio hash is stored in the cache entry, the audio isn't read here
+        data = block["tracker"].data
+        block.update(
+            {
+                "text": remove_bookmarks(data["input_text"]),
+                "audio_hash": data.get("audio_hash", ""),
+                "duration": block["tracker"].duration,
+            }
+        )
+
+    def _get_block_salt(self, block: dict) -> str:
+        return f"{block['audio_hash']}_{block['duration']:.6f}"
+
+    def _close_voiceover_block(self, outer_block: Optional[dict] = None) -> None:
+        block = getattr(self, "_voiceover_block", None)
+        self._voiceover_block = outer_block
+        if block is None or not block["animation_hashes"]:
+            return
+        if not hasattr(self, "_voiceover_blocks"):
+            self._voiceover_blocks = []
+        self._voiceover_blocks.append(block)
+
+    def _finish_voiceover_blocks(self) -> None:
+        """Gives the animations that were rendered under a provisional hash
+        their final hash, now that the audio of all blocks is known."""
+        for block in getattr(self, "_voiceover_blocks", []):
+            if "audio_hash" not in block:
+                self._set_block_audio(block)
+            for idx, provisional in block.pop("pending"):
+                hashing.rename_partial_movie_file(
+                    self.renderer,
+                    provisional,
+                    hashing.salt_hash(
+                        block["animation_hashes"][idx], self._get_block_salt(block)
+                    ),
+                )
+            del block["tracker"]
+
+    def add_background_music(
+        self,
+        path: str,
+        gain: float = -6.0,
+        duck_gain: float = -12.0,
+        attack: float = 0.1,
+        release: float = 0.3,
+        loop: bool = True,
+    ) -> None:
+        """Adds a music bed that plays during the whole scene and is ducked
+        under the voiceovers. The gain envelope is computed from the start and
+        end of each voiceover when the scene ends, so the music follows the
+        narration without any manual editing.
+
+        Args:
+            path (str): The path to the music file.
+            gain (float, optional): The gain of the music, in dB. Defaults to -6.
+            duck_gain (float, optional): The additional gain of the music under
+                the voiceovers, in dB. Defaults to -12.
+            attack (float, optional): The duration of the fade down before a
+                voiceover, in seconds. Defaults to 0.1.
+            release (float, optional): The duration of the fade up after a
+                voiceover, in seconds. Defaults to 0.3.
+            loop (bool, optional): Whether to loop the music if it is shorter
+                than the scene. Defaults to True.
+        """
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Music file {path} does not exist")
+
+        self._background_music = {
+            "path": str(path),
+            "gain": gain,
+            "duck_gain": duck_gain,
+            "attack": attack,
+            "release": release,
+            "loop": loop,
+        }
+
+    def add_ducked_music(self) -> Optional[str]:
+        """Writes the background music added with :meth:`add_background_music`,
+        ducked under the voiceovers of the scene, and adds it to the scene. The
+        result is cached by the hash of the music and the timeline, so it is
+        only written again if the music or the voiceovers changed.
+
+        Returns:
+            Optional[str]: The path of the ducked music file, or None if the
+                scene has no background music.
+        """
+        music = getattr(self, "_background_music", None)
+        # The last play() might have been cached, which leaves skip_animations set
+        if music is None or self.renderer._original_skipping_status:
+            return None
+
+        duration = self.renderer.time
+        intervals = [
+            (round(tracker.start_t, 3), round(tracker.end_t, 3))
+            for tracker in getattr(self, "_trackers", [])
+        ]
+        key = dict(music, path=get_audio_hash(music["path"]))
+        key.update({"intervals": intervals, "duration": round(duration, 3)})
+        key = hashlib.sha256(json.dumps(key).encode("utf-8")).hexdigest()[:16]
+        path = Path(self.speech_service.cache_dir) / "music" / f"{str(self)}-{key}.wav"
+
+        if not path.exists():
+            os.makedirs(path.parent, exist_ok=True)
+            duck_audio(
+                music["path"],
+                intervals,
+                str(path),
+                duration=duration,
+                gain=music["gain"],
+                duck_gain=music["duck_gain"],
+                attack=music["attack"],
+                release=music["release"],
+                loop=music["loop"],
+            )
+        self.renderer.skip_animations = self.renderer._original_skipping_status
+        self.add_sound(str(path), time_offset=-duration)
+        return str(path)
+
+    def mix_tracks(self) -> Optional[str]:
+        """Mixes the clips of all the tracks added with :meth:`add_track` into
+        one audio file, and adds it to the scene. The mix is cached, so it is
+        only written again if a clip or its start time changed.
+
+        Returns:
+            Optional[str]: The path of the mixed audio file, or None if no
+                track has any clip.
+        """
+        clips = sorted(getattr(self, "_track_clips", []), key=lambda clip: clip[1])
+        # The last play() might have been cached, which leaves skip_animations set
+        if not clips or self.renderer._original_skipping_status:
+            return None
+
+        key = hashlib.sha256(json.dumps(clips).encode("utf-8")).hexdigest()[:16]
+        path = Path(self.speech_service.cache_dir) / "tracks" / f"{str(self)}-{key}.wav"
+        if not path.exists():
+            os.makedirs(path.parent, exist_ok=True)
+            mix_audio(
+                [(clip_path, start) for clip_path, start, _ in clips],
+                str(path),
+                gains=[gain for _, _, gain in clips],
+            )
+        self.renderer.skip_animations = self.renderer._original_skipping_status
+        self.add_sound(str(path), time_offset=-self.renderer.time)
+        return str(path)
+
+    def tear_down(self) -> None:
+        # Voiceovers that were never waited for still need to be added
+        for tracker in getattr(self, "_trackers", []):
+            tracker.wait()
+        self._finish_voiceover_blocks()
+        self.mix_tracks()
+        self.add_ducked_music()
+        super().tear_down()
+        flush_cache_indices()
+
+        if getattr(self, "_voiceover_blocks", None):
+            hashing.write_invalidation_report(
+                self._voiceover_blocks,
+                str(Path(config.media_dir) / "voiceover_blocks" / f"{str(self)}.json"),
+            )
 
     # def save_to_script_file(self, text: str) -> None:
     #     text = " ".join(text.split())
@@ -150,14 +607,32 @@ class VoiceoverScene(Scene):
     #         f.write(text)
     #         f.write("\n\n")
 
-    def wait_for_voiceover(self) -> None:
-        """Waits for the voiceover to finish."""
-        if not hasattr(self, "current_tracker"):
-            return
-        if self.current_tracker is None:
+    def wait_for_voiceover(self, track: Optional[str] = None) -> None:
+        """Waits for the voiceover to finish.
+
+        Args:
+            track (Optional[str], optional): The track whose last voiceover to
+                wait for. Defaults to None, which waits for the last voiceover
+                of the main narration, i.e. not on a named track.
+        """
+        tracker = getattr(self, "_narration_tracker", None)
+        if track is not None:
+            tracker = self.tracks[track]["tracker"]
+        if tracker is None:
             return
 
-        self.safe_wait(self.current_tracker.get_remaining_duration())
+        self.safe_wait(tracker.get_remaining_duration())
+
+    def wait_for_tracks(self) -> None:
+        """Waits until the last voiceover of every track has finished."""
+        remaining = [
+            tracker.get_remaining_duration()
+            for tracker in [getattr(self, "_narration_tracker", None)]
+            + [track["tracker"] for track in getattr(self, "tracks", {}).values()]
+            if tracker is not None
+        ]
+        if remaining:
+            self.safe_wait(max(remaining))
 
     def safe_wait(self, duration: float) -> None:
         """Waits for a given duration. If the duration is less than one frame, it waits for one frame.
@@ -178,13 +653,20 @@ class VoiceoverScene(Scene):
 
     @contextmanager
     def voiceover(
-        self, text: t.Optional[str] = None, ssml: t.Optional[str] = None, **kwargs
+        self,
+        text: t.Optional[str] = None,
+        ssml: t.Optional[str] = None,
+        wait: bool = True,
+        **kwargs,
     ) -> Generator[VoiceoverTracker, None, None]:
         """The main function to be used for adding voiceover to a scene.
 
         Args:
             text (str, optional): The text to be spoken. Defaults to None.
             ssml (str, optional): The SSML to be spoken. Defaults to None.
+            wait (bool, optional): Whether to wait for the voiceover to finish at the
+                end of the block. Blocks that don't wait can overlap with the next
+                blocks, e.g. a voiceover on another track. Defaults to True.
 
         Yields:
             Generator[VoiceoverTracker, None, None]: The voiceover tracker object.
@@ -192,10 +674,20 @@ class VoiceoverScene(Scene):
         if text is None and ssml is None:
             raise ValueError("Please specify either a voiceover text or SSML string.")
 
+        outer_block = getattr(self, "_voiceover_block", None)
         try:
             if text is not None:
-                yield self.add_voiceover_text(text, **kwargs)
+                tracker = self.add_voiceover_text(text, **kwargs)
             elif ssml is not None:
-                yield self.add_voiceover_ssml(ssml, **kwargs)
+                tracker = self.add_voiceover_ssml(ssml, **kwargs)
+            self._voiceover_block = {
+                "tracker": tracker,
+                "animation_hashes": [],
+                "cached": [],
+                "pending": [],
+            }
+            yield tracker
         finally:
-            self.wait_for_voiceover()
+            if wait:
+                self.wait_for_voiceover(kwargs.get("track"))
+            self._close_voiceover_block(outer_block)
@@ -0,0 +1,75 @@
+import pytest
+
+from manim_voiceover.services import azure as azure_service
+from manim_voiceover.services.azure import (
+    BOOKMARK_REGEX,
+    AzureService,
+    remove_bookmark_offset,
+)
+
+
+def test_remove_bookmark_offset():
+    text = "Hello <bookmark mark='A'/>big <bookmark mark=\"B\"/>world"
+    bookmark_spans = [m.span() for m in BOOKMARK_REGEX.finditer(text)]
+    assert len(bookmark_spans) == 2
+
+    plain = "Hello big world"
+    for word in ["Hello", "big", "world"]:
+        offset = remove_bookmark_offset(text.index(word), bookmark_spans)
+        assert offset == plain.index(word)
+
+
+def test_remove_bookmark_offset_without_bookmarks():
+    assert remove_bookmark_offset(7, []) == 7
+
+
+class FakeSynthesizer:
+    """Stands in for a synthesizer with an open connection to Azure."""
+
+    n_created = 0
+    n_failures = 0
+
+    def __init__(self, speech_config):
+        if FakeSynthesizer.n_failures > 0:
+            FakeSynthesizer.n_failures -= 1
+            raise ConnectionError("could not connect")
+        FakeSynthesizer.n_created += 1
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    monkeypatch.setattr(azure_service, "prompt_ask_missing_extras", lambda *a: None)
+    monkeypatch.setattr(azure_service, "_PooledSynthesizer", FakeSynthesizer)
+    monkeypatch.setattr(AzureService, "_get_speech_config", lambda self: None)
+    monkeypatch.setattr(FakeSynthesizer, "n_created", 0)
+    monkeypatch.setattr(FakeSynthesizer, "n_failures", 0)
+    return AzureService(
+        cache_dir=str(tmp_path / "cache"), max_synthesizers=2, transcription_model=None
+    )
+
+
+def test_synthesizers_are_reused(service):
+    first = service._acquire_synthesizer()
+    service._release_synthesizer(first)
+    assert service._acquire_synthesizer() is first
+
+    # A second synthesizer is only created while the first one is in use
+    second = service._acquire_synthesizer()
+    assert second is not first
+    assert FakeSynthesizer.n_created == 2
+
+    service._open_synthesizers(4)
+    assert FakeSynthesizer.n_created == 2
+
+
+def test_failed_synthesizers_free_their_slot(service):
+    FakeSynthesizer.n_failures = 2
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            service._acquire_synthesizer()
+    assert service._n_synthesizers == 0
+
+    # Otherwise this would wait forever for a synthesizer to be released
+    service._acquire_synthesizer()
+    service._acquire_synthesizer()
+    assert FakeSynthesizer.n_created == 2
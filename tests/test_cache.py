@@ -0,0 +1,320 @@
+import json
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+from pydub import AudioSegment
+
+from manim_voiceover.cache import (
+    CacheIndex,
+    CacheStoragePolicy,
+    get_audio_hash,
+    get_transcription_key,
+    load_cache_entries,
+    update_cache_entry,
+)
+from manim_voiceover.defaults import DEFAULT_VOICEOVER_CACHE_JSON_FILENAME
+from manim_voiceover.helper import remove_bookmarks
+from manim_voiceover.services.base import SpeechService, merge_part_timings
+from manim_voiceover.tracker import AUDIO_OFFSET_RESOLUTION
+
+
+class StubService(SpeechService):
+    """Synthesizes one second of silence per text, with dummy word boundaries."""
+
+    def __init__(self, **kwargs):
+        self.n_synthesized = 0
+        SpeechService.__init__(self, transcription_model=None, **kwargs)
+
+    def generate_from_text(self, text, cache_dir=None, path=None, **kwargs):
+        if cache_dir is None:
+            cache_dir = self.cache_dir
+        input_data = {"input_text": remove_bookmarks(text), "service": "stub"}
+        cached_result = self.get_cached_result(input_data, cache_dir)
+        if cached_result is not None:
+            return cached_result
+
+        self.n_synthesized += 1
+        audio_path = self.get_audio_basename(input_data) + ".wav"
+        AudioSegment.silent(duration=1000).export(
+            Path(cache_dir) / audio_path, format="wav"
+        )
+        return {
+            "input_text": text,
+            "input_data": input_data,
+            "original_audio": audio_path,
+            "word_boundaries": [],
+        }
+
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    return str(tmp_path / "cache")
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg is required")
+def test_compacted_entry_is_restored_without_policy(cache_dir):
+    policy = CacheStoragePolicy(codec="mp3", cold_after_days=-1)
+    service = StubService(cache_dir=cache_dir, storage_policy=policy)
+    dict_ = service._wrap_generate_from_text("Hello world")
+    final_audio = Path(cache_dir) / dict_["final_audio"]
+
+    service.compact_cache()
+    assert not final_audio.exists()
+
+    # A service without storage policy still gets a playable cache hit
+    service = StubService(cache_dir=cache_dir)
+    hit = service._wrap_generate_from_text("Hello world")
+
+    assert service.n_synthesized == 0
+    assert hit["final_audio"] == dict_["final_audio"]
+    assert final_audio.exists()
+
+
+def read_cache_file(cache_dir):
+    with open(Path(cache_dir) / DEFAULT_VOICEOVER_CACHE_JSON_FILENAME) as f:
+        return json.load(f)
+
+
+def test_cache_index_only_writes_on_flush(cache_dir):
+    index = CacheIndex(cache_dir)
+    index.put({"input_data": {"input_text": "a"}, "final_audio": "a.mp3"})
+
+    assert not (Path(cache_dir) / DEFAULT_VOICEOVER_CACHE_JSON_FILENAME).exists()
+    assert index.get({"input_text": "a"})["final_audio"] == "a.mp3"
+
+    index.flush()
+    assert read_cache_file(cache_dir) == [
+        {"input_data": {"input_text": "a"}, "final_audio": "a.mp3"}
+    ]
+
+
+def test_cache_index_merges_entries_of_other_processes(cache_dir):
+    index = CacheIndex(cache_dir)
+    index.put({"input_data": {"input_text": "a"}, "final_audio": "a.mp3"})
+
+    # Another process writes its own entry in the meantime
+    other = CacheIndex(cache_dir)
+    other.put({"input_data": {"input_text": "b"}, "final_audio": "b.mp3"})
+    other.flush()
+    os.utime(other.json_path, (0, 0))
+
+    index.flush()
+    assert [entry["final_audio"] for entry in read_cache_file(cache_dir)] == [
+        "a.mp3",
+        "b.mp3",
+    ]
+
+
+def test_cache_index_refreshes_when_the_file_changes(cache_dir):
+    index = CacheIndex(cache_dir)
+    assert index.get({"input_text": "b"}) is None
+
+    other = CacheIndex(cache_dir)
+    other.put({"input_data": {"input_text": "b"}, "final_audio": "b.mp3"})
+    other.flush()
+    os.utime(other.json_path, (0, 0))
+
+    assert index.get({"input_text": "b"})["final_audio"] == "b.mp3"
+
+
+def test_prefetch_flushes_the_cache_index(cache_dir):
+    service = StubService(cache_dir=cache_dir)
+    service.prefetch(["Hello world", "Goodbye"])
+
+    assert sorted(
+        entry["input_data"]["input_text"] for entry in read_cache_file(cache_dir)
+    ) == ["Goodbye", "Hello world"]
+
+
+def test_shared_services(cache_dir):
+    service = StubService.shared(cache_dir=cache_dir)
+
+    assert StubService.shared(cache_dir=cache_dir) is service
+    assert StubService.shared(cache_dir=cache_dir + "2") is not service
+
+    # Other objects are compared by identity
+    policy = CacheStoragePolicy()
+    shared = StubService.shared(cache_dir=cache_dir, storage_policy=policy)
+    assert StubService.shared(cache_dir=cache_dir, storage_policy=policy) is shared
+    assert (
+        StubService.shared(cache_dir=cache_dir, storage_policy=CacheStoragePolicy())
+        is not shared
+    )
+
+
+class StubTranscriber:
+    """Transcribes every clip as a single word."""
+
+    def __init__(self):
+        self.n_transcribed = 0
+
+    def get_cache_key(self):
+        return {"engine": "stub"}
+
+    def transcribe(self, path):
+        self.n_transcribed += 1
+        word = {"text": "Hello", "text_offset": 0, "audio_offset": 0}
+        return {"word_boundaries": [word], "transcribed_text": "Hello"}
+
+
+class ApproximateService(StubService):
+    def generate_from_text(self, text, cache_dir=None, path=None, **kwargs):
+        dict_ = StubService.generate_from_text(self, text, cache_dir, path, **kwargs)
+        if "audio_info" not in dict_:
+            word = {"text": "?", "text_offset": 0, "audio_offset": 0}
+            dict_["word_boundaries"] = [word]
+            dict_["approximate_word_boundaries"] = True
+        return dict_
+
+
+def test_approximate_word_boundaries_are_transcribed(cache_dir):
+    transcriber = StubTranscriber()
+    service = ApproximateService(
+        cache_dir=cache_dir, use_cloud_whisper=True, transcriber=transcriber
+    )
+    dict_ = service._wrap_generate_from_text("Hello")
+
+    assert dict_["word_boundaries"][0]["text"] == "Hello"
+    assert "approximate_word_boundaries" not in dict_
+    assert transcriber.n_transcribed == 1
+
+
+def test_approximate_word_boundaries_without_transcription(cache_dir):
+    service = ApproximateService(cache_dir=cache_dir)
+    dict_ = service._wrap_generate_from_text("Hello")
+
+    assert dict_["word_boundaries"][0]["text"] == "?"
+    assert dict_["approximate_word_boundaries"]
+
+    # Enabling transcription later replaces them on the next cache hit
+    transcriber = StubTranscriber()
+    service = ApproximateService(
+        cache_dir=cache_dir, use_cloud_whisper=True, transcriber=transcriber
+    )
+    dict_ = service._wrap_generate_from_text("Hello")
+
+    assert service.n_synthesized == 0
+    assert dict_["word_boundaries"][0]["text"] == "Hello"
+
+
+def test_merge_part_timings():
+    parts = [
+        {
+            "input_text": "Hello there",
+            "word_boundaries": [
+                {"text": "Hello", "text_offset": 0, "audio_offset": 0},
+                {"text": "there", "text_offset": 6, "audio_offset": 100},
+            ],
+            "bookmarks": {"A": 50},
+        },
+        {
+            "input_text": "<bookmark mark='B'/>Bye",
+            "audio_info": {"duration": 1.0},
+            "transcribed_text": " Bye ",
+        },
+    ]
+
+    merged = merge_part_timings(parts, [0.0, 2.0])
+
+    offset = int(2.0 * AUDIO_OFFSET_RESOLUTION)
+    assert [
+        (wb["text"], wb["text_offset"], wb["audio_offset"])
+        for wb in merged["word_boundaries"]
+    ] == [
+        ("Hello", 0, 0),
+        ("there", 6, 100),
+        # Parts without word boundaries are anchored at their start and end
+        ("Bye", 12, offset),
+        ("", 15, offset + AUDIO_OFFSET_RESOLUTION),
+    ]
+    assert merged["bookmarks"] == {"A": 50}
+    assert merged["transcribed_text"] == "Hello there Bye"
+    # The parts are left untouched
+    assert parts[0]["word_boundaries"][1]["audio_offset"] == 100
+
+
+def test_sentence_cache_only_synthesizes_edited_sentences(cache_dir):
+    service = StubService(cache_dir=cache_dir, sentence_cache=True)
+    first = service._wrap_generate_from_text("One is here. Two is here.")
+    assert service.n_synthesized == 2
+    assert first["audio_info"]["duration"] == pytest.approx(2.1, abs=0.01)
+
+    second = service._wrap_generate_from_text("One is here. Three is here.")
+    assert service.n_synthesized == 3
+    assert second["final_audio"] != first["final_audio"]
+
+
+def test_entries_store_the_audio_metadata(cache_dir):
+    service = StubService(cache_dir=cache_dir)
+    service._wrap_generate_from_text("Hello")
+
+    (entry,) = load_cache_entries(cache_dir)
+    assert entry["audio_info"]["duration"] == pytest.approx(1.0)
+    assert entry["audio_hash"] == get_audio_hash(
+        str(Path(cache_dir) / entry["final_audio"])
+    )
+
+
+def test_older_entries_get_their_audio_metadata_once(cache_dir):
+    service = StubService(cache_dir=cache_dir)
+    dict_ = service._wrap_generate_from_text("Hello")
+    for key in ["audio_info", "audio_hash"]:
+        del dict_[key]
+    update_cache_entry(cache_dir, dict_)
+
+    entry = service.get_cached_result(dict_["input_data"], cache_dir)
+
+    assert entry["audio_info"]["duration"] == pytest.approx(1.0)
+    assert "audio_hash" in load_cache_entries(cache_dir)[0]
+
+
+def test_transcription_key(tmp_path):
+    for name in ["a.wav", "b.wav"]:
+        AudioSegment.silent(duration=1000).export(tmp_path / name, format="wav")
+    AudioSegment.silent(duration=500).export(tmp_path / "c.wav", format="wav")
+    transcriber = {"engine": "stub"}
+
+    # The key depends on the audio content, not on its path
+    key = get_transcription_key(str(tmp_path / "a.wav"), transcriber)
+    assert get_transcription_key(str(tmp_path / "b.wav"), transcriber) == key
+    assert get_transcription_key(str(tmp_path / "c.wav"), transcriber) != key
+    assert get_transcription_key(str(tmp_path / "a.wav"), {"engine": "x"}) != key
+
+
+def test_identical_audio_is_transcribed_once(cache_dir):
+    transcriber = StubTranscriber()
+    service = ApproximateService(
+        cache_dir=cache_dir, use_cloud_whisper=True, transcriber=transcriber
+    )
+    # Both texts are synthesized as the same silence
+    service._wrap_generate_from_text("Hello")
+    dict_ = service._wrap_generate_from_text("Goodbye")
+
+    assert service.n_synthesized == 2
+    assert transcriber.n_transcribed == 1
+    assert dict_["word_boundaries"][0]["text"] == "Hello"
+
+
+def test_lazy_transcription(cache_dir):
+    transcriber = StubTranscriber()
+    service = ApproximateService(
+        cache_dir=cache_dir,
+        use_cloud_whisper=True,
+        transcriber=transcriber,
+        lazy_transcription=True,
+    )
+    dict_ = service._wrap_generate_from_text("Hello")
+
+    assert transcriber.n_transcribed == 0
+    assert dict_["approximate_word_boundaries"]
+
+    service.resolve_word_boundaries(dict_)
+
+    assert transcriber.n_transcribed == 1
+    assert dict_["word_boundaries"][0]["text"] == "Hello"
+    assert "approximate_word_boundaries" not in dict_
+    # The transcription is saved with the entry
+    (entry,) = load_cache_entries(cache_dir)
+    assert entry["word_boundaries"][0]["text"] == "Hello"
@@ -0,0 +1,74 @@
+from pydub import AudioSegment
+from pydub.generators import Sine
+
+from manim_voiceover.modify_audio import find_split_points
+from manim_voiceover.services.base import split_word_boundaries
+
+
+def make_audio(path, parts):
+    """Writes tones of the given durations in ms, alternating with silences."""
+    audio = AudioSegment.empty()
+    for idx, duration in enumerate(parts):
+        if idx % 2 == 0:
+            audio += Sine(440).to_audio_segment(duration=duration, volume=-6)
+        else:
+            audio += AudioSegment.silent(duration=duration)
+    audio.export(path, format="wav")
+    return str(path)
+
+
+def test_find_split_points_uses_the_longest_pauses(tmp_path):
+    # Three utterances, the first one with a short pause of its own
+    path = make_audio(tmp_path / "a.wav", [400, 200, 400, 600, 800, 600, 800])
+
+    cuts = find_split_points(path, 3)
+
+    assert [round(cut, 1) for cut in cuts] == [1.3, 2.7]
+
+
+def test_find_split_points_without_enough_pauses(tmp_path):
+    path = make_audio(tmp_path / "a.wav", [400, 600, 400])
+
+    assert find_split_points(path, 3) is None
+
+
+def test_find_split_points_checks_the_weights(tmp_path):
+    # The longest pause is inside the first utterance, not between the two
+    path = make_audio(tmp_path / "a.wav", [400, 600, 400, 300, 2000])
+
+    assert find_split_points(path, 2) is not None
+    assert find_split_points(path, 2, weights=[10, 10]) is None
+    assert find_split_points(path, 2, weights=[10, 40]) == [0.7]
+
+
+def test_find_split_points_in_windows(tmp_path):
+    path = make_audio(tmp_path / "a.wav", [400, 600, 400, 300, 400])
+
+    # The pause of the window is used, or the end of the window without pause
+    cuts = find_split_points(path, 2, windows=[(1.3, 1.9)])
+    assert [round(cut, 2) for cut in cuts] == [1.55]
+    assert find_split_points(path, 2, windows=[(0.1, 0.3)]) == [0.3]
+
+
+def test_split_word_boundaries():
+    word_boundaries = [
+        {"text": "Hello", "text_offset": 0, "audio_offset": 0},
+        {"text": "there", "text_offset": 6, "audio_offset": 100},
+        {"text": "Bye", "text_offset": 14, "audio_offset": 300},
+    ]
+
+    parts = split_word_boundaries(word_boundaries, [(0, 12), (14, 18)])
+
+    assert [[wb["text"] for wb in part] for part in parts] == [
+        ["Hello", "there"],
+        ["Bye"],
+    ]
+    assert parts[1][0]["text_offset"] == 0
+    # The input is left untouched
+    assert word_boundaries[2]["text_offset"] == 14
+
+
+def test_split_word_boundaries_of_a_text_without_words():
+    word_boundaries = [{"text": "Hello", "text_offset": 0, "audio_offset": 0}]
+
+    assert split_word_boundaries(word_boundaries, [(0, 5), (7, 10)]) is None
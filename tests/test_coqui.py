@@ -0,0 +1,102 @@
+import shutil
+
+import numpy as np
+import pytest
+
+from manim_voiceover.services import coqui
+from manim_voiceover.services.coqui import CoquiService
+
+
+class FakeSynthesizer:
+    output_sample_rate = 16000
+
+
+class FakeTTS:
+    """Synthesizes 0.1 s of silence per sentence, and records the sentences."""
+
+    speakers = None
+    languages = None
+    synthesizer = FakeSynthesizer()
+
+    def __init__(self, **kwargs):
+        self.sentences = []
+
+    def tts(self, text, speaker=None, language=None):
+        self.sentences.append(text)
+        return np.zeros(1600)
+
+
+class FakeFuture:
+    def __init__(self, pool, result):
+        self.pool = pool
+        self._result = result
+
+    def result(self):
+        self.pool.n_running -= 1
+        return self._result
+
+
+class FakePool:
+    """Runs the jobs right away, and records how many are submitted at once."""
+
+    def __init__(self):
+        self.n_running = 0
+        self.max_running = 0
+
+    def submit(self, fn, *args):
+        self.n_running += 1
+        self.max_running = max(self.max_running, self.n_running)
+        return FakeFuture(self, fn(*args))
+
+
+@pytest.fixture(autouse=True)
+def fake_tts(monkeypatch):
+    monkeypatch.setattr(coqui, "TTS", FakeTTS, raising=False)
+    monkeypatch.setattr(coqui, "prompt_ask_missing_package", lambda *a: None)
+    monkeypatch.setattr(coqui, "_worker_tts", FakeTTS())
+
+
+def test_prefetch_rejects_synthesis_arguments(tmp_path):
+    service = CoquiService(cache_dir=str(tmp_path), transcription_model=None)
+    with pytest.raises(TypeError):
+        service.prefetch(["Hello."], speed=2)
+
+
+def test_worker_pool_runs_at_most_max_workers_sentences(tmp_path, monkeypatch):
+    pool = FakePool()
+    monkeypatch.setattr(CoquiService, "_get_pool", lambda self: pool)
+    service = CoquiService(
+        cache_dir=str(tmp_path), num_workers=4, transcription_model=None
+    )
+    assert service.tts is None
+
+    waveforms = service._synthesize_texts(["One. Two. Three.", "Four."], max_workers=2)
+
+    assert coqui._worker_tts.sentences == ["One.", "Two.", "Three.", "Four."]
+    assert pool.max_running == 2
+    # 3 sentences with 2 pauses of 0.4 s in between
+    assert len(waveforms[0]) == 3 * 1600 + 2 * 6400
+
+    pool.max_running = 0
+    service._synthesize_texts(["One. Two. Three.", "Four."])
+    assert pool.max_running == 4
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg is required")
+def test_prefetch_synthesizes_the_sentences_once(tmp_path):
+    service = CoquiService(
+        cache_dir=str(tmp_path),
+        sentence_cache=True,
+        transcription_model=None,
+        use_cloud_whisper=False,
+    )
+
+    results = service.prefetch(["One. Two.", "Two.  One."])
+
+    assert sorted(service.tts.sentences) == ["One.", "Two."]
+    assert [result["input_text"] for result in results] == ["One. Two.", "Two. One."]
+    # The prefetched sentences are cached and saved to the index
+    assert service.get_cached_result(
+        {"input_text": "One.", "service": "coqui"}, str(tmp_path)
+    )
+    assert (tmp_path / "cache.json").exists()
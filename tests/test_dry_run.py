@@ -0,0 +1,85 @@
+import pytest
+
+from manim_voiceover.cache import update_cache_entry
+from manim_voiceover.services.base import SpeechService
+from manim_voiceover.services.dry_run import DryRunService, VoiceoverRecorder
+
+
+class VoiceService(SpeechService):
+    """Service whose cache key is known without synthesizing."""
+
+    def __init__(self, voice=None, **kwargs):
+        self.voice = voice
+        SpeechService.__init__(self, transcription_model=None, **kwargs)
+
+    def get_input_data(self, text, **kwargs):
+        if self.voice is None:
+            return None
+        return {"input_text": text, "service": "voice", "voice": self.voice}
+
+    def generate_from_text(self, text, cache_dir=None, path=None, **kwargs):
+        raise NotImplementedError
+
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    # 10 characters per second for voice "a", 40 for voice "b"
+    for idx in range(3):
+        for voice, duration in [("a", 1.0), ("b", 0.25)]:
+            update_cache_entry(
+                cache_dir,
+                {
+                    "input_data": {
+                        "input_text": f"{voice * 9}{idx}",
+                        "service": "voice",
+                        "voice": voice,
+                    },
+                    "audio_info": {"duration": duration},
+                },
+            )
+    return cache_dir
+
+
+def test_speaking_rate_is_fitted_on_the_voice(cache_dir):
+    service = DryRunService(VoiceService(voice="a", cache_dir=cache_dir))
+    assert service.chars_per_second == pytest.approx(10)
+
+    service = DryRunService(VoiceService(voice="b", cache_dir=cache_dir))
+    assert service.chars_per_second == pytest.approx(40)
+
+
+def test_speaking_rate_without_enough_entries(cache_dir):
+    service = DryRunService(VoiceService(voice="c", cache_dir=cache_dir))
+    assert service.chars_per_second == DryRunService.chars_per_second
+
+
+def test_speaking_rate_of_an_unknown_voice(cache_dir):
+    # Not fitted on the entries of other voices
+    service = DryRunService(VoiceService(cache_dir=cache_dir))
+    assert service.chars_per_second == DryRunService.chars_per_second
+
+    service = DryRunService(VoiceService(cache_dir=cache_dir), chars_per_second=20)
+    assert service.chars_per_second == 20
+
+
+def test_recorder_groups_and_deduplicates_the_requests(cache_dir):
+    recorder = VoiceoverRecorder()
+    service_a = DryRunService(VoiceService(voice="a", cache_dir=cache_dir), recorder)
+    service_b = DryRunService(VoiceService(voice="b", cache_dir=cache_dir), recorder)
+
+    service_a._wrap_generate_from_text("Hello  world")
+    service_a._wrap_generate_from_text("Goodbye")
+    service_a._wrap_generate_from_text("Hello world")
+    service_a._wrap_generate_from_text("Hello world", speed=2)
+    service_b._wrap_generate_from_text("Hello world")
+
+    requests = [
+        (service.voice, kwargs, texts)
+        for service, kwargs, texts in recorder.get_requests()
+    ]
+    assert requests == [
+        ("a", {}, ["Hello world", "Goodbye"]),
+        ("a", {"speed": 2}, ["Hello world"]),
+        ("b", {}, ["Hello world"]),
+    ]
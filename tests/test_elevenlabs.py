@@ -0,0 +1,84 @@
+import base64
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("elevenlabs")
+os.environ.setdefault("ELEVEN_API_KEY", "dummy")
+
+from elevenlabs import Voice
+
+from manim_voiceover.services import elevenlabs as elevenlabs_service
+from manim_voiceover.services.elevenlabs import (
+    ElevenLabsService,
+    alignment_to_word_boundaries,
+)
+from manim_voiceover.tracker import AUDIO_OFFSET_RESOLUTION
+
+RECORDED_RESPONSE = Path(__file__).parent / "fixtures" / "elevenlabs_with_timestamps.json"
+
+
+class RecordedResponse:
+    def __init__(self, path):
+        with open(path) as f:
+            self.data = json.load(f)
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.data
+
+
+def test_alignment_to_word_boundaries():
+    alignment = {
+        "characters": list("Hi there"),
+        "character_start_times_seconds": [0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8],
+    }
+    word_boundaries = alignment_to_word_boundaries(alignment)
+
+    assert [wb["text"] for wb in word_boundaries] == ["Hi", "there"]
+    assert [wb["text_offset"] for wb in word_boundaries] == [0, 3]
+    assert [wb["word_length"] for wb in word_boundaries] == [2, 5]
+    assert word_boundaries[1]["audio_offset"] == int(0.4 * AUDIO_OFFSET_RESOLUTION)
+
+
+def test_generate_from_text_uses_alignment(tmp_path, monkeypatch):
+    response = RecordedResponse(RECORDED_RESPONSE)
+    requests_made = []
+
+    def post(url, **kwargs):
+        requests_made.append(url)
+        return response
+
+    monkeypatch.setattr(
+        elevenlabs_service, "voices", lambda: [Voice(voice_id="stub", name="Stub")]
+    )
+    monkeypatch.setattr(elevenlabs_service.requests, "post", post)
+
+    service = ElevenLabsService(
+        voice_name="Stub", cache_dir=str(tmp_path), transcription_model=None
+    )
+    result = service.generate_from_text(
+        "Hello world, <bookmark mark='A'/>this is a test."
+    )
+
+    assert requests_made == [
+        elevenlabs_service.ELEVENLABS_API_URL + "/text-to-speech/stub/with-timestamps"
+    ]
+    assert result["word_boundaries"] == alignment_to_word_boundaries(
+        response.data["alignment"]
+    )
+    assert [wb["text"] for wb in result["word_boundaries"]] == [
+        "Hello",
+        "world,",
+        "this",
+        "is",
+        "a",
+        "test.",
+    ]
+    audio = (tmp_path / result["original_audio"]).read_bytes()
+    assert audio == base64.b64decode(response.data["audio_base64"])
+    assert not service._needs_transcription(result)
@@ -0,0 +1,235 @@
+import json
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from manim_voiceover.gateway import (
+    Gateway,
+    SpeechServiceBackend,
+    TokenBucket,
+    create_server,
+)
+
+
+class StubBackend:
+    """Synthesizes each text as its UTF-8 bytes, and records the batches."""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.batches = []
+        self.lock = threading.Lock()
+
+    def synthesize(self, config, texts):
+        with self.lock:
+            self.batches.append((config, list(texts)))
+        time.sleep(self.delay)
+        return [
+            {
+                "audio": text.encode("utf-8"),
+                "extension": "mp3",
+                "data": {"word_boundaries": [], "voice": config.get("voice")},
+            }
+            for text in texts
+        ]
+
+    def transcribe(self, config, clips):
+        with self.lock:
+            self.batches.append((config, [audio for audio, _ in clips]))
+        return [
+            {"data": {"transcribed_text": audio.decode("utf-8")}}
+            for audio, _ in clips
+        ]
+
+
+@pytest.fixture
+def gateway(tmp_path):
+    backend = StubBackend()
+    gateway = Gateway(backend, str(tmp_path / "gateway"), batch_window=0.1)
+    yield gateway
+    gateway.close()
+
+
+def synthesize_all(gateway, texts, config=None):
+    futures = [
+        gateway.submit("synthesize", {"text": text}, config or {}) for text in texts
+    ]
+    return [future.result(timeout=5) for future in futures]
+
+
+def test_identical_jobs_in_flight_are_deduplicated(gateway):
+    results = synthesize_all(gateway, ["Intro"] * 5)
+
+    assert len(gateway.backend.batches) == 1
+    assert gateway.backend.batches[0][1] == ["Intro"]
+    assert gateway.stats["deduplicated"] == 4
+    assert len({result["audio_blob"] for result in results}) == 1
+
+
+def test_concurrent_jobs_are_batched_by_config(gateway):
+    synthesize_all(gateway, ["a", "b", "c"], {"voice": "x"})
+    synthesize_all(gateway, ["d"], {"voice": "y"})
+
+    assert sorted(texts for _, texts in gateway.backend.batches) == [
+        ["a", "b", "c"],
+        ["d"],
+    ]
+
+
+def test_max_batch_size(tmp_path):
+    gateway = Gateway(
+        StubBackend(), str(tmp_path / "gateway"), batch_window=0.1, max_batch_size=2
+    )
+    try:
+        synthesize_all(gateway, ["a", "b", "c", "d", "e"])
+    finally:
+        gateway.close()
+
+    assert sorted(len(texts) for _, texts in gateway.backend.batches) == [1, 2, 2]
+
+
+def test_results_are_served_from_the_cache(tmp_path):
+    cache_dir = str(tmp_path / "gateway")
+    gateway = Gateway(StubBackend(), cache_dir, batch_window=0.01)
+    first = synthesize_all(gateway, ["Hello"])[0]
+    gateway.close()
+
+    # A new gateway on the same cache doesn't call the backend again
+    gateway = Gateway(StubBackend(), cache_dir, batch_window=0.01)
+    try:
+        second = synthesize_all(gateway, ["Hello"])[0]
+    finally:
+        gateway.close()
+
+    assert gateway.backend.batches == []
+    assert gateway.stats["cache_hits"] == 1
+    assert second == first
+    assert gateway.cache.get_blob_path(first["audio_blob"]).read_bytes() == b"Hello"
+
+
+def test_failed_batches_are_not_cached(tmp_path):
+    class FailingBackend(StubBackend):
+        def synthesize(self, config, texts):
+            raise RuntimeError("quota exceeded")
+
+    gateway = Gateway(FailingBackend(), str(tmp_path / "gateway"), batch_window=0.01)
+    try:
+        future = gateway.submit("synthesize", {"text": "Hello"}, {})
+        with pytest.raises(RuntimeError):
+            future.result(timeout=5)
+        assert gateway.in_flight == {}
+        assert gateway.cache.get_blob_path("missing.mp3") is None
+    finally:
+        gateway.close()
+
+
+def test_missing_results_fail_the_batch(tmp_path):
+    class TruncatingBackend(StubBackend):
+        def synthesize(self, config, texts):
+            return StubBackend.synthesize(self, config, texts)[:-1]
+
+    gateway = Gateway(TruncatingBackend(), str(tmp_path / "gateway"), batch_window=0.1)
+    try:
+        futures = [gateway.submit("synthesize", {"text": t}, {}) for t in "ab"]
+        for future in futures:
+            with pytest.raises(ValueError):
+                future.result(timeout=5)
+        assert gateway.in_flight == {}
+    finally:
+        gateway.close()
+
+
+def test_rate_limit_counts_every_job(tmp_path):
+    gateway = Gateway(
+        StubBackend(delay=0),
+        str(tmp_path / "gateway"),
+        batch_window=0.1,
+        requests_per_second=20,
+    )
+    try:
+        synthesize_all(gateway, ["a", "b", "c", "d", "e", "f"])
+    finally:
+        gateway.close()
+
+    # One batch, but the 6 jobs take 6 tokens out of a bucket of 20
+    assert len(gateway.backend.batches) == 1
+    assert gateway.rate_limiter.tokens < 15
+
+
+def test_speech_service_backend_creates_a_service_per_config(tmp_path):
+    class VoiceService:
+        def __init__(self, cache_dir, voice="default"):
+            self.cache_dir = cache_dir
+            self.voice = voice
+
+    backend = SpeechServiceBackend(VoiceService, str(tmp_path), {"voice": "x"})
+
+    assert backend.get_speech_service({}).voice == "x"
+    assert backend.get_speech_service({"voice": "y"}).voice == "y"
+    assert backend.get_speech_service({}) is backend.get_speech_service({})
+    with pytest.raises(TypeError):
+        backend.get_speech_service({"speed": 2})
+
+
+def test_token_bucket_limits_the_rate():
+    bucket = TokenBucket(rate=20, capacity=1)
+    start = time.monotonic()
+    for _ in range(5):
+        bucket.acquire()
+    # The first token is available right away, the next ones every 50 ms
+    assert time.monotonic() - start >= 0.18
+
+
+def test_http_end_to_end(gateway):
+    server = create_server(gateway, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{server.server_port}"
+
+    def post(path, data):
+        request = urllib.request.Request(
+            url + path,
+            data=json.dumps(data).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+        )
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return json.loads(response.read())
+
+    try:
+        # Several workers request the same voiceovers at the same time
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            results = list(
+                executor.map(
+                    lambda text: post(
+                        "/synthesize", {"text": text, "config": {"voice": "x"}}
+                    ),
+                    ["Intro", "Intro", "Intro", "Outro", "Outro", "Credits"],
+                )
+            )
+
+        with urllib.request.urlopen(
+            url + "/blobs/" + results[3]["audio_blob"], timeout=5
+        ) as response:
+            assert response.read() == b"Outro"
+        assert results[0]["data"]["voice"] == "x"
+
+        transcription = post("/transcribe", {"audio": "SGk=", "extension": "mp3"})
+        assert transcription["data"]["transcribed_text"] == "Hi"
+
+        with urllib.request.urlopen(url + "/stats", timeout=5) as response:
+            stats = json.loads(response.read())
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    synthesized = sorted(
+        text
+        for _, texts in gateway.backend.batches
+        for text in texts
+        if isinstance(text, str)
+    )
+    assert synthesized == ["Credits", "Intro", "Outro"]
+    assert stats["jobs"] == 7
+    assert stats["backend_jobs"] == 4
@@ -0,0 +1,98 @@
+import json
+
+from manim import config
+
+from manim_voiceover import hashing
+
+
+class FakeFileWriter:
+    def __init__(self, partial_movie_directory):
+        self.partial_movie_directory = partial_movie_directory
+        self.partial_movie_files = []
+
+
+class FakeRenderer:
+    def __init__(self, partial_movie_directory):
+        self.file_writer = FakeFileWriter(partial_movie_directory)
+        self.animations_hashes = []
+
+
+def make_block(**kwargs):
+    block = {
+        "text": "Hello world",
+        "audio_hash": "abc",
+        "duration": 1.0,
+        "animation_hashes": ["h1", "h2"],
+        "cached": [False, False],
+    }
+    block.update(kwargs)
+    return block
+
+
+def test_salt_hash():
+    salted = hashing.salt_hash("h1", "abc_1.000000")
+    assert salted.startswith("h1_")
+    assert hashing.salt_hash("h1", "abc_1.000000") == salted
+    assert hashing.salt_hash("h1", "abc_1.500000") != salted
+    assert hashing.salt_hash("h2", "abc_1.000000") != salted
+
+
+def test_rename_partial_movie_file(tmp_path):
+    extension = config["movie_file_extension"]
+    renderer = FakeRenderer(str(tmp_path))
+    (tmp_path / f"old{extension}").write_bytes(b"movie")
+    renderer.file_writer.partial_movie_files = [str(tmp_path / f"old{extension}")]
+    renderer.animations_hashes = ["other", "old"]
+
+    hashing.rename_partial_movie_file(renderer, "old", "new")
+
+    assert not (tmp_path / f"old{extension}").exists()
+    assert (tmp_path / f"new{extension}").read_bytes() == b"movie"
+    assert renderer.file_writer.partial_movie_files == [
+        str(tmp_path / f"new{extension}")
+    ]
+    assert renderer.animations_hashes == ["other", "new"]
+
+
+def test_invalidation_reasons():
+    previous = make_block()
+
+    assert hashing.get_invalidation_reasons(
+        make_block(cached=[True, True]), previous
+    ) == []
+    assert hashing.get_invalidation_reasons(make_block(), None) == ["new voiceover"]
+    assert hashing.get_invalidation_reasons(
+        make_block(text="Hi world", audio_hash="def", duration=1.5), previous
+    ) == [
+        "text changed",
+        "audio changed",
+        "duration changed from 1.00s to 1.50s",
+    ]
+    assert hashing.get_invalidation_reasons(
+        make_block(animation_hashes=["h1", "h3"]), previous
+    ) == ["animations changed"]
+    assert hashing.get_invalidation_reasons(make_block(), previous) == [
+        "partial movie files missing"
+    ]
+
+
+def test_invalidation_report_compares_with_the_previous_render(tmp_path):
+    path = str(tmp_path / "blocks" / "Scene.json")
+
+    first = hashing.write_invalidation_report([make_block(), make_block()], path)
+    assert [block["reasons"] for block in first] == [
+        ["new voiceover"],
+        ["new voiceover"],
+    ]
+
+    # Only the second voiceover was edited since
+    second = hashing.write_invalidation_report(
+        [make_block(cached=[True, True]), make_block(text="Bye", audio_hash="def")],
+        path,
+    )
+    assert [block["reasons"] for block in second] == [
+        [],
+        ["text changed", "audio changed"],
+    ]
+    with open(path) as f:
+        assert json.load(f)["blocks"][1]["text"] == "Bye"
@@ -0,0 +1,58 @@
+from manim_voiceover.helper import split_sentences, split_text
+
+
+def test_split_text_at_sentences():
+    text = "This is the first one. This is the second one! And a third?"
+
+    assert split_text(text, 30) == [
+        "This is the first one.",
+        "This is the second one!",
+        "And a third?",
+    ]
+    # Short sentences are merged back together
+    assert split_text(text, 50) == [
+        "This is the first one. This is the second one!",
+        "And a third?",
+    ]
+
+
+def test_split_text_at_clauses():
+    text = "When the sentence is long, it is split at its clauses; not inside them."
+
+    assert split_text(text, 30) == [
+        "When the sentence is long,",
+        "it is split at its clauses;",
+        "not inside them.",
+    ]
+
+
+def test_split_text_between_words():
+    text = "one two three four five six seven"
+
+    chunks = split_text(text, 10)
+
+    assert chunks == ["one two", "three four", "five six", "seven"]
+    assert all(len(chunk) <= 10 for chunk in chunks)
+
+
+def test_split_text_keeps_bookmarks_whole():
+    text = "Look <bookmark mark='A'/> here and then <bookmark mark='B'/> there now"
+
+    chunks = split_text(text, 12)
+
+    assert chunks == [
+        "Look <bookmark mark='A'/> here",
+        "and then <bookmark mark='B'/>",
+        "there now",
+    ]
+
+
+def test_split_sentences():
+    assert split_sentences("  First one. Second one!  Third?\nFourth ") == [
+        "First one.",
+        "Second one!",
+        "Third?",
+        "Fourth",
+    ]
+    assert split_sentences("No punctuation at all") == ["No punctuation at all"]
+    assert split_sentences("3.14 is pi. e is 2.71.") == ["3.14 is pi.", "e is 2.71."]
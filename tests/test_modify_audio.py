@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+
+from manim_voiceover.modify_audio import get_ducking_envelope
+
+
+def test_ducking_envelope():
+    # 100 frames per second, a voiceover from 1 s to 2 s
+    envelope = get_ducking_envelope(
+        [(1.0, 2.0)], 400, 100, duck_gain=-12.0, attack=0.1, release=0.3
+    )
+
+    assert envelope.shape == (400,)
+    assert envelope[:90] == pytest.approx(1.0)
+    assert envelope[100:200] == pytest.approx(10 ** (-12 / 20))
+    assert envelope[230:] == pytest.approx(1.0)
+    # Halfway through the attack and through the release
+    assert envelope[95] == pytest.approx(10 ** (-6 / 20))
+    assert envelope[214] == pytest.approx(10 ** (-6 / 20))
+    assert np.all(np.diff(envelope[90:101]) <= 0)
+    assert np.all(np.diff(envelope[199:231]) >= 0)
+
+
+def test_ducking_envelope_of_overlapping_intervals():
+    envelope = get_ducking_envelope([(1.0, 2.0), (1.5, 2.5), (2.6, 3.0)], 400, 100)
+
+    assert envelope[100:250] == pytest.approx(10 ** (-12 / 20))
+    # The music doesn't come back up between voiceovers closer than the release
+    assert np.all(envelope[250:260] < 10 ** (-3 / 20))
+    assert get_ducking_envelope([], 10, 100) == pytest.approx(np.ones(10))
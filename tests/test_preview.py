@@ -0,0 +1,89 @@
+import json
+
+from pydub import AudioSegment
+
+from manim_voiceover.preview import (
+    format_srt_time,
+    get_timeline,
+    write_narration_preview,
+    write_srt,
+)
+
+
+class FakeTracker:
+    def __init__(self, cache_dir, text, final_audio, start_t, end_t, bookmarks=None):
+        self.cache_dir = cache_dir
+        self.data = {"input_text": text, "final_audio": final_audio}
+        self.start_t = start_t
+        self.end_t = end_t
+        self.bookmarks = bookmarks or {}
+
+    def get_bookmark_times(self):
+        return self.bookmarks
+
+
+def test_format_srt_time():
+    assert format_srt_time(0) == "00:00:00,000"
+    assert format_srt_time(3723.4567) == "01:02:03,457"
+
+
+def test_timeline(tmp_path):
+    trackers = [
+        FakeTracker(
+            str(tmp_path),
+            "Hello <bookmark mark='A'/>world",
+            "a.wav",
+            0.5,
+            1.5,
+            {"A": 1.0},
+        ),
+        FakeTracker(str(tmp_path), "Draft", None, 2.0, 2.5),
+    ]
+
+    timeline = get_timeline(trackers, gains=[-6.0, 0.0])
+
+    assert timeline == [
+        {
+            "text": "Hello world",
+            "start": 0.5,
+            "end": 1.5,
+            "audio": str(tmp_path / "a.wav"),
+            "gain": -6.0,
+            "bookmarks": {"A": 1.0},
+        },
+        {
+            "text": "Draft",
+            "start": 2.0,
+            "end": 2.5,
+            "audio": None,
+            "gain": 0.0,
+            "bookmarks": {},
+        },
+    ]
+    assert [item["gain"] for item in get_timeline(trackers)] == [0.0, 0.0]
+
+
+def test_write_srt(tmp_path):
+    timeline = [
+        {"text": "Hello world", "start": 0.5, "end": 1.5},
+        {"text": "Bye", "start": 61.0, "end": 62.25},
+    ]
+    write_srt(timeline, str(tmp_path / "scene.srt"))
+
+    assert (tmp_path / "scene.srt").read_text() == (
+        "1\n00:00:00,500 --> 00:00:01,500\nHello world\n\n"
+        "2\n00:01:01,000 --> 00:01:02,250\nBye\n\n"
+    )
+
+
+def test_write_narration_preview(tmp_path):
+    AudioSegment.silent(duration=1000).export(tmp_path / "a.wav", format="wav")
+    trackers = [FakeTracker(str(tmp_path), "Hello", "a.wav", 0.5, 1.5)]
+
+    paths = write_narration_preview(trackers, str(tmp_path / "preview"), "Scene", 2.0)
+
+    with open(paths["json"]) as f:
+        preview = json.load(f)
+    assert preview["scene"] == "Scene"
+    assert [item["text"] for item in preview["voiceovers"]] == ["Hello"]
+    assert len(AudioSegment.from_wav(paths["audio"])) == 2000
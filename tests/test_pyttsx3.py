@@ -0,0 +1,130 @@
+from concurrent.futures import Future
+
+import pytest
+
+from manim_voiceover.services import pyttsx3 as pyttsx3_service
+from manim_voiceover.services.pyttsx3 import PyTTSX3Service
+
+
+class FakeEngine:
+    """Emits the events of pyttsx3 for each saved utterance, without audio."""
+
+    n_created = 0
+
+    def __init__(self):
+        FakeEngine.n_created += 1
+        self.properties = {"rate": 200, "volume": 1.0, "voice": "default"}
+        self.callbacks = {}
+        self.jobs = []
+
+    def connect(self, topic, callback):
+        self.callbacks[topic] = callback
+        return topic
+
+    def disconnect(self, token):
+        del self.callbacks[token]
+
+    def getProperty(self, name):
+        return self.properties[name]
+
+    def setProperty(self, name, value):
+        self.properties[name] = value
+
+    def save_to_file(self, text, path, name):
+        self.jobs.append((name, text))
+
+    def runAndWait(self):
+        for name, text in self.jobs:
+            self.callbacks["started-utterance"](name)
+            self.callbacks["started-word"](name, 0, len(text.split()[0]))
+            self.callbacks["finished-utterance"](name, True)
+        self.jobs = []
+
+    def stop(self):
+        pass
+
+
+class InProcessExecutor:
+    """Stands in for the worker process, and runs its initializer right away."""
+
+    def __init__(self, max_workers=None, mp_context=None, initializer=None):
+        if initializer is not None:
+            initializer()
+
+    def submit(self, fn, *args):
+        future = Future()
+        future.set_result(fn(*args))
+        return future
+
+
+@pytest.fixture(autouse=True)
+def fake_engine(monkeypatch):
+    monkeypatch.setattr(pyttsx3_service, "Engine", FakeEngine, raising=False)
+    monkeypatch.setattr(pyttsx3_service, "prompt_ask_missing_extras", lambda *a: None)
+    monkeypatch.setattr(pyttsx3_service, "ProcessPoolExecutor", InProcessExecutor)
+    monkeypatch.setattr(pyttsx3_service, "_worker_engine", None)
+    monkeypatch.setattr(FakeEngine, "n_created", 0)
+
+
+def test_worker_creates_its_engine_once(tmp_path):
+    service = PyTTSX3Service(cache_dir=str(tmp_path), transcription_model=None)
+    assert service.use_worker_process
+    assert service.engine is None
+
+    for name in ["a", "b"]:
+        events = service._synthesize([(name, "Hello world", str(tmp_path / name))])
+        assert [location for _, location, _ in events[name]["words"]] == [0]
+
+    assert FakeEngine.n_created == 1
+
+
+def test_worker_uses_the_properties_of_the_engine(tmp_path):
+    engine = FakeEngine()
+    engine.setProperty("rate", 120)
+    service = PyTTSX3Service(
+        engine=engine,
+        use_worker_process=True,
+        cache_dir=str(tmp_path),
+        transcription_model=None,
+    )
+
+    service._synthesize([("a", "Hello", str(tmp_path / "a"))])
+
+    assert pyttsx3_service._worker_engine is not engine
+    assert pyttsx3_service._worker_engine.getProperty("rate") == 120
+    assert engine.jobs == []
+
+
+def test_engine_without_worker(tmp_path):
+    service = PyTTSX3Service(
+        use_worker_process=False, cache_dir=str(tmp_path), transcription_model=None
+    )
+    # Created on first use
+    assert FakeEngine.n_created == 0
+
+    service._synthesize([("a", "Hello", str(tmp_path / "a"))])
+    service._synthesize([("b", "Hello", str(tmp_path / "b"))])
+
+    assert FakeEngine.n_created == 1
+    assert pyttsx3_service._worker_engine is None
+
+
+def test_engine_word_boundaries_are_not_transcribed_by_default(tmp_path):
+    approximate = {
+        "word_boundaries": [{"text": "Hello", "text_offset": 0, "audio_offset": 0}],
+        "approximate_word_boundaries": True,
+    }
+
+    # Cloud transcription is on by default, but the service stays offline
+    service = PyTTSX3Service(cache_dir=str(tmp_path), transcription_model=None)
+    assert service.use_cloud_whisper
+    assert not service._needs_transcription(approximate)
+    # Unless the engine reported no word boundaries
+    assert service._needs_transcription({})
+
+    service = PyTTSX3Service(
+        cache_dir=str(tmp_path),
+        transcription_model=None,
+        transcribe_word_boundaries=True,
+    )
+    assert service._needs_transcription(approximate)
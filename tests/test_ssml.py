@@ -0,0 +1,53 @@
+import pytest
+
+from manim_voiceover.helper import get_bookmark_mark, remove_bookmarks
+from manim_voiceover.ssml import canonicalize_ssml, ssml_to_text
+
+
+def test_canonical_fragments():
+    first = (
+        "Hello <break  time='1s'/>\n"
+        "<mstts:express-as style='a' role=\"b\">you</mstts:express-as>"
+    )
+    second = (
+        '<!-- --> Hello <break time="1s"></break> '
+        '<mstts:express-as role="b" style="a">you</mstts:express-as>'
+    )
+
+    canonical = canonicalize_ssml(first)
+    assert canonical == (
+        'Hello <break time="1s"></break> '
+        '<mstts:express-as role="b" style="a">you</mstts:express-as>'
+    )
+    assert canonicalize_ssml(canonical) == canonical
+    assert canonicalize_ssml(second).strip() == canonical
+
+
+def test_canonical_documents_keep_their_namespaces():
+    ssml = (
+        "<speak version='1.0' xmlns='http://www.w3.org/2001/10/synthesis' "
+        "xml:lang='en-US'><voice name='a'>Hi &amp; bye</voice></speak>"
+    )
+
+    assert canonicalize_ssml(ssml) == (
+        '<speak xmlns="http://www.w3.org/2001/10/synthesis" version="1.0" '
+        'xml:lang="en-US"><voice name="a">Hi &amp; bye</voice></speak>'
+    )
+
+
+def test_invalid_ssml():
+    with pytest.raises(ValueError):
+        canonicalize_ssml("<voice>unclosed")
+
+
+def test_ssml_bookmarks_are_text_bookmarks():
+    text = ssml_to_text(
+        "Look <bookmark mark='intro-1'/> here <bookmark mark=\"it's\"/> now"
+    )
+
+    assert remove_bookmarks(text) == "Look  here  now"
+    assert [
+        get_bookmark_mark(tag)
+        for tag in ["<bookmark mark='intro-1'/>", "<bookmark mark=\"it's\"/>"]
+    ] == ["intro-1", "it's"]
+    assert "<bookmark mark='intro-1'/>" in text
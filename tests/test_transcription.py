@@ -0,0 +1,156 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+openai = pytest.importorskip("openai")
+
+from pydub import AudioSegment
+from pydub.generators import Sine
+
+from manim_voiceover.tracker import AUDIO_OFFSET_RESOLUTION
+from manim_voiceover.transcription import (
+    CloudWhisperTranscriber,
+    map_time,
+    split_words_by_intervals,
+    trim_pauses,
+)
+
+
+class StubWhisperServer:
+    """Serves the queued responses to POST /v1/audio/transcriptions."""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.requests = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                stub.requests.append((self.path, body))
+                data = json.dumps(stub.responses.pop(0)).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = HTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.server.shutdown()
+        self.server.server_close()
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server.server_port}/v1"
+
+
+def verbose_json(words):
+    return {
+        "task": "transcribe",
+        "language": "english",
+        "duration": 4.0,
+        "text": " ".join(word for word, _, _ in words),
+        "words": [
+            {"word": word, "start": start, "end": end} for word, start, end in words
+        ],
+    }
+
+
+@pytest.fixture
+def clips(tmp_path):
+    paths = []
+    for idx in range(2):
+        path = tmp_path / f"clip{idx}.wav"
+        AudioSegment.silent(duration=1000, frame_rate=16000).export(path, format="wav")
+        paths.append(str(path))
+    return paths
+
+
+def make_transcriber(server):
+    client = openai.OpenAI(base_url=server.base_url, api_key="test", max_retries=0)
+    return CloudWhisperTranscriber(client=client, marker_silence=1.5)
+
+
+def test_split_words_by_intervals():
+    words = [
+        {"word": "Hello", "start": 0.1, "end": 0.5},
+        {"word": "world", "start": 2.6, "end": 3.0},
+    ]
+    intervals = [(0.0, 1.0), (2.5, 3.5)]
+
+    assert split_words_by_intervals(words, intervals, 0.75) == [[words[0]], [words[1]]]
+    # A word spanning the silence between two clips
+    assert split_words_by_intervals(
+        words + [{"word": "what", "start": 0.8, "end": 2.8}], intervals, 0.75
+    ) is None
+    # A clip without any word
+    assert split_words_by_intervals(words[:1], intervals, 0.75) is None
+
+
+def test_trim_pauses_maps_times_back():
+    tone = Sine(440).to_audio_segment(duration=500).set_frame_rate(16000)
+    silence = AudioSegment.silent(duration=2000, frame_rate=16000)
+    audio = silence[:1000] + tone + silence + tone + silence
+
+    trimmed, pieces = trim_pauses(audio, max_pause=0.5, keep_pause=0.25)
+
+    assert trimmed.duration_seconds < audio.duration_seconds / 2
+    # The second tone starts 3.5s into the original audio
+    second_start = pieces[1][0] + 0.25
+    assert map_time(second_start, pieces) == pytest.approx(3.5, abs=0.02)
+    assert map_time(pieces[0][0] + 0.25, pieces) == pytest.approx(1.0, abs=0.02)
+
+
+def test_transcribe_batch_single_request(clips):
+    response = verbose_json([("Hello", 0.1, 0.5), ("world", 2.6, 3.0)])
+    with StubWhisperServer([response]) as server:
+        results = make_transcriber(server).transcribe_batch(clips)
+
+    assert [path for path, _ in server.requests] == ["/v1/audio/transcriptions"]
+    assert [r["transcribed_text"] for r in results] == ["Hello", "world"]
+    assert results[0]["word_boundaries"][0]["audio_offset"] == pytest.approx(
+        0.1 * AUDIO_OFFSET_RESOLUTION, abs=1
+    )
+    # Offsets are relative to the start of each clip
+    assert results[1]["word_boundaries"][0]["audio_offset"] == pytest.approx(
+        0.1 * AUDIO_OFFSET_RESOLUTION, abs=1
+    )
+
+
+def test_transcribe_batch_falls_back_when_ambiguous(clips):
+    responses = [
+        verbose_json([("Hello", 0.1, 0.5), ("world", 0.8, 2.8)]),
+        verbose_json([("Hello", 0.1, 0.5)]),
+        verbose_json([("world", 0.2, 0.6)]),
+    ]
+    with StubWhisperServer(responses) as server:
+        results = make_transcriber(server).transcribe_batch(clips)
+
+    assert len(server.requests) == 3
+    assert [r["transcribed_text"] for r in results] == ["Hello", "world"]
+    assert results[1]["word_boundaries"][0]["audio_offset"] == pytest.approx(
+        0.2 * AUDIO_OFFSET_RESOLUTION, abs=1
+    )
+
+
+def test_transcribe_batch_respects_max_duration(clips):
+    responses = [verbose_json([("Hello", 0.1, 0.5)]), verbose_json([("world", 0.1, 0.5)])]
+    with StubWhisperServer(responses) as server:
+        transcriber = make_transcriber(server)
+        transcriber.max_batch_duration = 3.0
+        results = transcriber.transcribe_batch(clips)
+
+    assert len(server.requests) == 2
+    assert [r["transcribed_text"] for r in results] == ["Hello", "world"]
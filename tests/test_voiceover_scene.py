@@ -0,0 +1,236 @@
+from concurrent.futures import Future
+from pathlib import Path
+
+import pytest
+from manim import config
+from pydub import AudioSegment
+
+from manim_voiceover import hashing, voiceover_scene
+from manim_voiceover.helper import remove_bookmarks
+from manim_voiceover.services.base import SpeechService
+from manim_voiceover.voiceover_scene import VoiceoverScene
+
+
+class SilentService(SpeechService):
+    """Synthesizes one second of silence per text, with dummy word boundaries."""
+
+    def __init__(self, **kwargs):
+        SpeechService.__init__(self, transcription_model=None, **kwargs)
+
+    def generate_from_text(self, text, cache_dir=None, path=None, **kwargs):
+        if cache_dir is None:
+            cache_dir = self.cache_dir
+        input_data = {"input_text": remove_bookmarks(text), "service": "silent"}
+        cached_result = self.get_cached_result(input_data, cache_dir)
+        if cached_result is not None:
+            return cached_result
+
+        audio_path = self.get_audio_basename(input_data) + ".wav"
+        AudioSegment.silent(duration=1000).export(
+            Path(cache_dir) / audio_path, format="wav"
+        )
+        return {
+            "input_text": text,
+            "input_data": input_data,
+            "original_audio": audio_path,
+            "word_boundaries": [],
+        }
+
+
+class FakeFileWriter:
+    def __init__(self):
+        self.sounds = []
+        self.partial_movie_directory = None
+        self.partial_movie_files = []
+        self.cached_hashes = set()
+
+    def is_already_cached(self, hash_):
+        return hash_ in self.cached_hashes
+
+    def add_sound(self, sound_file, time=None, gain=None, **kwargs):
+        self.sounds.append((sound_file, time))
+
+
+class FakeRenderer:
+    """Only advances the time, like a renderer whose animations are all skipped
+    or reused from the partial movie files."""
+
+    def __init__(self):
+        self.time = 0.0
+        self.skip_animations = False
+        self._original_skipping_status = False
+        self.file_writer = FakeFileWriter()
+        self.animations_hashes = []
+
+    def play_cached(self, duration):
+        # manim skips the animations of a play() whose partial movie file exists
+        self.skip_animations = True
+        self.time += duration
+
+
+@pytest.fixture
+def scene(tmp_path):
+    scene = VoiceoverScene.__new__(VoiceoverScene)
+    scene.renderer = FakeRenderer()
+    scene.set_speech_service(
+        SilentService(cache_dir=str(tmp_path / "cache")),
+        create_subcaption=False,
+        background_synthesis=True,
+    )
+    return scene
+
+
+def test_narration_is_added_after_a_cached_play(scene):
+    scene.renderer.time = 1.0
+    tracker = scene.add_voiceover_text("Hello")
+    scene.renderer.play_cached(2.0)
+
+    tracker.wait()
+
+    path = str(Path(tracker.cache_dir) / tracker.data["final_audio"])
+    assert scene.renderer.file_writer.sounds == [(path, pytest.approx(1.0))]
+
+
+def test_music_is_added_after_a_cached_play(scene, tmp_path):
+    AudioSegment.silent(duration=3000).export(tmp_path / "music.wav", format="wav")
+    scene.add_background_music(str(tmp_path / "music.wav"))
+    scene.add_voiceover_text("Hello").wait()
+    scene.renderer.play_cached(2.0)
+
+    path = scene.add_ducked_music()
+
+    assert scene.renderer.file_writer.sounds[-1] == (path, pytest.approx(0.0))
+    assert len(AudioSegment.from_wav(path)) == 2000
+
+
+def test_music_is_not_written_when_animations_are_skipped(scene, tmp_path):
+    AudioSegment.silent(duration=3000).export(tmp_path / "music.wav", format="wav")
+    scene.add_background_music(str(tmp_path / "music.wav"))
+    scene.renderer._original_skipping_status = True
+    scene.renderer.play_cached(2.0)
+
+    assert scene.add_ducked_music() is None
+
+
+def test_tracks_are_mixed_after_a_cached_play(scene, tmp_path):
+    scene.add_track("echo", SilentService(cache_dir=str(tmp_path / "cache")), gain=-6)
+    scene.add_voiceover_text("Hello")
+    scene.renderer.time = 0.5
+    scene.add_voiceover_text("Hello", track="echo")
+    scene.renderer.play_cached(2.0)
+    for tracker in scene._trackers:
+        tracker.wait()
+
+    path = scene.mix_tracks()
+
+    # The narration is added on its own, the named tracks are mixed
+    assert [time for _, time in scene.renderer.file_writer.sounds] == [
+        pytest.approx(0.0),
+        pytest.approx(0.0),
+    ]
+    assert scene.renderer.file_writer.sounds[-1][0] == path
+    assert len(AudioSegment.from_wav(path)) == 1500
+    assert scene._tracker_gains == [0.0, -6]
+
+
+def test_tracks_are_not_mixed_when_animations_are_skipped(scene, tmp_path):
+    scene.add_track("echo", SilentService(cache_dir=str(tmp_path / "cache")))
+    scene.add_voiceover_text("Hello", track="echo").wait()
+    scene.renderer._original_skipping_status = True
+    scene.renderer.play_cached(2.0)
+
+    assert scene.mix_tracks() is None
+
+
+def test_render_in_preview_mode_returns_none(scene, monkeypatch):
+    calls = []
+    monkeypatch.setenv("MANIM_VOICEOVER_PREVIEW", "1")
+    monkeypatch.setattr(
+        scene, "render_narration_preview", lambda: calls.append(1) or {"audio": "a"}
+    )
+
+    assert scene.render() is None
+    assert calls == [1]
+
+
+def test_animation_hashes_are_salted_with_the_audio(scene):
+    scene.background_synthesis = False
+    assert scene._salt_animation_hash("h1") == "h1"
+
+    with scene.voiceover("Hello", wait=False) as tracker:
+        salt = f"{tracker.data['audio_hash']}_{1.0:.6f}"
+        scene.renderer.file_writer.cached_hashes.add(hashing.salt_hash("h1", salt))
+        assert scene._salt_animation_hash("h1") == hashing.salt_hash("h1", salt)
+        assert scene._salt_animation_hash("h2") == hashing.salt_hash("h2", salt)
+
+    (block,) = scene._voiceover_blocks
+    assert block["animation_hashes"] == ["h1", "h2"]
+    assert block["cached"] == [True, False]
+    assert scene._salt_animation_hash("h1") == "h1"
+
+
+def test_provisional_hashes_are_renamed_when_the_audio_is_ready(scene, tmp_path):
+    extension = config["movie_file_extension"]
+    scene.renderer.file_writer.partial_movie_directory = str(tmp_path)
+    future = Future()
+    scene.speech_service.submit = lambda text, **kwargs: future
+
+    with scene.voiceover("Hello", wait=False) as tracker:
+        provisional = scene._salt_animation_hash("h1")
+        (tmp_path / f"{provisional}{extension}").write_bytes(b"movie")
+        scene.renderer.animations_hashes.append(provisional)
+        future.set_result(scene.speech_service._wrap_generate_from_text("Hello"))
+
+    scene._finish_voiceover_blocks()
+
+    final = hashing.salt_hash("h1", f"{tracker.data['audio_hash']}_{1.0:.6f}")
+    assert provisional != final
+    assert (tmp_path / f"{final}{extension}").read_bytes() == b"movie"
+    assert scene.renderer.animations_hashes == [final]
+    # Which is the hash of the animation once the audio is cached
+    scene.background_synthesis = False
+    with scene.voiceover("Hello", wait=False):
+        assert scene._salt_animation_hash("h1") == final
+
+
+def test_track_mix_is_cached(scene, tmp_path, monkeypatch):
+    mixes = []
+
+    def mix_audio(clips, output_path, gains=None):
+        mixes.append((clips, gains))
+        AudioSegment.silent(duration=100).export(output_path, format="wav")
+
+    monkeypatch.setattr(voiceover_scene, "mix_audio", mix_audio)
+    scene.add_track("a", SilentService(cache_dir=str(tmp_path / "cache")), gain=-3)
+    scene.add_track("b", SilentService(cache_dir=str(tmp_path / "cache")), gain=-9)
+    scene.renderer.time = 1.0
+    scene.add_voiceover_text("Hello", track="b").wait()
+    scene.renderer.time = 0.5
+    scene.add_voiceover_text("Bye", track="a").wait()
+
+    path = scene.mix_tracks()
+    assert scene.mix_tracks() == path
+
+    # Mixed once, in the order of the start times, with the gain of each track
+    ((clips, gains),) = mixes
+    assert [start for _, start in clips] == [0.5, 1.0]
+    assert gains == [-3, -9]
+
+    # Moving a clip writes a new mix
+    scene._track_clips[0] = (scene._track_clips[0][0], 1.5, -9)
+    assert scene.mix_tracks() != path
+    assert len(mixes) == 2
+
+
+def test_wait_for_tracks_waits_for_the_longest_track(scene, tmp_path, monkeypatch):
+    waits = []
+    monkeypatch.setattr(scene, "wait", waits.append, raising=False)
+    scene.add_track("echo", SilentService(cache_dir=str(tmp_path / "cache")))
+    scene.add_voiceover_text("Hello")
+    scene.renderer.time = 0.5
+    scene.add_voiceover_text("Hello", track="echo")
+
+    scene.wait_for_voiceover()
+    scene.wait_for_tracks()
+
+    assert waits == [pytest.approx(0.5), pytest.approx(1.0)]